@@ -9,6 +9,15 @@ CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- ── Documents ─────────────────────────────────
 
+-- Bulk uploads (POST /documents/batch); documents.batch_id links the files
+CREATE TABLE IF NOT EXISTS ingestion_batches (
+    id              UUID PRIMARY KEY,
+    tenant_id       VARCHAR(255) NOT NULL,
+    uploaded_by     VARCHAR(255) NOT NULL,
+    file_count      INT NOT NULL,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
 CREATE TABLE IF NOT EXISTS documents (
     id              UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     tenant_id       VARCHAR(255) NOT NULL,
@@ -21,6 +30,12 @@ CREATE TABLE IF NOT EXISTS documents (
     uploaded_at     TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     page_count      INT,
     chunk_count     INT,
+    content_sha256  CHAR(64),
+    -- Set on re-uploads of identical content; the alias shares the canonical document's chunks.
+    canonical_document_id UUID REFERENCES documents(id) ON DELETE CASCADE,
+    -- Earlier version this upload revises; indexing reuses its unchanged chunks.
+    previous_document_id  UUID REFERENCES documents(id) ON DELETE SET NULL,
+    batch_id        UUID REFERENCES ingestion_batches(id) ON DELETE SET NULL,
     created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at      TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
@@ -28,21 +43,74 @@ CREATE TABLE IF NOT EXISTS documents (
 CREATE INDEX IF NOT EXISTS documents_tenant_id_idx ON documents(tenant_id);
 CREATE INDEX IF NOT EXISTS documents_status_idx ON documents(status);
 CREATE INDEX IF NOT EXISTS documents_uploaded_at_idx ON documents(uploaded_at DESC);
+CREATE INDEX IF NOT EXISTS documents_batch_id_idx
+    ON documents(batch_id)
+    WHERE batch_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS documents_canonical_document_id_idx
+    ON documents(canonical_document_id)
+    WHERE canonical_document_id IS NOT NULL;
+
+-- One canonical (non-alias, live) document per tenant and content digest
+CREATE UNIQUE INDEX IF NOT EXISTS documents_tenant_content_sha256_uidx
+    ON documents(tenant_id, content_sha256)
+    WHERE canonical_document_id IS NULL AND status NOT IN ('failed', 'superseded');
+
+-- ── Event Outbox ──────────────────────────────
+
+-- Events committed with the row they describe; the ingestion relay sends
+-- them to Redpanda and deletes them once acked (at-least-once delivery)
+CREATE TABLE IF NOT EXISTS event_outbox (
+    id              BIGSERIAL PRIMARY KEY,
+    event_id        UUID NOT NULL,
+    topic           VARCHAR(255) NOT NULL,
+    event_key       VARCHAR(255),
+    payload         JSONB NOT NULL,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
 
 -- ── Document Chunks + Embeddings ──────────────
 
+-- Partitioned by tenant so every search prunes to one partition and its own
+-- HNSW graph: large tenants get a dedicated LIST partition, all others share
+-- the DEFAULT partition, hash-partitioned 16 ways. Indexes defined on the
+-- parent are created per partition. Manage partitions with
+-- `python -m indexing_service.partitions` (see README).
 CREATE TABLE IF NOT EXISTS document_chunks (
-    id              UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id              UUID NOT NULL DEFAULT uuid_generate_v4(),
     document_id     UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
     tenant_id       VARCHAR(255) NOT NULL,
     content         TEXT NOT NULL,
     page_number     INT,
     chunk_index     INT NOT NULL,
     token_count     INT NOT NULL,
-    embedding_model VARCHAR(100) NOT NULL,
-    embedding       vector(1536),
-    created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW()
-);
+    -- Two embedding slots. Retrieval reads the one named by the active row of
+    -- embedding_migrations; a model migration fills the other, so the cutover
+    -- only flips which slot is active.
+    embedding_model     VARCHAR(100),
+    embedding           vector(1536),
+    embedding_alt_model VARCHAR(100),
+    embedding_alt       vector(1536),
+    -- Lexical side of hybrid retrieval; the config must match the retrieval queries.
+    content_tsv     tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    -- The partition key must be part of the primary key
+    PRIMARY KEY (tenant_id, id)
+) PARTITION BY LIST (tenant_id);
+
+CREATE TABLE IF NOT EXISTS document_chunks_shared
+    PARTITION OF document_chunks DEFAULT
+    PARTITION BY HASH (tenant_id);
+
+DO $$
+BEGIN
+    FOR i IN 0..15 LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS document_chunks_shared_%s '
+            'PARTITION OF document_chunks_shared FOR VALUES WITH (MODULUS 16, REMAINDER %s)',
+            i, i
+        );
+    END LOOP;
+END $$;
 
 -- HNSW index for approximate nearest neighbor search
 CREATE INDEX IF NOT EXISTS document_chunks_embedding_hnsw_idx
@@ -50,9 +118,55 @@ CREATE INDEX IF NOT EXISTS document_chunks_embedding_hnsw_idx
     USING hnsw (embedding vector_cosine_ops)
     WITH (m = 16, ef_construction = 64);
 
+CREATE INDEX IF NOT EXISTS document_chunks_embedding_alt_hnsw_idx
+    ON document_chunks
+    USING hnsw (embedding_alt vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Binary-quantized HNSW index (1 bit per dimension, ~32x smaller than the float index)
+-- used for the coarse pass when RETRIEVAL_INDEX_MODE=binary; candidates are re-ranked
+-- with exact cosine on the full vectors.
+CREATE INDEX IF NOT EXISTS document_chunks_embedding_bq_hnsw_idx
+    ON document_chunks
+    USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops)
+    WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS document_chunks_embedding_alt_bq_hnsw_idx
+    ON document_chunks
+    USING hnsw ((binary_quantize(embedding_alt)::bit(1536)) bit_hamming_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Full-text index for the lexical ranking of RETRIEVAL_SEARCH_MODE=hybrid
+CREATE INDEX IF NOT EXISTS document_chunks_content_tsv_idx
+    ON document_chunks
+    USING gin (content_tsv);
+
+-- Lookups and keyset scans by chunk ID alone (the primary key leads with tenant_id)
+CREATE INDEX IF NOT EXISTS document_chunks_id_idx ON document_chunks(id);
 CREATE INDEX IF NOT EXISTS document_chunks_document_id_idx ON document_chunks(document_id);
 CREATE INDEX IF NOT EXISTS document_chunks_tenant_id_idx ON document_chunks(tenant_id);
 
+-- ── Embedding Cache ───────────────────────────
+-- Content-addressed: content_hash = sha256(embedding_model, normalized chunk text).
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    content_hash    CHAR(64) NOT NULL,
+    embedding_model VARCHAR(100) NOT NULL,
+    embedding       vector(1536) NOT NULL,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (content_hash, embedding_model)
+);
+
+-- Retrieval query embeddings: query_hash = sha256(embedding_model, normalized query).
+-- Shared tier behind each replica's in-process LRU (RETRIEVAL_QUERY_CACHE_PERSISTENT).
+CREATE TABLE IF NOT EXISTS query_embedding_cache (
+    query_hash      CHAR(64) NOT NULL,
+    embedding_model VARCHAR(100) NOT NULL,
+    embedding       vector(1536) NOT NULL,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (query_hash, embedding_model)
+);
+
 -- ── Audit Log (append-only) ───────────────────
 
 CREATE TABLE IF NOT EXISTS audit_log (
@@ -77,6 +191,26 @@ CREATE INDEX IF NOT EXISTS audit_log_tenant_id_idx ON audit_log(tenant_id);
 CREATE INDEX IF NOT EXISTS audit_log_event_type_idx ON audit_log(event_type);
 CREATE INDEX IF NOT EXISTS audit_log_timestamp_idx ON audit_log(timestamp_utc DESC);
 
+-- ── Embedding Model Migrations ────────────────
+-- Driven by `python -m indexing_service.backfill`. The most recently activated
+-- row names the model, its output dimensions and the document_chunks slot that
+-- retrieval searches and indexing writes. Without an active row the configured deployment is used
+-- with the embedding slot.
+
+CREATE TABLE IF NOT EXISTS embedding_migrations (
+    target_model     VARCHAR(100) PRIMARY KEY,
+    status           VARCHAR(20) NOT NULL DEFAULT 'backfilling'
+                     CHECK (status IN ('backfilling', 'active')),
+    embedding_column VARCHAR(20) NOT NULL DEFAULT 'embedding_alt'
+                     CHECK (embedding_column IN ('embedding', 'embedding_alt')),
+    dimensions       INT,               -- output size requested from the model; NULL: its default
+    cursor_chunk_id  UUID,              -- keyset checkpoint of the current pass
+    embedded_count   BIGINT NOT NULL DEFAULT 0,
+    started_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    activated_at     TIMESTAMPTZ
+);
+
 -- ── Idempotency Table ─────────────────────────
 
 CREATE TABLE IF NOT EXISTS processed_events (
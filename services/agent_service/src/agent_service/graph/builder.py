@@ -13,6 +13,7 @@ from agent_service.graph.nodes import (
 )
 from agent_service.graph.state import AgentState, AgentStep
 from agent_service.settings import Settings
+from shared.ratelimit import AdaptiveRateLimiter
 
 
 def route_after_guardrail(state: AgentState) -> str:
@@ -32,7 +33,11 @@ def route_after_verification(state: AgentState) -> str:
     return AgentStep.REFUSED
 
 
-def build_graph(settings: Settings, openai_client: AsyncAzureOpenAI) -> StateGraph:
+def build_graph(
+    settings: Settings,
+    openai_client: AsyncAzureOpenAI,
+    rate_limiter: AdaptiveRateLimiter,
+) -> StateGraph:
     graph = StateGraph(AgentState)
 
     graph.add_node(
@@ -45,7 +50,12 @@ def build_graph(settings: Settings, openai_client: AsyncAzureOpenAI) -> StateGra
     )
     graph.add_node(
         AgentStep.SYNTHESIS,
-        partial(node_synthesize, openai_client=openai_client, settings=settings),
+        partial(
+            node_synthesize,
+            openai_client=openai_client,
+            rate_limiter=rate_limiter,
+            settings=settings,
+        ),
     )
     graph.add_node(
         AgentStep.CITATION_VERIFICATION,
@@ -8,6 +8,7 @@ from openai import AsyncAzureOpenAI
 
 from agent_service.graph.state import AgentState, AgentStep
 from agent_service.settings import Settings
+from shared.ratelimit import AdaptiveRateLimiter, estimate_tokens
 from shared.schemas.documents import Citation, RetrievedChunk
 
 logger = structlog.get_logger(__name__)
@@ -95,7 +96,12 @@ async def node_retrieve(state: AgentState, settings: Settings) -> AgentState:
     }
 
 
-async def node_synthesize(state: AgentState, openai_client: AsyncAzureOpenAI, settings: Settings) -> AgentState:
+async def node_synthesize(
+    state: AgentState,
+    openai_client: AsyncAzureOpenAI,
+    rate_limiter: AdaptiveRateLimiter,
+    settings: Settings,
+) -> AgentState:
     log = logger.bind(session_id=state["session_id"])
 
     context_parts = [
@@ -109,13 +115,19 @@ async def node_synthesize(state: AgentState, openai_client: AsyncAzureOpenAI, se
         {"role": "user", "content": f"Context:\n{context}\n\n<user_query>\n{state['query']}\n</user_query>"},
     ]
 
-    response = await openai_client.chat.completions.create(
-        model=settings.azure_openai_chat_deployment,
-        messages=messages,
-        response_format={"type": "json_object"},
-        temperature=0.0,
-        max_tokens=2048,
-    )
+    max_tokens = 2048
+    # Azure counts max_tokens against the TPM quota when the request is admitted.
+    estimated_tokens = sum(estimate_tokens(m["content"]) for m in messages) + max_tokens
+    async with rate_limiter.acquire(tokens=estimated_tokens) as permit:
+        response = await openai_client.chat.completions.create(
+            model=settings.azure_openai_chat_deployment,
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=0.0,
+            max_tokens=max_tokens,
+        )
+        if response.usage:
+            permit.record_usage(response.usage.total_tokens)
 
     raw = response.choices[0].message.content or "{}"
 
@@ -4,13 +4,14 @@ from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 import structlog
-from fastapi import FastAPI
-from openai import AsyncAzureOpenAI
+from fastapi import FastAPI, Request
 
 from agent_service.api.routes import router
 from agent_service.graph.builder import build_graph
 from agent_service.settings import Settings
+from shared.llm import create_openai_client
 from shared.logging.config import configure_logging
+from shared.ratelimit import AdaptiveRateLimiter, RateLimiterStats
 from shared.schemas.base import HealthResponse
 
 settings = Settings()
@@ -22,15 +23,18 @@ logger = structlog.get_logger(__name__)
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("service.starting", version=settings.app_version)
 
-    openai_client = AsyncAzureOpenAI(
-        azure_endpoint=settings.azure_openai_endpoint,
-        api_key=settings.azure_openai_api_key.get_secret_value(),
-        api_version=settings.azure_openai_api_version,
+    rate_limiter = AdaptiveRateLimiter(
+        name=settings.azure_openai_chat_deployment,
+        requests_per_minute=settings.azure_openai_requests_per_minute,
+        tokens_per_minute=settings.azure_openai_tokens_per_minute,
+        max_concurrency=settings.azure_openai_max_concurrency,
     )
-    graph = build_graph(settings=settings, openai_client=openai_client)
+    openai_client = create_openai_client(settings, rate_limiter)
+    graph = build_graph(settings=settings, openai_client=openai_client, rate_limiter=rate_limiter)
 
     app.state.graph = graph
     app.state.openai_client = openai_client
+    app.state.rate_limiter = rate_limiter
 
     logger.info("service.ready", graph_nodes=list(graph.nodes.keys()))
     yield
@@ -56,4 +60,10 @@ async def health() -> HealthResponse:
     )
 
 
+@app.get("/rate-limit/stats", response_model=RateLimiterStats, tags=["ops"])
+async def rate_limit_stats(request: Request) -> RateLimiterStats:
+    rate_limiter: AdaptiveRateLimiter = request.app.state.rate_limiter
+    return rate_limiter.stats()
+
+
 app.include_router(router)
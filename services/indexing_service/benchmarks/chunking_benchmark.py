@@ -0,0 +1,156 @@
+"""Benchmark: token-window chunker vs boundary-aware chunker.
+
+Usage (from the repository root):
+
+    PYTHONPATH=services/indexing_service/src:. \
+        python services/indexing_service/benchmarks/chunking_benchmark.py \
+        [--corpus DIR] [--documents 20] [--pages 60] [--repeat 3]
+
+With --corpus, every .pdf/.docx/.txt file in DIR is used; otherwise a synthetic
+corpus of long contracts with numbered sections is generated.
+"""
+# The printed table is this script's output, not logging.
+# ruff: noqa: T201
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from indexing_service.domain.models import DocumentChunk, ExtractedPage
+from indexing_service.domain.services import (
+    BoundaryAwareChunkingService,
+    ChunkingService,
+    TextExtractionService,
+)
+
+_CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+
+_CLAUSES = [
+    "Either party may terminate this Agreement upon ninety (90) days' prior written notice",
+    "the Supplier shall indemnify, defend and hold harmless the Customer and its Affiliates",
+    "from and against any and all losses, damages, liabilities, costs and expenses",
+    "including reasonable attorneys' fees, arising out of any third-party claim",
+    "This Agreement shall be governed by and construed in accordance with the laws of England",
+    "each party shall keep confidential all Confidential Information of the other party",
+    "except to the extent disclosure is required by applicable law or a competent authority",
+    "The aggregate liability of either party shall not exceed the fees paid in the twelve months",
+    "Acme GmbH shall provide the Services in accordance with the Service Levels in Schedule 2",
+    "no failure or delay in exercising any right shall operate as a waiver thereof",
+]
+
+
+def synthetic_contract(rng: random.Random, pages: int) -> list[ExtractedPage]:
+    result: list[ExtractedPage] = []
+    section = 1
+    for number in range(1, pages + 1):
+        parts: list[str] = []
+        for _ in range(rng.randint(2, 4)):
+            parts.append(f"{section}. {rng.choice(['DEFINITIONS', 'TERM', 'FEES', 'LIABILITY'])}")
+            for sub in range(1, rng.randint(3, 6)):
+                sentences = [
+                    "; ".join(rng.sample(_CLAUSES, rng.randint(1, 3))) + "."
+                    for _ in range(rng.randint(2, 5))
+                ]
+                parts.append(f"{section}.{sub} " + " ".join(sentences))
+            section += 1
+        text = "\n\n".join(parts)
+        if number > 1:
+            text = "\n\n" + text
+        result.append(ExtractedPage(page_number=number, text=text))
+    return result
+
+
+def load_corpus(corpus: Path) -> list[list[ExtractedPage]]:
+    extractor = TextExtractionService()
+    documents = []
+    for path in sorted(corpus.iterdir()):
+        content_type = _CONTENT_TYPES.get(path.suffix.lower())
+        if content_type:
+            documents.append(list(extractor.iter_pages(path.read_bytes(), content_type)))
+    return documents
+
+
+def mid_word_ratio(chunks: list[DocumentChunk]) -> float:
+    """Share of chunks (except the last) whose text ends inside a word."""
+    inner = chunks[:-1]
+    if not inner:
+        return 0.0
+    return sum(1 for c in inner if c.content[-1:].isalnum()) / len(inner)
+
+
+def sentence_end_ratio(chunks: list[DocumentChunk]) -> float:
+    inner = chunks[:-1]
+    if not inner:
+        return 0.0
+    return sum(1 for c in inner if c.content.rstrip()[-1:] in ".;:!?") / len(inner)
+
+
+def run(
+    chunker: ChunkingService, documents: list[list[ExtractedPage]], repeat: int
+) -> dict[str, float]:
+    timings: list[float] = []
+    per_document: list[list[DocumentChunk]] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        per_document = [chunker.chunk_pages(uuid4(), "bench", pages) for pages in documents]
+        timings.append(time.perf_counter() - started)
+
+    chunks = [c for doc_chunks in per_document for c in doc_chunks]
+
+    tokens = sum(c.token_count for c in chunks)
+    best = min(timings)
+    return {
+        "seconds_best": best,
+        "seconds_median": statistics.median(timings),
+        "chunks": len(chunks),
+        "tokens_per_second": tokens / best if best else 0.0,
+        "mean_chunk_tokens": statistics.mean(c.token_count for c in chunks) if chunks else 0.0,
+        "mid_word_ratio": statistics.mean(mid_word_ratio(d) for d in per_document),
+        "sentence_end_ratio": statistics.mean(sentence_end_ratio(d) for d in per_document),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--corpus", type=Path)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--overlap", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.corpus:
+        documents = load_corpus(args.corpus)
+    else:
+        rng = random.Random(args.seed)  # noqa: S311 - reproducible corpus, not crypto
+        documents = [synthetic_contract(rng, args.pages) for _ in range(args.documents)]
+
+    chars = sum(len(p.text) for pages in documents for p in pages)
+    print(f"corpus: {len(documents)} documents, {chars / 1e6:.2f}M characters")
+
+    chunkers: dict[str, ChunkingService] = {
+        "token_window": ChunkingService(args.chunk_size, args.overlap),
+        "boundary": BoundaryAwareChunkingService(args.chunk_size, args.overlap),
+    }
+    results = {name: run(chunker, documents, args.repeat) for name, chunker in chunkers.items()}
+
+    metrics = list(next(iter(results.values())))
+    print(f"{'metric':<20}" + "".join(f"{name:>16}" for name in results))
+    for metric in metrics:
+        print(f"{metric:<20}" + "".join(f"{results[name][metric]:>16.3f}" for name in results))
+
+
+if __name__ == "__main__":
+    main()
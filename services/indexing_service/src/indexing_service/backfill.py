@@ -0,0 +1,255 @@
+"""Re-embed stored chunks with a new embedding deployment, then cut over to it.
+
+Usage (same environment as the indexing service):
+
+    python -m indexing_service.backfill --target-deployment text-embedding-3-small \
+        [--dimensions 1536] [--follow] [--status]
+
+The worker walks document_chunks in chunk-ID order, embeds each batch with
+the target deployment and writes the vectors to the embedding slot the active
+model is not using, committing the keyset checkpoint with every batch; stop it
+at any time and run it again to resume. When every chunk has a target-model
+vector it activates the target model, which only flips the active slot.
+Retrieval and indexing follow the switch within their model refresh interval
+and the previous model's vectors stay in the other slot until the next
+migration.
+
+Chunks indexed into the old slot before indexing picks up the switch have no
+target-model vector; run with --follow to embed those.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import signal
+import time
+from collections.abc import Sequence
+from uuid import UUID
+
+import structlog
+from sqlalchemy.exc import DBAPIError
+
+from indexing_service.domain.models import EmbeddingMigration, StoredChunk
+from indexing_service.infrastructure.backfill_repository import EmbeddingBackfillRepository
+from indexing_service.infrastructure.embedding_client import EmbeddingClient
+from indexing_service.settings import Settings
+from shared.llm import create_openai_client
+from shared.logging.config import configure_logging
+from shared.ratelimit import AdaptiveRateLimiter
+
+logger = structlog.get_logger(__name__)
+
+_FIRST_CHUNK_ID = UUID(int=0)
+
+
+class EmbeddingBackfillWorker:
+    def __init__(
+        self,
+        repository: EmbeddingBackfillRepository,
+        client: EmbeddingClient,
+        target_model: str,
+        embedding_dimensions: int,
+        requested_dimensions: int | None = None,
+        batch_size: int = 128,
+        batch_pause_seconds: float = 0.0,
+        follow_interval_seconds: float = 60.0,
+        cutover_lock_timeout_ms: int = 10_000,
+    ) -> None:
+        self._repository = repository
+        self._client = client
+        self._target_model = target_model
+        self._embedding_dimensions = embedding_dimensions
+        self._requested_dimensions = requested_dimensions
+        self._batch_size = batch_size
+        self._batch_pause_seconds = batch_pause_seconds
+        self._follow_interval_seconds = follow_interval_seconds
+        self._cutover_lock_timeout_ms = cutover_lock_timeout_ms
+        self._log = logger.bind(target_model=target_model)
+
+    async def run(self, follow: bool = False) -> None:
+        # Retrieval and indexing embed with the dimensions stored on the migration,
+        # so every vector of a model must have been requested with the same ones.
+        existing = await self._repository.get_migration(self._target_model)
+        if existing and existing.dimensions != self._requested_dimensions:
+            raise SystemExit(
+                f"{self._target_model} was backfilled with --dimensions "
+                f"{existing.dimensions}; run again with the same value."
+            )
+        migration = await self._repository.start_migration(
+            self._target_model, self._requested_dimensions
+        )
+        self._log = self._log.bind(embedding_column=migration.embedding_column)
+        if migration.status != "active":
+            await self._backfill(migration, migration.cursor_chunk_id or _FIRST_CHUNK_ID)
+        if follow:
+            await self._follow(migration)
+
+    async def _backfill(self, migration: EmbeddingMigration, cursor: UUID) -> None:
+        total, uncovered = await self._repository.coverage(migration)
+        self._log.info(
+            "backfill.started",
+            total_chunks=total,
+            remaining_chunks=uncovered,
+            resumed=cursor != _FIRST_CHUNK_ID,
+        )
+        started = time.monotonic()
+        embedded = 0
+
+        while True:
+            chunks = await self._repository.next_batch(migration, cursor, self._batch_size)
+            if chunks:
+                embeddings = await self._embed(chunks)
+                await self._repository.save_batch(migration, chunks, embeddings)
+                cursor = chunks[-1].chunk_id
+                embedded += len(chunks)
+                self._log_progress(total, max(0, uncovered - embedded), embedded, started)
+                if self._batch_pause_seconds:
+                    await asyncio.sleep(self._batch_pause_seconds)
+                continue
+
+            # End of a pass. Chunks inserted behind the cursor meanwhile need another one.
+            total, uncovered = await self._repository.coverage(migration)
+            embedded = 0
+            started = time.monotonic()
+            if not uncovered:
+                try:
+                    if await self._repository.cut_over(migration, self._cutover_lock_timeout_ms):
+                        return
+                except DBAPIError as exc:
+                    self._log.warning("backfill.cutover.deferred", error=str(exc.orig or exc))
+                await asyncio.sleep(self._follow_interval_seconds)
+
+            self._log.info("backfill.pass.restarted", remaining_chunks=uncovered)
+            cursor = _FIRST_CHUNK_ID
+            await self._repository.restart_pass(migration)
+
+    async def _follow(self, migration: EmbeddingMigration) -> None:
+        """Embed chunks indexed into the other slot after cutover."""
+        self._log.info("backfill.follow.started", interval_s=self._follow_interval_seconds)
+        cursor = _FIRST_CHUNK_ID
+        while True:
+            chunks = await self._repository.next_batch(migration, cursor, self._batch_size)
+            if not chunks:
+                cursor = _FIRST_CHUNK_ID
+                await asyncio.sleep(self._follow_interval_seconds)
+                continue
+            embeddings = await self._embed(chunks)
+            await self._repository.save_batch(migration, chunks, embeddings, checkpoint=False)
+            cursor = chunks[-1].chunk_id
+            self._log.info("backfill.follow.reembedded", chunk_count=len(chunks))
+
+    async def _embed(self, chunks: Sequence[StoredChunk]) -> list[list[float]]:
+        embeddings = await self._client.embed_texts([chunk.content for chunk in chunks])
+        for embedding in embeddings:
+            if len(embedding) != self._embedding_dimensions:
+                raise ValueError(
+                    f"{self._target_model} returned {len(embedding)}-dimensional vectors; "
+                    f"the schema stores {self._embedding_dimensions} (see --dimensions)."
+                )
+        return embeddings
+
+    def _log_progress(self, total: int, remaining: int, embedded: int, started: float) -> None:
+        elapsed = time.monotonic() - started
+        rate = embedded / elapsed if elapsed > 0 else 0.0
+        self._log.info(
+            "backfill.progress",
+            covered_chunks=total - remaining,
+            total_chunks=total,
+            percent=round(100 * (total - remaining) / total, 2) if total else 100.0,
+            chunks_per_s=round(rate, 1),
+            eta_s=round(remaining / rate) if rate else None,
+        )
+
+
+async def _log_status(repository: EmbeddingBackfillRepository, target_model: str) -> None:
+    migration = await repository.get_migration(target_model)
+    active = await repository.active_embedding_model()
+    if migration is None:
+        logger.info(
+            "backfill.status",
+            active_model=active.name if active else None,
+            target_model=target_model,
+            status="not started",
+        )
+        return
+    total, uncovered = await repository.coverage(migration)
+    logger.info(
+        "backfill.status",
+        active_model=active.name if active else None,
+        target_model=target_model,
+        status=migration.status,
+        embedding_column=migration.embedding_column,
+        dimensions=migration.dimensions,
+        covered_chunks=total - uncovered,
+        total_chunks=total,
+        embedded_count=migration.embedded_count,
+        cursor_chunk_id=str(migration.cursor_chunk_id) if migration.cursor_chunk_id else None,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-deployment", required=True)
+    parser.add_argument(
+        "--dimensions",
+        type=int,
+        default=None,
+        help=(
+            "Output size to request from text-embedding-3 deployments; stored with the "
+            "migration and used by retrieval and indexing once the model is active."
+        ),
+    )
+    parser.add_argument("--follow", action="store_true")
+    parser.add_argument("--status", action="store_true", help="Log progress and exit.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    configure_logging(f"{settings.service_name}.backfill", settings.log_level)
+    repository = EmbeddingBackfillRepository(settings.database_url.get_secret_value())
+    if args.status:
+        try:
+            await _log_status(repository, args.target_deployment)
+        finally:
+            await repository.dispose()
+        return
+
+    rate_limiter = AdaptiveRateLimiter(
+        name=f"{args.target_deployment}.backfill",
+        requests_per_minute=settings.backfill_requests_per_minute,
+        tokens_per_minute=settings.backfill_tokens_per_minute,
+        max_concurrency=1,
+    )
+    openai_client = create_openai_client(settings, rate_limiter)
+    worker = EmbeddingBackfillWorker(
+        repository=repository,
+        client=EmbeddingClient(
+            openai_client,
+            deployment=args.target_deployment,
+            rate_limiter=rate_limiter,
+            dimensions=args.dimensions,
+        ),
+        target_model=args.target_deployment,
+        embedding_dimensions=settings.azure_openai_embedding_dimensions,
+        requested_dimensions=args.dimensions,
+        batch_size=settings.backfill_batch_size,
+        batch_pause_seconds=settings.backfill_batch_pause_ms / 1000,
+        follow_interval_seconds=settings.backfill_follow_interval_seconds,
+        cutover_lock_timeout_ms=settings.backfill_cutover_lock_timeout_ms,
+    )
+
+    # Every batch commits its own checkpoint, so stopping mid-run loses at most one batch.
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        await worker.run(follow=args.follow)
+    except asyncio.CancelledError:
+        logger.info("backfill.stopped", target_model=args.target_deployment)
+    finally:
+        await openai_client.close()
+        await repository.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
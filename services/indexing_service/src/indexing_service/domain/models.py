@@ -4,6 +4,15 @@ from uuid import UUID, uuid4
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from shared.schemas.documents import EmbeddingColumn
+
+
+class ExtractedPage(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    page_number: int | None
+    text: str
+
 
 class DocumentChunk(BaseModel):
     model_config = ConfigDict(frozen=True)
@@ -29,3 +38,30 @@ class IndexedChunk(BaseModel):
     token_count: int
     embedding: list[float]
     embedding_model: str
+
+
+class StoredChunk(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    chunk_id: UUID
+    tenant_id: str
+    content: str
+
+
+class EmbeddingMigration(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    target_model: str
+    status: str
+    embedding_column: EmbeddingColumn
+    dimensions: int | None
+    cursor_chunk_id: UUID | None
+    embedded_count: int
+
+
+class ChunkPartition(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    bound: str
+    approx_rows: int
@@ -1,16 +1,65 @@
 from __future__ import annotations
 
 import hashlib
+import io
 import re
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import cache
+from itertools import accumulate
+from operator import itemgetter, sub
+from typing import TYPE_CHECKING, Literal
 from uuid import UUID
 
 import structlog
 import tiktoken
 
-from indexing_service.domain.models import DocumentChunk, IndexedChunk
+from indexing_service.domain.models import (
+    DocumentChunk,
+    ExtractedPage,
+    IndexedChunk,
+    StoredChunk,
+)
+
+if TYPE_CHECKING:
+    from docx.text.paragraph import Paragraph
 
 logger = structlog.get_logger(__name__)
 
+_WHITESPACE_RE = re.compile(r"\s+")
+_PAGE_SEPARATOR = "\n\n"
+_TEXT_PAGE_CHARS = 3000
+
+ChunkingStrategy = Literal["token_window", "boundary"]
+
+# Chunk-end boundaries, strongest first. Each yields the character position a chunk
+# may end at; positions sit just before whitespace so the next chunk starts on it.
+_SECTION_BOUNDARY_RE = re.compile(
+    r"\n[ \t]*(?:(?:Section|SECTION|Article|ARTICLE|§)[ \t]*)?\d+(?:\.\d+)*[.)]?[ \t]"
+)
+_PARAGRAPH_BOUNDARY_RE = re.compile(r"\n[ \t]*\n")
+_SENTENCE_BOUNDARY_RE = re.compile(r"[.!?][\"'\u201d\u2019)\]]*(?=\s)")
+_CLAUSE_BOUNDARY_RE = re.compile(r"[;:,](?=\s)")
+_WORD_BOUNDARY_RE = re.compile(r"(?<=\S)\s")
+_UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+
+def normalize_chunk_text(text: str) -> str:
+    """Canonical form used for content hashing: NFKC, collapsed whitespace."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def chunk_content_hash(text: str, namespace: str = "") -> str:
+    """SHA-256 of the normalized chunk text, scoped by namespace (e.g. embedding model)."""
+    digest = hashlib.sha256()
+    digest.update(namespace.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_chunk_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
 
 class ChunkingService:
     """Token-aware text chunking with configurable size and overlap."""
@@ -32,65 +81,453 @@ class ChunkingService:
         text: str,
         page_number: int | None = None,
     ) -> list[DocumentChunk]:
-        tokens = self._enc.encode(text)
-        chunks: list[DocumentChunk] = []
+        return self.chunk_pages(
+            document_id, tenant_id, [ExtractedPage(page_number=page_number, text=text)]
+        )
+
+    def chunk_pages(
+        self,
+        document_id: UUID,
+        tenant_id: str,
+        pages: Iterable[ExtractedPage],
+    ) -> list[DocumentChunk]:
+        """Chunk a stream of pages without materialising the full document text.
+
+        Only the tokens of the current window are buffered. Page starts are
+        tracked as offsets into that buffer so each chunk records the page on
+        which it begins.
+        """
         step = self._chunk_size - self._overlap
-        chunk_index = 0
+        buffer: list[int] = []
+        # (offset into buffer, page_number) for each page that starts inside the buffer;
+        # the first mark is always at offset 0 and names the page of buffer[0].
+        page_marks: list[tuple[int, int | None]] = []
+        chunks: list[DocumentChunk] = []
+        token_count = 0
 
-        for start in range(0, len(tokens), step):
-            chunk_tokens = tokens[start : start + self._chunk_size]
-            if not chunk_tokens:
-                break
-            content = self._enc.decode(chunk_tokens)
+        for page in pages:
+            tokens = self._enc.encode(page.text) if page.text else []
+            if not tokens:
+                continue
+            if not buffer:
+                # With no overlap a chunk can consume the whole buffer; its mark is stale.
+                page_marks.clear()
+            page_marks.append((len(buffer), page.page_number))
+            buffer.extend(tokens)
+            token_count += len(tokens)
+
+            while len(buffer) >= self._chunk_size:
+                window = buffer[: self._chunk_size]
+                chunks.append(
+                    self._build_chunk(document_id, tenant_id, window, page_marks[0][1], len(chunks))
+                )
+                del buffer[:step]
+                page_marks = self._shift_marks(page_marks, step)
+
+        # The tail holds `overlap` already-emitted tokens; emit it only if it has new ones.
+        if buffer and (not chunks or len(buffer) > self._overlap):
+            chunks.append(
+                self._build_chunk(document_id, tenant_id, buffer, page_marks[0][1], len(chunks))
+            )
+
+        logger.debug(
+            "chunking.completed",
+            document_id=str(document_id),
+            token_count=token_count,
+            chunk_count=len(chunks),
+        )
+        return chunks
+
+    def _build_chunk(
+        self,
+        document_id: UUID,
+        tenant_id: str,
+        chunk_tokens: list[int],
+        page_number: int | None,
+        chunk_index: int,
+    ) -> DocumentChunk:
+        return DocumentChunk(
+            document_id=document_id,
+            tenant_id=tenant_id,
+            content=self._enc.decode(chunk_tokens),
+            page_number=page_number,
+            chunk_index=chunk_index,
+            token_count=len(chunk_tokens),
+        )
+
+    @staticmethod
+    def _shift_marks(
+        marks: list[tuple[int, int | None]], step: int
+    ) -> list[tuple[int, int | None]]:
+        shifted = [(offset - step, page) for offset, page in marks]
+        current_page = [page for offset, page in shifted if offset <= 0][-1]
+        return [(0, current_page)] + [(offset, page) for offset, page in shifted if offset > 0]
+
+
+class BoundaryAwareChunkingService(ChunkingService):
+    """Chunks that are slices of the original text, cut on structural boundaries.
+
+    Each page is decoded once and per-token character offsets come from a
+    per-encoding table of token widths; chunks are then cut by slicing that
+    text, so overlapping tokens are never decoded twice. A chunk ends at the
+    strongest boundary found in the last part of its token window (numbered
+    section heading > blank line > sentence > clause > word), and the overlap
+    for the next chunk is snapped to a sentence or word start.
+    """
+
+    _END_BOUNDARIES: tuple[tuple[re.Pattern[str], bool], ...] = (
+        # (pattern, boundary is at match start rather than match end)
+        (_SECTION_BOUNDARY_RE, True),
+        (_PARAGRAPH_BOUNDARY_RE, True),
+        (_SENTENCE_BOUNDARY_RE, False),
+        (_CLAUSE_BOUNDARY_RE, False),
+        (_WORD_BOUNDARY_RE, True),
+    )
+
+    def __init__(
+        self,
+        chunk_size_tokens: int = 512,
+        overlap_tokens: int = 64,
+        encoding_name: str = "cl100k_base",
+        min_chunk_ratio: float = 0.6,
+    ) -> None:
+        super().__init__(chunk_size_tokens, overlap_tokens, encoding_name)
+        self._min_chunk_tokens = max(1, int(chunk_size_tokens * min_chunk_ratio))
+        self._char_widths, self._continues_char = _token_widths(encoding_name)
+
+    def chunk_pages(
+        self,
+        document_id: UUID,
+        tenant_id: str,
+        pages: Iterable[ExtractedPage],
+    ) -> list[DocumentChunk]:
+        text = ""
+        offsets: list[int] = []  # character offset into `text` of each buffered token
+        start = 0  # index in `offsets` of the first token of the next chunk
+        page_marks: list[tuple[int, int | None]] = []  # (character offset, page_number)
+        carried = 0  # tokens from `start` on already emitted as overlap
+        chunks: list[DocumentChunk] = []
+        token_count = 0
+
+        for page in pages:
+            tokens = self._enc.encode(page.text) if page.text else []
+            if not tokens:
+                continue
+            # Drop what earlier chunks consumed once per page, not once per chunk.
+            if start:
+                cut = offsets[start]
+                text = text[cut:]
+                offsets = [offset - cut for offset in offsets[start:]]
+                page_marks = self._shift_marks(page_marks, cut)
+                start = 0
+            page_text = self._enc.decode(tokens)
+            page_marks.append((len(text), page.page_number))
+            offsets.extend(self._token_offsets(tokens, len(text), page_text.isascii()))
+            text += page_text
+            token_count += len(tokens)
+
+            # offsets[start + chunk_size] must exist to know where the full window ends.
+            while len(offsets) - start > self._chunk_size:
+                end = self._find_chunk_end(text, offsets, start)
+                chunks.append(
+                    self._slice_chunk(
+                        document_id, tenant_id, text, offsets, start, end, page_marks, len(chunks)
+                    )
+                )
+                next_start = self._find_overlap_start(text, offsets, start, end)
+                carried = end - next_start
+                start = next_start
+
+        if len(offsets) > start and (not chunks or len(offsets) - start > carried):
             chunks.append(
-                DocumentChunk(
-                    document_id=document_id,
-                    tenant_id=tenant_id,
-                    content=content,
-                    page_number=page_number,
-                    chunk_index=chunk_index,
-                    token_count=len(chunk_tokens),
+                self._slice_chunk(
+                    document_id,
+                    tenant_id,
+                    text,
+                    offsets,
+                    start,
+                    len(offsets),
+                    page_marks,
+                    len(chunks),
                 )
             )
-            chunk_index += 1
 
         logger.debug(
             "chunking.completed",
             document_id=str(document_id),
-            token_count=len(tokens),
+            token_count=token_count,
             chunk_count=len(chunks),
+            strategy="boundary",
         )
         return chunks
 
+    def _token_offsets(self, tokens: list[int], base: int, ascii_only: bool) -> list[int]:
+        """Character offset of each token, as Encoding.decode_with_offsets computes them."""
+        offsets = list(accumulate(map(self._char_widths.__getitem__, tokens), initial=base))
+        offsets.pop()
+        if ascii_only:
+            return offsets
+        # A token that starts inside a multi-byte character is placed on that character.
+        return list(map(sub, offsets, map(self._continues_char.__getitem__, tokens)))
+
+    def _find_chunk_end(self, text: str, offsets: list[int], start: int) -> int:
+        lo = offsets[start + self._min_chunk_tokens]
+        hi = offsets[start + self._chunk_size]
+        for pattern, at_start in self._END_BOUNDARIES:
+            position = None
+            for match in pattern.finditer(text, lo, hi + 1):
+                candidate = match.start() if at_start else match.end()
+                if lo < candidate <= hi:
+                    position = candidate
+            if position is not None:
+                end = bisect_left(
+                    offsets,
+                    position,
+                    start + self._min_chunk_tokens,
+                    start + self._chunk_size,
+                )
+                return end
+        return start + self._chunk_size
+
+    def _find_overlap_start(self, text: str, offsets: list[int], start: int, end: int) -> int:
+        if self._overlap == 0:
+            return end
+        target = max(start + 1, end - self._overlap)
+        lo, hi = offsets[target], offsets[end]
+        for pattern in (_SENTENCE_BOUNDARY_RE, _WORD_BOUNDARY_RE):
+            match = pattern.search(text, lo, hi)
+            if match:
+                position = match.end() if pattern is _SENTENCE_BOUNDARY_RE else match.start()
+                return bisect_left(offsets, position, start + 1, end)
+        return target
+
+    def _slice_chunk(
+        self,
+        document_id: UUID,
+        tenant_id: str,
+        text: str,
+        offsets: list[int],
+        start: int,
+        end: int,
+        page_marks: list[tuple[int, int | None]],
+        chunk_index: int,
+    ) -> DocumentChunk:
+        char_start = offsets[start]
+        char_end = offsets[end] if end < len(offsets) else len(text)
+        return DocumentChunk(
+            document_id=document_id,
+            tenant_id=tenant_id,
+            content=text[char_start:char_end],
+            page_number=_page_at(page_marks, char_start),
+            chunk_index=chunk_index,
+            token_count=end - start,
+        )
+
+
+@cache
+def _token_widths(encoding_name: str) -> tuple[list[int], list[int]]:
+    """Per token id: characters it starts, and 1 if it begins inside a character."""
+    encoding = tiktoken.get_encoding(encoding_name)
+    char_widths = [0] * (encoding.max_token_value + 1)
+    continues_char = [0] * (encoding.max_token_value + 1)
+    for token in range(encoding.max_token_value + 1):
+        try:
+            token_bytes = encoding.decode_single_token_bytes(token)
+        except KeyError:  # unused ids between the ranks and the special tokens
+            continue
+        char_widths[token] = len(token_bytes.translate(None, _UTF8_CONTINUATION_BYTES))
+        continues_char[token] = int(0x80 <= token_bytes[0] < 0xC0)
+    return char_widths, continues_char
+
+
+def _page_at(page_marks: list[tuple[int, int | None]], position: int) -> int | None:
+    return page_marks[bisect_right(page_marks, position, key=itemgetter(0)) - 1][1]
+
+
+def build_chunker(
+    strategy: ChunkingStrategy,
+    chunk_size_tokens: int,
+    overlap_tokens: int,
+) -> ChunkingService:
+    if strategy == "boundary":
+        return BoundaryAwareChunkingService(
+            chunk_size_tokens=chunk_size_tokens,
+            overlap_tokens=overlap_tokens,
+        )
+    return ChunkingService(chunk_size_tokens=chunk_size_tokens, overlap_tokens=overlap_tokens)
+
 
 class TextExtractionService:
-    """Extracts plain text from supported document formats."""
+    """Extracts plain text from supported document formats, one page at a time."""
 
-    def extract_from_pdf(self, content: bytes) -> tuple[str, int]:
+    def iter_pdf_pages(self, content: bytes) -> Iterator[ExtractedPage]:
         from pypdf import PdfReader
-        import io
 
         reader = PdfReader(io.BytesIO(content))
-        pages = [page.extract_text() or "" for page in reader.pages]
-        return "\n\n".join(pages), len(reader.pages)
+        for number, page in enumerate(reader.pages, start=1):
+            text = page.extract_text() or ""
+            yield ExtractedPage(
+                page_number=number,
+                text=text if number == 1 else _PAGE_SEPARATOR + text,
+            )
 
-    def extract_from_docx(self, content: bytes) -> tuple[str, int]:
+    def iter_docx_pages(self, content: bytes) -> Iterator[ExtractedPage]:
+        """DOCX has no fixed layout; pages are split on explicit and last-rendered page breaks."""
         from docx import Document
-        import io
 
         doc = Document(io.BytesIO(content))
-        paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-        return "\n\n".join(paragraphs), len(doc.paragraphs)
+        number = 1
+        paragraphs: list[str] = []
+        for paragraph in doc.paragraphs:
+            if paragraphs and _starts_new_page(paragraph):
+                yield self._docx_page(number, paragraphs)
+                number += 1
+                paragraphs = []
+            if paragraph.text.strip():
+                paragraphs.append(paragraph.text)
+        if paragraphs or number == 1:
+            yield self._docx_page(number, paragraphs)
 
-    def extract_from_text(self, content: bytes) -> tuple[str, int]:
+    def iter_text_pages(self, content: bytes) -> Iterator[ExtractedPage]:
+        """Plain text has no pages; it is sliced into ~3000-character pages on line breaks."""
         text = content.decode("utf-8", errors="replace")
-        page_count = max(1, len(text) // 3000)
-        return text, page_count
+        number = 1
+        start = 0
+        while True:
+            end = min(start + _TEXT_PAGE_CHARS, len(text))
+            if end < len(text):
+                line_break = text.rfind("\n", start, end)
+                if line_break > start:
+                    end = line_break + 1
+            yield ExtractedPage(page_number=number, text=text[start:end])
+            start = end
+            number += 1
+            if start >= len(text):
+                break
 
-    def extract(self, content: bytes, content_type: str) -> tuple[str, int]:
+    def iter_pages(self, content: bytes, content_type: str) -> Iterator[ExtractedPage]:
         if "pdf" in content_type:
-            return self.extract_from_pdf(content)
+            return self.iter_pdf_pages(content)
         elif "wordprocessingml" in content_type:
-            return self.extract_from_docx(content)
+            return self.iter_docx_pages(content)
         else:
-            return self.extract_from_text(content)
+            return self.iter_text_pages(content)
+
+    def extract(self, content: bytes, content_type: str) -> tuple[str, int]:
+        pages = list(self.iter_pages(content, content_type))
+        return "".join(page.text for page in pages), len(pages)
+
+    @staticmethod
+    def _docx_page(number: int, paragraphs: list[str]) -> ExtractedPage:
+        text = _PAGE_SEPARATOR.join(paragraphs)
+        if number > 1:
+            text = _PAGE_SEPARATOR + text
+        return ExtractedPage(page_number=number, text=text)
+
+
+def _starts_new_page(paragraph: Paragraph) -> bool:
+    from docx.oxml.ns import qn
+
+    element = paragraph._p  # python-docx has no public API for page breaks
+    if element.find(f"{qn('w:pPr')}/{qn('w:pageBreakBefore')}") is not None:
+        return True
+    if next(element.iter(qn("w:lastRenderedPageBreak")), None) is not None:
+        return True
+    return any(br.get(qn("w:type")) == "page" for br in element.iter(qn("w:br")))
+
+
+@dataclass(frozen=True)
+class ExtractedDocument:
+    chunks: list[DocumentChunk]
+    page_count: int
+    # Stage timings and sizes, measured where the work ran (possibly a worker process).
+    read_seconds: float = 0.0
+    extract_seconds: float = 0.0
+    chunk_seconds: float = 0.0
+    content_bytes: int = 0
+    text_bytes: int = 0
+
+
+class _PageCounter:
+    """Counts pages and the time spent producing them inside the extractor."""
+
+    def __init__(self, pages: Iterable[ExtractedPage]) -> None:
+        self._pages = iter(pages)
+        self.count = 0
+        self.seconds = 0.0
+        self.text_bytes = 0
+
+    def __iter__(self) -> Iterator[ExtractedPage]:
+        while True:
+            started = time.perf_counter()
+            page = next(self._pages, None)
+            self.seconds += time.perf_counter() - started
+            if page is None:
+                return
+            self.count += 1
+            self.text_bytes += len(page.text.encode("utf-8"))
+            yield page
+
+
+def extract_and_chunk(
+    extractor: TextExtractionService,
+    chunker: ChunkingService,
+    content: bytes,
+    content_type: str,
+    document_id: UUID,
+    tenant_id: str,
+) -> ExtractedDocument:
+    """CPU-bound extract + tokenize stage; inputs and output are picklable.
+
+    Pages are streamed from the extractor straight into the chunker, so the
+    full document text is never held in memory.
+    """
+    started = time.perf_counter()
+    pages = _PageCounter(extractor.iter_pages(content, content_type))
+    chunks = chunker.chunk_pages(document_id, tenant_id, pages)
+    elapsed = time.perf_counter() - started
+    return ExtractedDocument(
+        chunks=chunks,
+        page_count=max(1, pages.count),
+        extract_seconds=pages.seconds,
+        chunk_seconds=elapsed - pages.seconds,
+        content_bytes=len(content),
+        text_bytes=pages.text_bytes,
+    )
+
+
+@dataclass(frozen=True)
+class ReindexPlan:
+    """How a revised document's chunks map onto the previous version's rows."""
+
+    reused: list[tuple[UUID, DocumentChunk]]
+    changed: list[DocumentChunk]
+    obsolete: list[UUID]
+
+
+def plan_reindex(
+    chunks: list[DocumentChunk], previous: Iterable[StoredChunk], namespace: str
+) -> ReindexPlan:
+    """Match new chunks to stored ones by content hash.
+
+    Each stored row is reused at most once, so repeated boilerplate clauses map
+    one-to-one. New chunks without a match need embedding; stored rows left
+    unmatched are obsolete.
+    """
+    available: dict[str, list[UUID]] = {}
+    for stored in previous:
+        available.setdefault(chunk_content_hash(stored.content, namespace), []).append(
+            stored.chunk_id
+        )
+
+    reused: list[tuple[UUID, DocumentChunk]] = []
+    changed: list[DocumentChunk] = []
+    for chunk in chunks:
+        candidates = available.get(chunk_content_hash(chunk.content, namespace))
+        if candidates:
+            reused.append((candidates.pop(), chunk))
+        else:
+            changed.append(chunk)
+
+    obsolete = [chunk_id for ids in available.values() for chunk_id in ids]
+    return ReindexPlan(reused=reused, changed=changed, obsolete=obsolete)
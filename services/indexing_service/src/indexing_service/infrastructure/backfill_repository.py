@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any, get_args
+from uuid import UUID
+
+import structlog
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from indexing_service.domain.models import EmbeddingMigration, StoredChunk
+from indexing_service.infrastructure.pgvector_codec import register_vector_codec
+from shared.schemas.documents import EmbeddingColumn, EmbeddingModel
+
+logger = structlog.get_logger(__name__)
+
+_ACTIVE_MODEL_SQL = """
+    SELECT target_model, embedding_column, dimensions
+    FROM embedding_migrations
+    WHERE status = 'active'
+    ORDER BY activated_at DESC
+    LIMIT 1
+"""
+
+_SELECT_MIGRATION_SQL = """
+    SELECT target_model, status, embedding_column, dimensions, cursor_chunk_id, embedded_count
+    FROM embedding_migrations
+    WHERE target_model = :target_model
+"""
+
+_START_MIGRATION_SQL = """
+    INSERT INTO embedding_migrations (target_model, embedding_column, dimensions)
+    VALUES (:target_model, :embedding_column, :dimensions)
+    ON CONFLICT (target_model) DO NOTHING
+"""
+
+_RESTART_MIGRATION_SQL = """
+    UPDATE embedding_migrations
+    SET status = 'backfilling',
+        embedding_column = :embedding_column,
+        cursor_chunk_id = NULL,
+        embedded_count = 0,
+        started_at = NOW(),
+        updated_at = NOW(),
+        activated_at = NULL
+    WHERE target_model = :target_model
+"""
+
+# {column} is the migration's slot. The statements are formatted once per name in
+# EmbeddingColumn, and looked up by slot, so no other text can reach the SQL.
+_COVERAGE_SQL = """
+    SELECT
+        count(*) AS total,
+        count(*) FILTER (WHERE {column}_model IS DISTINCT FROM :target_model) AS uncovered
+    FROM document_chunks
+"""
+
+# Keyset pagination on the chunk ID; the same query drives the follow-up
+# passes once the target is active.
+_NEXT_BATCH_SQL = """
+    SELECT id AS chunk_id, tenant_id, content
+    FROM document_chunks
+    WHERE id > :cursor
+      AND {column}_model IS DISTINCT FROM :target_model
+    ORDER BY id
+    LIMIT :limit
+"""
+
+# Chunks deleted since the batch was read match no row and are skipped.
+_SAVE_BATCH_SQL = """
+    UPDATE document_chunks
+    SET {column} = CAST(:embedding AS vector),
+        {column}_model = :embedding_model
+    WHERE tenant_id = :tenant_id AND id = :chunk_id
+"""
+
+_CHECKPOINT_SQL = """
+    UPDATE embedding_migrations
+    SET cursor_chunk_id = :cursor,
+        embedded_count = embedded_count + :embedded,
+        updated_at = NOW()
+    WHERE target_model = :target_model
+"""
+
+_ACTIVATE_MIGRATION_SQL = """
+    UPDATE embedding_migrations
+    SET status = 'active',
+        cursor_chunk_id = NULL,
+        activated_at = NOW(),
+        updated_at = NOW()
+    WHERE target_model = :target_model
+"""
+
+
+def _on_connect(dbapi_connection: Any, _connection_record: Any) -> None:
+    dbapi_connection.run_async(register_vector_codec)
+
+
+class EmbeddingBackfillRepository:
+    """Storage side of an embedding-model migration.
+
+    Target-model vectors are written to the document_chunks slot the active
+    model is not using, with the keyset checkpoint committed in the same
+    transaction, so a restarted worker resumes exactly where the last batch
+    ended and retrieval keeps searching the active slot meanwhile.
+    """
+
+    def __init__(self, database_url: str) -> None:
+        self._engine: AsyncEngine = create_async_engine(
+            database_url, pool_size=2, max_overflow=0
+        )
+        event.listen(self._engine.sync_engine, "connect", _on_connect)
+        columns: tuple[EmbeddingColumn, ...] = get_args(EmbeddingColumn)
+        self._coverage_sql = {c: text(_COVERAGE_SQL.format(column=c)) for c in columns}
+        self._next_batch_sql = {c: text(_NEXT_BATCH_SQL.format(column=c)) for c in columns}
+        self._save_batch_sql = {c: text(_SAVE_BATCH_SQL.format(column=c)) for c in columns}
+
+    async def active_embedding_model(self) -> EmbeddingModel | None:
+        async with self._engine.connect() as conn:
+            return await self._active_model(conn)
+
+    async def get_migration(self, target_model: str) -> EmbeddingMigration | None:
+        async with self._engine.connect() as conn:
+            row = (
+                await conn.execute(text(_SELECT_MIGRATION_SQL), {"target_model": target_model})
+            ).mappings().first()
+        return EmbeddingMigration(**row) if row else None
+
+    async def start_migration(
+        self, target_model: str, dimensions: int | None
+    ) -> EmbeddingMigration:
+        """Create or resume the migration row for target_model.
+
+        The target gets the slot the active model is not using. A row that was
+        activated earlier but has since been superseded by another model, or
+        whose slot another model has taken over, starts over from the beginning.
+        """
+        async with self._engine.begin() as conn:
+            active = await self._active_model(conn)
+            params = {
+                "target_model": target_model,
+                "embedding_column": _other_column(active.column if active else "embedding"),
+                "dimensions": dimensions,
+            }
+            await conn.execute(text(_START_MIGRATION_SQL), params)
+            row = (await conn.execute(text(_SELECT_MIGRATION_SQL), params)).mappings().one()
+            if active is not None and active.name == target_model:
+                return EmbeddingMigration(**row)
+            if row["status"] == "active" or row["embedding_column"] != params["embedding_column"]:
+                await conn.execute(text(_RESTART_MIGRATION_SQL), params)
+                row = (
+                    await conn.execute(text(_SELECT_MIGRATION_SQL), params)
+                ).mappings().one()
+        return EmbeddingMigration(**row)
+
+    async def coverage(self, migration: EmbeddingMigration) -> tuple[int, int]:
+        """(total chunks, chunks with no target-model vector yet)."""
+        async with self._engine.connect() as conn:
+            return await self._coverage(conn, migration)
+
+    async def next_batch(
+        self, migration: EmbeddingMigration, cursor: UUID, limit: int
+    ) -> list[StoredChunk]:
+        async with self._engine.connect() as conn:
+            result = await conn.execute(
+                self._next_batch_sql[migration.embedding_column],
+                {"target_model": migration.target_model, "cursor": cursor, "limit": limit},
+            )
+            return [StoredChunk(**row) for row in result.mappings()]
+
+    async def save_batch(
+        self,
+        migration: EmbeddingMigration,
+        chunks: Sequence[StoredChunk],
+        embeddings: Sequence[list[float]],
+        checkpoint: bool = True,
+    ) -> None:
+        """Store one batch of target-model vectors in the migration's slot.
+
+        With checkpoint the keyset cursor advances in the same transaction;
+        the follow-up passes after cutover keep no cursor.
+        """
+        rows = [
+            {
+                "tenant_id": chunk.tenant_id,
+                "chunk_id": chunk.chunk_id,
+                "embedding_model": migration.target_model,
+                "embedding": embedding,
+            }
+            for chunk, embedding in zip(chunks, embeddings, strict=True)
+        ]
+        async with self._engine.begin() as conn:
+            await conn.execute(
+                self._save_batch_sql[migration.embedding_column], rows
+            )
+            await conn.execute(
+                text(_CHECKPOINT_SQL),
+                {
+                    "target_model": migration.target_model,
+                    "cursor": chunks[-1].chunk_id if checkpoint else None,
+                    "embedded": len(rows),
+                },
+            )
+
+    async def restart_pass(self, migration: EmbeddingMigration) -> None:
+        async with self._engine.begin() as conn:
+            await conn.execute(
+                text(_CHECKPOINT_SQL),
+                {"target_model": migration.target_model, "cursor": None, "embedded": 0},
+            )
+
+    async def cut_over(self, migration: EmbeddingMigration, lock_timeout_ms: int) -> bool:
+        """Activate the target model once its slot covers every chunk.
+
+        No vectors move: the transaction holds a lock that blocks chunk writes
+        but not reads just long enough to re-check coverage and flip the
+        active row. Returns False when chunks written since the last coverage
+        check are still missing a target-model vector.
+        """
+        async with self._engine.begin() as conn:
+            await conn.execute(
+                text("SELECT set_config('lock_timeout', :timeout, true)"),
+                {"timeout": f"{lock_timeout_ms}ms"},
+            )
+            await conn.execute(text("LOCK TABLE document_chunks IN SHARE ROW EXCLUSIVE MODE"))
+            _, uncovered = await self._coverage(conn, migration)
+            if uncovered:
+                return False
+            await conn.execute(
+                text(_ACTIVATE_MIGRATION_SQL), {"target_model": migration.target_model}
+            )
+
+        logger.info(
+            "backfill.cutover.completed",
+            target_model=migration.target_model,
+            embedding_column=migration.embedding_column,
+        )
+        return True
+
+    async def dispose(self) -> None:
+        await self._engine.dispose()
+
+    async def _active_model(self, conn: AsyncConnection) -> EmbeddingModel | None:
+        row = (await conn.execute(text(_ACTIVE_MODEL_SQL))).mappings().first()
+        return (
+            EmbeddingModel(
+                name=row["target_model"],
+                column=row["embedding_column"],
+                dimensions=row["dimensions"],
+            )
+            if row
+            else None
+        )
+
+    async def _coverage(
+        self, conn: AsyncConnection, migration: EmbeddingMigration
+    ) -> tuple[int, int]:
+        row = (
+            await conn.execute(
+                self._coverage_sql[migration.embedding_column],
+                {"target_model": migration.target_model},
+            )
+        ).mappings().one()
+        return int(row["total"]), int(row["uncovered"])
+
+
+def _other_column(column: EmbeddingColumn) -> EmbeddingColumn:
+    return "embedding_alt" if column == "embedding" else "embedding"
@@ -2,53 +2,171 @@ from __future__ import annotations
 
 import asyncio
 import json
-from collections.abc import Callable, Coroutine
+import time
+from collections.abc import Awaitable, Callable, Coroutine
 from typing import Any
 
 import structlog
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, ConsumerRecord, TopicPartition
+from aiokafka.abc import ConsumerRebalanceListener
 from aiokafka.errors import KafkaError
+from pydantic import BaseModel, ConfigDict
+
+from indexing_service.infrastructure.retry import NOT_BEFORE_HEADER, header_value
 
 logger = structlog.get_logger(__name__)
 
-MessageHandler = Callable[[dict[str, Any]], Coroutine[Any, Any, None]]
+# A handler may return an awaitable for work it started but did not wait on,
+# e.g. the broker ack of a pipelined publish.
+MessageHandler = Callable[[dict[str, Any]], Coroutine[Any, Any, Awaitable[Any] | None]]
+FailureHandler = Callable[[ConsumerRecord, Exception], Awaitable[None]]
+
+
+class PartitionStats(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    partition: int
+    outstanding: int
+    failed: int
+    committed_offset: int | None
+
+
+class ConsumerStats(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    topic: str
+    max_concurrency: int
+    max_pending: int
+    in_flight: int
+    queue_depth: int
+    processed_total: int
+    failed_total: int
+    handed_off_total: int
+    partitions: list[PartitionStats]
+
+
+class _PartitionTracker:
+    """Offset bookkeeping for a single partition.
+
+    Messages complete out of order, so the safe commit point is the lowest
+    offset that is still running or has failed — never past it.
+    """
+
+    def __init__(self) -> None:
+        self.outstanding: set[int] = set()
+        self.failed: set[int] = set()
+        self.next_offset: int | None = None
+        self.committed: int | None = None
+        self.tasks: set[asyncio.Task[None]] = set()
+
+    def dispatch(self, offset: int) -> None:
+        self.outstanding.add(offset)
+        self.next_offset = offset + 1
+
+    def complete(self, offset: int, success: bool) -> None:
+        self.outstanding.discard(offset)
+        if not success:
+            self.failed.add(offset)
+
+    def commit_point(self) -> int | None:
+        blocked = self.outstanding | self.failed
+        if blocked:
+            return min(blocked)
+        return self.next_offset
+
+
+class _RebalanceListener(ConsumerRebalanceListener):
+    def __init__(
+        self, on_revoked: Callable[[set[TopicPartition]], Awaitable[None]]
+    ) -> None:
+        self._on_revoked = on_revoked
+
+    async def on_partitions_revoked(self, revoked: set[TopicPartition]) -> None:
+        await self._on_revoked(set(revoked))
+
+    async def on_partitions_assigned(self, assigned: set[TopicPartition]) -> None:
+        return None
 
 
 class RedpandaConsumer:
+    """Consumes a topic with a bounded pool of concurrent handlers.
+
+    Messages whose payloads share the same ordering_field value (e.g. the same
+    document_id) are handled sequentially in offset order; all other messages run
+    in parallel up to max_concurrency. The Kafka key is not used for this: it is
+    the tenant_id, and chaining on it would serialize each tenant.
+    Offsets are committed per partition up to the highest contiguous completed
+    offset, so a failed or unfinished message is always redelivered — unless
+    on_failure hands it off (e.g. to a retry topic), which counts as done. An
+    awaitable returned by the handler is awaited after its worker slot is freed
+    and before the offset counts as done; if it fails, so does the message.
+
+    A message whose x-not-before-ms header is in the future pauses its partition
+    until then and is re-read on resume, which is how retry-tier consumers
+    implement their delay. Polling, heartbeats and other partitions carry on.
+    """
+
     def __init__(
         self,
         bootstrap_servers: str,
         topic: str,
         group_id: str,
         handler: MessageHandler,
+        max_concurrency: int = 4,
+        max_pending: int = 32,
+        drain_timeout_seconds: float = 30.0,
+        on_failure: FailureHandler | None = None,
+        ordering_field: str | None = None,
     ) -> None:
         self._bootstrap_servers = bootstrap_servers
         self._topic = topic
         self._group_id = group_id
         self._handler = handler
+        self._max_concurrency = max_concurrency
+        self._max_pending = max_pending
+        self._drain_timeout_seconds = drain_timeout_seconds
+        self._on_failure = on_failure
+        self._ordering_field = ordering_field
         self._consumer: AIOKafkaConsumer | None = None
         self._running = False
 
+        self._workers = asyncio.Semaphore(max_concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+        self._commit_lock = asyncio.Lock()
+        self._trackers: dict[TopicPartition, _PartitionTracker] = {}
+        self._key_tails: dict[str, asyncio.Task[None]] = {}
+        self._resume_handles: dict[TopicPartition, asyncio.TimerHandle] = {}
+        self._accepted = 0
+        self._in_flight = 0
+        self._processed_total = 0
+        self._failed_total = 0
+        self._handed_off_total = 0
+
     async def start(self) -> None:
         self._consumer = AIOKafkaConsumer(
-            self._topic,
             bootstrap_servers=self._bootstrap_servers,
             group_id=self._group_id,
             auto_offset_reset="earliest",
             enable_auto_commit=False,
             value_deserializer=lambda v: json.loads(v.decode("utf-8")),
         )
+        self._consumer.subscribe(
+            [self._topic], listener=_RebalanceListener(self._drain_partitions)
+        )
         await self._consumer.start()
         self._running = True
         logger.info(
             "consumer.started",
             topic=self._topic,
             group_id=self._group_id,
+            max_concurrency=self._max_concurrency,
+            max_pending=self._max_pending,
         )
 
     async def stop(self) -> None:
         self._running = False
         if self._consumer:
+            await self._drain_partitions(set(self._trackers) | set(self._resume_handles))
             await self._consumer.stop()
             logger.info("consumer.stopped")
 
@@ -59,15 +177,204 @@ class RedpandaConsumer:
         async for message in self._consumer:
             if not self._running:
                 break
+            if self._pause_until_due(message):
+                continue
+            await self._pending.acquire()
+            self._dispatch(message)
+
+    def stats(self) -> ConsumerStats:
+        return ConsumerStats(
+            topic=self._topic,
+            max_concurrency=self._max_concurrency,
+            max_pending=self._max_pending,
+            in_flight=self._in_flight,
+            queue_depth=self._accepted - self._in_flight,
+            processed_total=self._processed_total,
+            failed_total=self._failed_total,
+            handed_off_total=self._handed_off_total,
+            partitions=[
+                PartitionStats(
+                    partition=tp.partition,
+                    outstanding=len(tracker.outstanding),
+                    failed=len(tracker.failed),
+                    committed_offset=tracker.committed,
+                )
+                for tp, tracker in sorted(self._trackers.items(), key=lambda i: i[0].partition)
+            ],
+        )
+
+    def _dispatch(self, message: ConsumerRecord) -> None:
+        tp = TopicPartition(message.topic, message.partition)
+        tracker = self._trackers.setdefault(tp, _PartitionTracker())
+        tracker.dispatch(message.offset)
+
+        key = self._ordering_key(message)
+        predecessor = self._key_tails.get(key) if key is not None else None
+        task = asyncio.create_task(self._process(message, tp, key, predecessor))
+        tracker.tasks.add(task)
+        task.add_done_callback(tracker.tasks.discard)
+        if key is not None:
+            self._key_tails[key] = task
+        self._accepted += 1
+
+    async def _process(
+        self,
+        message: ConsumerRecord,
+        tp: TopicPartition,
+        key: str | None,
+        predecessor: asyncio.Task[None] | None,
+    ) -> None:
+        try:
+            if predecessor is not None:
+                # Preserve per-document ordering; the predecessor's outcome is irrelevant here.
+                await asyncio.wait([predecessor])
+
+            pending_work: Awaitable[Any] | None = None
+            async with self._workers:
+                self._in_flight += 1
+                try:
+                    pending_work = await self._handler(message.value)
+                    success = True
+                except Exception as exc:
+                    success = await self._fail(message, exc)
+                finally:
+                    self._in_flight -= 1
+
+            if pending_work is not None:
+                try:
+                    await pending_work
+                except Exception as exc:
+                    success = await self._fail(message, exc)
+
+            await self._complete(tp, message.offset, success)
+        finally:
+            self._accepted -= 1
+            self._pending.release()
+            if key is not None and self._key_tails.get(key) is asyncio.current_task():
+                del self._key_tails[key]
+
+    def _ordering_key(self, message: ConsumerRecord) -> str | None:
+        if self._ordering_field is None or not isinstance(message.value, dict):
+            return None
+        value = message.value.get(self._ordering_field)
+        return None if value is None else str(value)
+
+    async def _fail(self, message: ConsumerRecord, error: Exception) -> bool:
+        logger.error(
+            "consumer.message.processing_failed",
+            topic=message.topic,
+            partition=message.partition,
+            offset=message.offset,
+            error=str(error),
+            exc_info=True,
+        )
+        return await self._hand_off(message, error)
+
+    async def _hand_off(self, message: ConsumerRecord, error: Exception) -> bool:
+        if self._on_failure is None:
+            return False
+        try:
+            await self._on_failure(message, error)
+        except Exception as exc:  # noqa: BLE001
+            logger.error(
+                "consumer.message.hand_off_failed",
+                topic=message.topic,
+                partition=message.partition,
+                offset=message.offset,
+                error=str(exc),
+            )
+            return False
+        self._handed_off_total += 1
+        return True
+
+    def _pause_until_due(self, message: ConsumerRecord) -> bool:
+        not_before = header_value(message, NOT_BEFORE_HEADER)
+        if not not_before or not not_before.isdigit():
+            return False
+        delay = int(not_before) / 1000 - time.time()
+        if delay <= 0:
+            return False
+        # Retry topics are filled in due order, so holding the head holds the rest.
+        tp = TopicPartition(message.topic, message.partition)
+        self._consumer.pause(tp)
+        self._consumer.seek(tp, message.offset)
+        self._resume_handles[tp] = asyncio.get_running_loop().call_later(
+            delay, self._resume, tp
+        )
+        return True
+
+    def _resume(self, tp: TopicPartition) -> None:
+        self._resume_handles.pop(tp, None)
+        if self._consumer and tp in self._consumer.assignment():
+            self._consumer.resume(tp)
+
+    async def _complete(self, tp: TopicPartition, offset: int, success: bool) -> None:
+        tracker = self._trackers.get(tp)
+        if tracker is None:
+            # Partition was revoked while the message was in flight.
+            return
+
+        tracker.complete(offset, success)
+        if success:
+            self._processed_total += 1
+        else:
+            self._failed_total += 1
+            # Do not commit past this offset — message will be redelivered
+            logger.warning(
+                "consumer.partition.commit_blocked",
+                topic=tp.topic,
+                partition=tp.partition,
+                offset=offset,
+            )
+
+        await self._commit(tp)
+
+    async def _commit(self, tp: TopicPartition) -> None:
+        if not self._consumer:
+            return
+
+        async with self._commit_lock:
+            tracker = self._trackers.get(tp)
+            if tracker is None:
+                return
+            point = tracker.commit_point()
+            if point is None or (tracker.committed is not None and point <= tracker.committed):
+                return
             try:
-                await self._handler(message.value)
-                await self._consumer.commit()
-            except Exception as exc:
-                logger.error(
-                    "consumer.message.processing_failed",
-                    topic=message.topic,
-                    offset=message.offset,
+                await self._consumer.commit({tp: point})
+            except KafkaError as exc:
+                logger.warning(
+                    "consumer.commit.failed",
+                    topic=tp.topic,
+                    partition=tp.partition,
+                    offset=point,
                     error=str(exc),
-                    exc_info=True,
                 )
-                # Do not commit — message will be redelivered
+                return
+            tracker.committed = point
+
+    async def _drain_partitions(self, partitions: set[TopicPartition]) -> None:
+        tasks = {
+            task
+            for tp in partitions
+            if (tracker := self._trackers.get(tp)) is not None
+            for task in tracker.tasks
+        }
+        if tasks:
+            _, still_running = await asyncio.wait(tasks, timeout=self._drain_timeout_seconds)
+            for task in still_running:
+                task.cancel()
+            if still_running:
+                logger.warning("consumer.drain.timed_out", cancelled=len(still_running))
+
+        for tp in partitions:
+            if (handle := self._resume_handles.pop(tp, None)) is not None:
+                handle.cancel()
+            await self._commit(tp)
+            self._trackers.pop(tp, None)
+
+        if partitions:
+            logger.info(
+                "consumer.partitions.drained",
+                partitions=sorted(tp.partition for tp in partitions),
+            )
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import structlog
+
+from indexing_service.domain.models import DocumentChunk
+from indexing_service.infrastructure.embedding_client import EmbeddingClient
+from shared.schemas.documents import EmbeddingModel
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class _PendingText:
+    text: str
+    token_count: int
+    model: EmbeddingModel | None
+    future: asyncio.Future[list[float]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class EmbeddingBatcher:
+    """Packs chunks from all in-flight documents into shared embedding requests.
+
+    A request is flushed when it reaches max_items or max_tokens, or when the
+    oldest queued chunk has waited max_wait_ms, and before a chunk for a
+    different model. Each caller gets back the vectors for its own chunks, in
+    order.
+    """
+
+    def __init__(
+        self,
+        client: EmbeddingClient,
+        max_items: int = 256,
+        max_tokens: int = 64_000,
+        max_wait_ms: int = 20,
+        max_concurrent_requests: int = 4,
+    ) -> None:
+        self._client = client
+        self._max_items = max_items
+        self._max_tokens = max_tokens
+        self._max_wait_s = max_wait_ms / 1000
+        self._queue: asyncio.Queue[_PendingText] = asyncio.Queue()
+        self._requests = asyncio.Semaphore(max_concurrent_requests)
+        self._carry: _PendingText | None = None
+        self._loop_task: asyncio.Task[None] | None = None
+        self._send_tasks: set[asyncio.Task[None]] = set()
+
+    async def start(self) -> None:
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info(
+            "embedding.batcher.started",
+            max_items=self._max_items,
+            max_tokens=self._max_tokens,
+            max_wait_ms=int(self._max_wait_s * 1000),
+        )
+
+    async def stop(self) -> None:
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        if self._send_tasks:
+            await asyncio.gather(*self._send_tasks, return_exceptions=True)
+        # Fail what was never sent so no caller waits on it forever.
+        unsent = [self._carry] if self._carry else []
+        self._carry = None
+        while not self._queue.empty():
+            unsent.append(self._queue.get_nowait())
+        _fail(unsent, RuntimeError("Embedding batcher stopped."))
+        logger.info("embedding.batcher.stopped", unsent_count=len(unsent))
+
+    async def embed_chunks(
+        self, chunks: Sequence[DocumentChunk], model: EmbeddingModel | None = None
+    ) -> list[list[float]]:
+        if not chunks:
+            return []
+        if not self._loop_task:
+            raise RuntimeError("Embedding batcher is not started.")
+
+        loop = asyncio.get_running_loop()
+        futures: list[asyncio.Future[list[float]]] = []
+        for chunk in chunks:
+            future: asyncio.Future[list[float]] = loop.create_future()
+            self._queue.put_nowait(
+                _PendingText(chunk.content, chunk.token_count, model, future)
+            )
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self._requests.acquire()
+            except asyncio.CancelledError:
+                _fail(batch, RuntimeError("Embedding batcher stopped."))
+                raise
+            task = asyncio.create_task(self._send(batch))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    async def _collect(self) -> list[_PendingText]:
+        first = self._carry or await self._queue.get()
+        self._carry = None
+        batch = [first]
+        tokens = first.token_count
+        deadline = first.enqueued_at + self._max_wait_s
+
+        while len(batch) < self._max_items:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(
+                    self._queue.get(), timeout
+                )
+            except (asyncio.QueueEmpty, TimeoutError):
+                break
+            except asyncio.CancelledError:
+                _fail(batch, RuntimeError("Embedding batcher stopped."))
+                raise
+            if tokens + item.token_count > self._max_tokens or item.model != first.model:
+                self._carry = item
+                break
+            batch.append(item)
+            tokens += item.token_count
+        return batch
+
+    async def _send(self, batch: list[_PendingText]) -> None:
+        try:
+            pending = [item for item in batch if not item.future.cancelled()]
+            if not pending:
+                return
+            try:
+                embeddings = await self._client.embed_texts(
+                    [item.text for item in pending],
+                    token_count=sum(item.token_count for item in pending),
+                    model=pending[0].model,
+                )
+                if len(embeddings) != len(pending):
+                    raise RuntimeError(
+                        f"Embedding API returned {len(embeddings)} vectors "
+                        f"for {len(pending)} inputs."
+                    )
+            except asyncio.CancelledError:
+                _fail(pending, RuntimeError("Embedding batcher stopped."))
+                raise
+            except Exception as exc:
+                _fail(pending, exc)
+                return
+
+            for item, embedding in zip(pending, embeddings, strict=True):
+                if not item.future.done():
+                    item.future.set_result(embedding)
+
+            logger.debug(
+                "embedding.batcher.flushed",
+                item_count=len(pending),
+                token_count=sum(item.token_count for item in pending),
+                oldest_wait_ms=round((time.monotonic() - pending[0].enqueued_at) * 1000, 1),
+            )
+        finally:
+            self._requests.release()
+
+
+def _fail(items: Sequence[_PendingText], exc: BaseException) -> None:
+    for item in items:
+        if not item.future.done():
+            item.future.set_exception(exc)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import structlog
+from sqlalchemy.exc import SQLAlchemyError
+
+from indexing_service.domain.models import DocumentChunk
+from indexing_service.domain.services import chunk_content_hash
+from indexing_service.infrastructure.embedding_batcher import EmbeddingBatcher
+from indexing_service.infrastructure.repository import PostgresChunkRepository
+from shared.schemas.documents import EmbeddingModel
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedEmbeddings:
+    embeddings: list[list[float]]
+    hits: int
+    misses: int
+    tokens_saved: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache in front of the embedding batcher.
+
+    Keys are SHA-256 of (embedding model, normalized chunk text). Lookups go to
+    an in-process LRU first, then to the embedding_cache table; only chunks
+    missing from both are sent to the embedding API.
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingBatcher,
+        repository: PostgresChunkRepository | None,
+        max_entries: int = 10_000,
+    ) -> None:
+        self._embedder = embedder
+        self._repository = repository
+        self._max_entries = max_entries
+        # float32 arrays keep an entry at ~6 KB instead of ~50 KB for a list of floats.
+        self._lru: OrderedDict[str, array[float]] = OrderedDict()
+
+    async def embed_chunks(
+        self, chunks: Sequence[DocumentChunk], embedding_model: EmbeddingModel
+    ) -> CachedEmbeddings:
+        hashes = [chunk_content_hash(c.content, embedding_model.name) for c in chunks]
+        found: dict[str, list[float]] = {}
+
+        for content_hash in set(hashes):
+            cached = self._lru_get(content_hash)
+            if cached is not None:
+                found[content_hash] = cached
+
+        missing = [h for h in set(hashes) if h not in found]
+        if missing and self._repository:
+            try:
+                stored = await self._repository.get_cached_embeddings(missing, embedding_model.name)
+            except SQLAlchemyError as exc:
+                logger.warning("embedding.cache.lookup_failed", error=str(exc))
+                stored = {}
+            for content_hash, embedding in stored.items():
+                found[content_hash] = embedding
+                self._lru_put(content_hash, embedding)
+
+        to_embed: dict[str, DocumentChunk] = {}
+        for content_hash, chunk in zip(hashes, chunks, strict=True):
+            if content_hash not in found and content_hash not in to_embed:
+                to_embed[content_hash] = chunk
+
+        if to_embed:
+            vectors = await self._embedder.embed_chunks(
+                list(to_embed.values()), embedding_model
+            )
+            fresh = dict(zip(to_embed, vectors, strict=True))
+            found.update(fresh)
+            for content_hash, embedding in fresh.items():
+                self._lru_put(content_hash, embedding)
+            if self._repository:
+                try:
+                    await self._repository.save_cached_embeddings(
+                        fresh, embedding_model.name
+                    )
+                except SQLAlchemyError as exc:
+                    logger.warning("embedding.cache.store_failed", error=str(exc))
+
+        total_tokens = sum(c.token_count for c in chunks)
+        embedded_tokens = sum(c.token_count for c in to_embed.values())
+        return CachedEmbeddings(
+            embeddings=[found[h] for h in hashes],
+            hits=len(chunks) - len(to_embed),
+            misses=len(to_embed),
+            tokens_saved=total_tokens - embedded_tokens,
+        )
+
+    def _lru_get(self, content_hash: str) -> list[float] | None:
+        entry = self._lru.get(content_hash)
+        if entry is None:
+            return None
+        self._lru.move_to_end(content_hash)
+        return entry.tolist()
+
+    def _lru_put(self, content_hash: str, embedding: list[float]) -> None:
+        if self._max_entries <= 0:
+            return
+        self._lru[content_hash] = array("f", embedding)
+        self._lru.move_to_end(content_hash)
+        while len(self._lru) > self._max_entries:
+            self._lru.popitem(last=False)
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import structlog
-from openai import AsyncAzureOpenAI
+from openai import NOT_GIVEN, AsyncAzureOpenAI
+
+from shared.ratelimit import AdaptiveRateLimiter, estimate_tokens
+from shared.schemas.documents import EmbeddingModel
 
 logger = structlog.get_logger(__name__)
 
@@ -9,33 +12,50 @@ logger = structlog.get_logger(__name__)
 class EmbeddingClient:
     def __init__(
         self,
-        endpoint: str,
-        api_key: str,
-        api_version: str,
+        client: AsyncAzureOpenAI,
         deployment: str,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        dimensions: int | None = None,
     ) -> None:
-        self._client = AsyncAzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=api_key,
-            api_version=api_version,
-        )
+        self._client = client
         self._deployment = deployment
+        self._rate_limiter = rate_limiter or AdaptiveRateLimiter(name=deployment)
+        # Only text-embedding-3 deployments accept a requested output size.
+        self._dimensions = dimensions
+
+    @property
+    def rate_limiter(self) -> AdaptiveRateLimiter:
+        return self._rate_limiter
 
-    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    async def embed_texts(
+        self,
+        texts: list[str],
+        token_count: int | None = None,
+        model: EmbeddingModel | None = None,
+    ) -> list[list[float]]:
+        """Embed texts with model's deployment, or the client's own when model is None."""
         if not texts:
             return []
+        deployment = model.name if model else self._deployment
+        dimensions = model.dimensions if model else self._dimensions
 
-        response = await self._client.embeddings.create(
-            input=texts,
-            model=self._deployment,
-        )
+        if token_count is None:
+            token_count = sum(estimate_tokens(t) for t in texts)
+
+        async with self._rate_limiter.acquire(tokens=token_count) as permit:
+            response = await self._client.embeddings.create(
+                input=texts,
+                model=deployment,
+                dimensions=dimensions or NOT_GIVEN,
+            )
+            permit.record_usage(response.usage.total_tokens)
 
         embeddings = [item.embedding for item in response.data]
 
         logger.debug(
             "embedding.batch.completed",
             count=len(texts),
-            model=self._deployment,
+            model=deployment,
             total_tokens=response.usage.total_tokens,
         )
         return embeddings
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from typing import Literal
+from uuid import UUID
+
+import aiofiles
+import structlog
+
+from indexing_service.domain.services import (
+    ChunkingService,
+    ChunkingStrategy,
+    ExtractedDocument,
+    TextExtractionService,
+    build_chunker,
+    extract_and_chunk,
+)
+
+logger = structlog.get_logger(__name__)
+
+ExtractionMode = Literal["inline", "process"]
+
+# Per-worker-process state, populated by _init_worker so the tiktoken
+# encoding is loaded once per process rather than once per document.
+_worker_extractor: TextExtractionService | None = None
+_worker_chunker: ChunkingService | None = None
+
+
+def _init_worker(
+    chunking_strategy: ChunkingStrategy, chunk_size_tokens: int, overlap_tokens: int
+) -> None:
+    global _worker_extractor, _worker_chunker
+    _worker_extractor = TextExtractionService()
+    _worker_chunker = build_chunker(chunking_strategy, chunk_size_tokens, overlap_tokens)
+
+
+def _run_in_worker(
+    storage_path: str,
+    content_type: str,
+    document_id: UUID,
+    tenant_id: str,
+) -> ExtractedDocument:
+    if _worker_extractor is None or _worker_chunker is None:
+        raise RuntimeError("Extraction worker is not initialised.")
+    started = time.perf_counter()
+    with open(storage_path, "rb") as f:
+        content = f.read()
+    read_seconds = time.perf_counter() - started
+    extracted = extract_and_chunk(
+        _worker_extractor, _worker_chunker, content, content_type, document_id, tenant_id
+    )
+    return replace(extracted, read_seconds=read_seconds)
+
+
+class ExtractionExecutor:
+    """Runs the extract + chunk stage inline or in a process pool.
+
+    In "process" mode the worker reads the file itself, so only the storage
+    path crosses the process boundary on the way in and the event loop stays
+    free for Kafka heartbeats and HTTP probes.
+    """
+
+    def __init__(
+        self,
+        mode: ExtractionMode,
+        chunk_size_tokens: int,
+        overlap_tokens: int,
+        chunking_strategy: ChunkingStrategy = "token_window",
+        max_workers: int | None = None,
+        max_tasks_per_child: int | None = None,
+    ) -> None:
+        self._mode = mode
+        self._chunk_size_tokens = chunk_size_tokens
+        self._overlap_tokens = overlap_tokens
+        self._chunking_strategy = chunking_strategy
+        self._max_workers = max_workers
+        self._max_tasks_per_child = max_tasks_per_child
+        self._pool: ProcessPoolExecutor | None = None
+        self._extractor: TextExtractionService | None = None
+        self._chunker: ChunkingService | None = None
+
+    def start(self) -> None:
+        if self._mode == "process":
+            self._pool = self._create_pool()
+        else:
+            self._extractor = TextExtractionService()
+            self._chunker = build_chunker(
+                self._chunking_strategy, self._chunk_size_tokens, self._overlap_tokens
+            )
+        logger.info(
+            "extraction.executor.started",
+            mode=self._mode,
+            chunking_strategy=self._chunking_strategy,
+            max_workers=(self._max_workers or os.cpu_count()) if self._pool else None,
+        )
+
+    def stop(self) -> None:
+        if self._pool:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        logger.info("extraction.executor.stopped")
+
+    async def run(
+        self,
+        storage_path: str,
+        content_type: str,
+        document_id: UUID,
+        tenant_id: str,
+    ) -> ExtractedDocument:
+        if self._mode == "inline":
+            if self._extractor is None or self._chunker is None:
+                raise RuntimeError("Extraction executor is not started.")
+            started = time.perf_counter()
+            async with aiofiles.open(storage_path, "rb") as f:
+                content = await f.read()
+            read_seconds = time.perf_counter() - started
+            extracted = extract_and_chunk(
+                self._extractor, self._chunker, content, content_type, document_id, tenant_id
+            )
+            return replace(extracted, read_seconds=read_seconds)
+
+        pool = self._pool
+        if not pool:
+            raise RuntimeError("Extraction executor is not started.")
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                pool, _run_in_worker, storage_path, content_type, document_id, tenant_id
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a pathological PDF). Replace the pool so
+            # other documents keep flowing; this document fails and is redelivered.
+            logger.error("extraction.pool.broken", document_id=str(document_id))
+            if self._pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._create_pool()
+            raise
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._chunking_strategy, self._chunk_size_tokens, self._overlap_tokens),
+            max_tasks_per_child=self._max_tasks_per_child,
+        )
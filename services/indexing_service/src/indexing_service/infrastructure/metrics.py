@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram
+
+STAGE_DURATION_SECONDS = Histogram(
+    "indexing_stage_duration_seconds",
+    "Time spent per indexing pipeline stage.",
+    ["stage", "content_type", "size_bucket"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+STAGE_BYTES_TOTAL = Counter(
+    "indexing_stage_bytes_total",
+    "Bytes fed into each indexing pipeline stage.",
+    ["stage", "content_type", "size_bucket"],
+)
+EMBEDDING_TOKENS_TOTAL = Counter(
+    "indexing_embedding_tokens_total",
+    "Chunk tokens by whether they were sent to the embedding API or served from cache.",
+    ["content_type", "outcome"],
+)
+DOCUMENTS_TOTAL = Counter(
+    "indexing_documents_total",
+    "Documents finished by the indexing pipeline.",
+    ["content_type", "size_bucket", "status"],
+)
+
+_SIZE_BUCKETS = (
+    (100 * 1024, "lt_100kb"),
+    (1024 * 1024, "100kb_1mb"),
+    (10 * 1024 * 1024, "1mb_10mb"),
+)
+
+
+def size_bucket(size_bytes: int) -> str:
+    for limit, label in _SIZE_BUCKETS:
+        if size_bytes < limit:
+            return label
+    return "gte_10mb"
+
+
+class StageTimer:
+    """Per-document stage durations and byte counts, in pipeline order."""
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = {}
+        self.bytes: dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str, size_bytes: int = 0) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, size_bytes)
+
+    def record(self, name: str, seconds: float, size_bytes: int = 0) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        if size_bytes:
+            self.bytes[name] = self.bytes.get(name, 0) + size_bytes
+
+    def milliseconds(self) -> dict[str, float]:
+        return {name: round(seconds * 1000, 1) for name, seconds in self.seconds.items()}
+
+    def observe(self, content_type: str, size_bytes: int, status: str) -> None:
+        bucket = size_bucket(size_bytes)
+        for name, seconds in self.seconds.items():
+            STAGE_DURATION_SECONDS.labels(name, content_type, bucket).observe(seconds)
+        for name, count in self.bytes.items():
+            STAGE_BYTES_TOTAL.labels(name, content_type, bucket).inc(count)
+        DOCUMENTS_TOTAL.labels(content_type, bucket, status).inc()
@@ -0,0 +1,562 @@
+# ruff: noqa: S608
+# DDL and the statements below are formatted with identifiers only: module
+# constants, names derived from them, and names read back from the catalog.
+# Tenant IDs go into DDL, which takes no bind parameters, as literals quoted by
+# the server (quote_literal); everywhere else they are bind parameters.
+from __future__ import annotations
+
+import hashlib
+import re
+from uuid import UUID
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from indexing_service.domain.models import ChunkPartition
+
+logger = structlog.get_logger(__name__)
+
+CHUNKS_TABLE = "document_chunks"
+SHARED_PARTITION = "document_chunks_shared"
+# Partitioned copy built by convert; renamed to document_chunks at cutover.
+STAGED_TABLE = "document_chunks_partitioned"
+LEGACY_TABLE = "document_chunks_legacy"
+_LEGACY_SUFFIX = "_legacy"
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+_RELKIND_SQL = """
+    SELECT c.relkind::text AS relkind
+    FROM pg_class c
+    WHERE c.oid = to_regclass(:table)
+"""
+
+_PARTITIONS_SQL = """
+    SELECT
+        c.relname AS name,
+        pg_get_expr(c.relpartbound, c.oid) AS bound,
+        (
+            SELECT COALESCE(sum(GREATEST(leaf.reltuples, 0)), 0)::bigint
+            FROM pg_partition_tree(c.oid) t
+            JOIN pg_class leaf ON leaf.oid = t.relid
+            WHERE t.isleaf
+        ) AS approx_rows
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass(:table)
+    ORDER BY approx_rows DESC, c.relname
+"""
+
+_TENANT_SIZES_SQL = """
+    SELECT tenant_id, count(*) AS chunks
+    FROM {table}
+    GROUP BY tenant_id
+    HAVING count(*) >= :min_rows
+    ORDER BY chunks DESC
+"""
+
+# Stored columns only; generated ones (content_tsv) are recomputed on insert.
+_COPY_COLUMNS_SQL = """
+    SELECT attname
+    FROM pg_attribute
+    WHERE attrelid = to_regclass(:table)
+      AND attnum > 0
+      AND NOT attisdropped
+      AND attgenerated = ''
+    ORDER BY attnum
+"""
+
+# Index definitions, minus the ones backing constraints (the primary key).
+_INDEXES_SQL = """
+    SELECT i.relname AS name, pg_get_indexdef(i.oid) AS definition
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    WHERE x.indrelid = to_regclass(:table)
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.oid)
+    ORDER BY i.relname
+"""
+
+_FOREIGN_KEYS_SQL = """
+    SELECT conname AS name, pg_get_constraintdef(oid) AS definition
+    FROM pg_constraint
+    WHERE conrelid = to_regclass(:table) AND contype = 'f'
+    ORDER BY conname
+"""
+
+_CREATE_CHANGE_LOG_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS document_chunk_changes (
+        seq       BIGSERIAL PRIMARY KEY,
+        tenant_id VARCHAR(255) NOT NULL,
+        id        UUID NOT NULL
+    )
+    """,
+    """
+    CREATE OR REPLACE FUNCTION log_document_chunk_change() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO document_chunk_changes (tenant_id, id) VALUES (OLD.tenant_id, OLD.id);
+        ELSE
+            INSERT INTO document_chunk_changes (tenant_id, id) VALUES (NEW.tenant_id, NEW.id);
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    "DROP TRIGGER IF EXISTS document_chunks_log_changes ON document_chunks",
+    """
+    CREATE TRIGGER document_chunks_log_changes
+    AFTER INSERT OR UPDATE OR DELETE ON document_chunks
+    FOR EACH ROW EXECUTE FUNCTION log_document_chunk_change()
+    """,
+]
+
+_DROP_CHANGE_LOG_SQL = [
+    "DROP TRIGGER IF EXISTS document_chunks_log_changes ON {table}",
+    "DROP TABLE IF EXISTS document_chunk_changes",
+    "DROP FUNCTION IF EXISTS log_document_chunk_change()",
+]
+
+_PENDING_CHANGES_SQL = """
+    SELECT count(*) AS pending, max(seq) AS last_seq
+    FROM document_chunk_changes
+"""
+
+# Re-copy every logged row: drop the target's version, then insert the
+# source's current one (none if the row was deleted).
+_REPLAY_DELETE_SQL = """
+    DELETE FROM {target} t
+    USING document_chunk_changes ch
+    WHERE ch.seq <= :last_seq
+      {change_filter}
+      AND t.tenant_id = ch.tenant_id
+      AND t.id = ch.id
+"""
+
+_REPLAY_INSERT_SQL = """
+    INSERT INTO {target} ({columns})
+    SELECT {columns}
+    FROM {source}
+    WHERE (tenant_id, id) IN (
+        SELECT ch.tenant_id, ch.id
+        FROM document_chunk_changes ch
+        WHERE ch.seq <= :last_seq
+          {change_filter}
+    )
+    {source_filter}
+"""
+
+_REPLAY_CLEAR_SQL = """
+    DELETE FROM document_chunk_changes WHERE seq <= :last_seq
+"""
+
+# Keyset batch on the chunk ID; rows already present (a resumed run) are skipped.
+_COPY_BATCH_SQL = """
+    WITH batch AS (
+        SELECT {columns}
+        FROM {source}
+        WHERE id > :cursor
+          {source_filter}
+        ORDER BY id
+        LIMIT :limit
+    ), copied AS (
+        INSERT INTO {target} ({columns})
+        SELECT {columns} FROM batch
+        ON CONFLICT DO NOTHING
+    )
+    SELECT
+        (SELECT count(*) FROM batch) AS copied,
+        (SELECT id FROM batch ORDER BY id DESC LIMIT 1) AS last_id
+"""
+
+_LAST_COPIED_SQL = """
+    SELECT id FROM {target} WHERE true {source_filter} ORDER BY id DESC LIMIT 1
+"""
+
+# Hash partitions of a table that a given tenant's rows cannot be routed to.
+_OTHER_HASH_PARTITIONS_SQL = """
+    SELECT c.relname AS name
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    CROSS JOIN LATERAL regexp_match(
+        pg_get_expr(c.relpartbound, c.oid), 'modulus ([0-9]+), remainder ([0-9]+)'
+    ) AS bound(hash)
+    WHERE i.inhparent = to_regclass(:table)
+      AND NOT satisfies_hash_partition(
+          i.inhparent, bound.hash[1]::int, bound.hash[2]::int, CAST(:tenant_id AS varchar)
+      )
+    ORDER BY c.relname
+"""
+
+_CONSTRAINT_EXISTS_SQL = """
+    SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(:table) AND conname = :name
+"""
+
+_QUOTE_LITERAL_SQL = "SELECT quote_literal(CAST(:value AS varchar))"
+
+_SET_LOCK_TIMEOUT_SQL = "SELECT set_config('lock_timeout', :timeout, true)"
+
+
+def partition_name(tenant_id: str) -> str:
+    """Name of a tenant's dedicated partition: readable slug plus a hash, < 63 bytes."""
+    slug = _SLUG_RE.sub("_", tenant_id.lower()).strip("_")[:30]
+    digest = _tenant_digest(tenant_id)
+    return f"{CHUNKS_TABLE}_t_{slug}_{digest}" if slug else f"{CHUNKS_TABLE}_t_{digest}"
+
+
+class ChunkPartitionRepository:
+    """DDL and data movement behind tenant partitioning of document_chunks.
+
+    Bulk copies run in short keyset batches while a row trigger records every
+    chunk write in document_chunk_changes; replaying that log brings the copy
+    up to date, and only the final replay runs under a lock.
+    """
+
+    def __init__(self, database_url: str) -> None:
+        self._engine: AsyncEngine = create_async_engine(
+            database_url, pool_size=2, max_overflow=0
+        )
+        self._columns: dict[str, str] = {}
+
+    async def relkind(self, table: str) -> str | None:
+        """'p' for a partitioned table, 'r' for a plain one, None if missing."""
+        async with self._engine.connect() as conn:
+            return (await conn.execute(text(_RELKIND_SQL), {"table": table})).scalar_one_or_none()
+
+    async def partitions(self, table: str = CHUNKS_TABLE) -> list[ChunkPartition]:
+        async with self._engine.connect() as conn:
+            result = await conn.execute(text(_PARTITIONS_SQL), {"table": table})
+            return [ChunkPartition(**row) for row in result.mappings()]
+
+    async def tenant_sizes(self, table: str, min_rows: int) -> list[tuple[str, int]]:
+        """Tenants with at least min_rows chunks in table, largest first."""
+        async with self._engine.connect() as conn:
+            result = await conn.execute(
+                text(_TENANT_SIZES_SQL.format(table=table)), {"min_rows": min_rows}
+            )
+            return [(row.tenant_id, int(row.chunks)) for row in result]
+
+    async def start_change_log(self) -> None:
+        """Record every write to document_chunks from now until the cutover."""
+        async with self._engine.begin() as conn:
+            for statement in _CREATE_CHANGE_LOG_SQL:
+                await conn.execute(text(statement))
+
+    async def create_partitioned_table(
+        self, hash_partitions: int, dedicated_tenants: list[str]
+    ) -> None:
+        """Create the partitioned copy of document_chunks with its partitions.
+
+        Only the ID index is built now, so an interrupted copy resumes from
+        the last copied ID; the other indexes are built after the bulk copy.
+        """
+        async with self._engine.begin() as conn:
+            await conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {STAGED_TABLE} ("
+                    f"LIKE {CHUNKS_TABLE} INCLUDING DEFAULTS INCLUDING GENERATED, "
+                    "PRIMARY KEY (tenant_id, id)"
+                    ") PARTITION BY LIST (tenant_id)"
+                )
+            )
+            for tenant_id in dedicated_tenants:
+                literal = await self._quote_literal(conn, tenant_id)
+                await conn.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {partition_name(tenant_id)} "
+                        f"PARTITION OF {STAGED_TABLE} FOR VALUES IN ({literal})"
+                    )
+                )
+            await conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {SHARED_PARTITION} "
+                    f"PARTITION OF {STAGED_TABLE} DEFAULT PARTITION BY HASH (tenant_id)"
+                )
+            )
+            for remainder in range(hash_partitions):
+                await conn.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {SHARED_PARTITION}_{remainder} "
+                        f"PARTITION OF {SHARED_PARTITION} "
+                        f"FOR VALUES WITH (MODULUS {hash_partitions}, REMAINDER {remainder})"
+                    )
+                )
+            await conn.execute(
+                text(f"CREATE INDEX IF NOT EXISTS {CHUNKS_TABLE}_id_idx ON {STAGED_TABLE} (id)")
+            )
+
+    async def create_tenant_table(self, tenant_id: str) -> str:
+        """Create the standalone table that becomes tenant_id's partition; return its name.
+
+        The CHECK constraint lets ATTACH PARTITION skip scanning it.
+        """
+        name = partition_name(tenant_id)
+        async with self._engine.begin() as conn:
+            literal = await self._quote_literal(conn, tenant_id)
+            await conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} ("
+                    f"LIKE {CHUNKS_TABLE} INCLUDING DEFAULTS INCLUDING GENERATED, "
+                    "PRIMARY KEY (tenant_id, id), "
+                    f"CONSTRAINT {name}_tenant_check CHECK (tenant_id = {literal})"
+                    ")"
+                )
+            )
+        return name
+
+    async def copy_batch(
+        self,
+        source: str,
+        target: str,
+        cursor: UUID,
+        limit: int,
+        tenant_id: str | None = None,
+    ) -> tuple[int, UUID | None]:
+        """Copy the next batch after cursor; returns (rows read, last ID)."""
+        async with self._engine.begin() as conn:
+            columns = await self._copy_columns(conn, source)
+            row = (
+                await conn.execute(
+                    text(
+                        _COPY_BATCH_SQL.format(
+                            columns=columns,
+                            source=source,
+                            target=target,
+                            source_filter=_tenant_filter(tenant_id),
+                        )
+                    ),
+                    {"cursor": cursor, "limit": limit, "tenant_id": tenant_id},
+                )
+            ).mappings().one()
+        return int(row["copied"]), row["last_id"]
+
+    async def last_copied_id(self, target: str, tenant_id: str | None = None) -> UUID | None:
+        async with self._engine.connect() as conn:
+            return (
+                await conn.execute(
+                    text(
+                        _LAST_COPIED_SQL.format(
+                            target=target, source_filter=_tenant_filter(tenant_id)
+                        )
+                    ),
+                    {"tenant_id": tenant_id},
+                )
+            ).scalar_one_or_none()
+
+    async def pending_changes(self) -> int:
+        async with self._engine.connect() as conn:
+            return int(
+                (await conn.execute(text(_PENDING_CHANGES_SQL))).mappings().one()["pending"]
+            )
+
+    async def replay_changes(
+        self, source: str, target: str, tenant_id: str | None = None
+    ) -> int:
+        """Bring target up to date with the rows logged so far; returns rows replayed."""
+        async with self._engine.begin() as conn:
+            return await self._replay(conn, source, target, tenant_id)
+
+    async def build_indexes(self, source: str, target: str, name_prefix: str | None = None) -> None:
+        """Recreate source's indexes and foreign keys on target.
+
+        Index names are kept (the source's are renamed out of the way first)
+        unless name_prefix is given, which is how a future partition gets
+        indexes that ATTACH PARTITION adopts instead of rebuilding.
+        """
+        async with self._engine.connect() as conn:
+            indexes = (await conn.execute(text(_INDEXES_SQL), {"table": source})).all()
+            foreign_keys = (
+                await conn.execute(text(_FOREIGN_KEYS_SQL), {"table": target})
+            ).all()
+            source_keys = (
+                await conn.execute(text(_FOREIGN_KEYS_SQL), {"table": source})
+            ).all()
+
+        for position, index in enumerate(indexes):
+            if name_prefix:
+                name, original = f"{name_prefix}_i{position}", index.name
+            elif index.name.endswith(_LEGACY_SUFFIX):
+                name, original = index.name.removesuffix(_LEGACY_SUFFIX), index.name
+            else:
+                name, original = index.name, f"{index.name}{_LEGACY_SUFFIX}"
+                async with self._engine.begin() as conn:
+                    await conn.execute(text(f"ALTER INDEX {index.name} RENAME TO {original}"))
+            definition = index.definition.replace(
+                f"INDEX {index.name} ON ", f"INDEX IF NOT EXISTS {name} ON ", 1
+            ).replace(" ON ONLY ", " ON ", 1)
+            definition = re.sub(
+                rf" ON (\S+\.)?{re.escape(source)} ", f" ON {target} ", definition, count=1
+            )
+            logger.info("partitions.index.building", index=name, table=target, source=original)
+            # Each build commits on its own; a restart skips the finished ones.
+            async with self._engine.begin() as conn:
+                await conn.execute(text(definition))
+
+        existing = {fk.definition for fk in foreign_keys}
+        for fk in source_keys:
+            if fk.definition not in existing:
+                async with self._engine.begin() as conn:
+                    await conn.execute(text(f"ALTER TABLE {target} ADD {fk.definition}"))
+
+    async def swap_tables(self, lock_timeout_ms: int) -> int:
+        """Replay the last changes and rename the partitioned copy into place.
+
+        One transaction: document_chunks is locked against reads and writes
+        only for the final replay and the renames. The old table is kept as
+        document_chunks_legacy.
+        """
+        async with self._engine.begin() as conn:
+            await conn.execute(text(_SET_LOCK_TIMEOUT_SQL), {"timeout": f"{lock_timeout_ms}ms"})
+            await conn.execute(text(f"LOCK TABLE {CHUNKS_TABLE} IN ACCESS EXCLUSIVE MODE"))
+            replayed = await self._replay(conn, CHUNKS_TABLE, STAGED_TABLE, None)
+            for statement in _DROP_CHANGE_LOG_SQL:
+                await conn.execute(text(statement.format(table=CHUNKS_TABLE)))
+            await conn.execute(text(f"ALTER TABLE {CHUNKS_TABLE} RENAME TO {LEGACY_TABLE}"))
+            await conn.execute(
+                text(f"ALTER INDEX IF EXISTS {CHUNKS_TABLE}_pkey RENAME TO {LEGACY_TABLE}_pkey")
+            )
+            await conn.execute(text(f"ALTER TABLE {STAGED_TABLE} RENAME TO {CHUNKS_TABLE}"))
+            await conn.execute(
+                text(f"ALTER INDEX IF EXISTS {STAGED_TABLE}_pkey RENAME TO {CHUNKS_TABLE}_pkey")
+            )
+        return replayed
+
+    async def exclude_from_shared(self, tenant_id: str, lock_timeout_ms: int) -> list[str]:
+        """Constrain the shared hash partitions tenant_id does not hash to against its rows.
+
+        Each gets CHECK (tenant_id <> tenant) NOT VALID, which only takes a
+        short lock, then VALIDATE, which scans the partition without blocking
+        reads or writes. ATTACH PARTITION skips partitions with such a
+        constraint. The partition holding the tenant's rows cannot have one
+        until they are deleted at the cutover. Returns the partitions.
+        """
+        async with self._engine.connect() as conn:
+            result = await conn.execute(
+                text(_OTHER_HASH_PARTITIONS_SQL),
+                {"table": SHARED_PARTITION, "tenant_id": tenant_id},
+            )
+            partitions = [row.name for row in result]
+        for partition in partitions:
+            constraint = _exclusion_name(partition, tenant_id)
+            async with self._engine.begin() as conn:
+                exists = (
+                    await conn.execute(
+                        text(_CONSTRAINT_EXISTS_SQL), {"table": partition, "name": constraint}
+                    )
+                ).first()
+                if exists is None:
+                    await conn.execute(
+                        text(_SET_LOCK_TIMEOUT_SQL), {"timeout": f"{lock_timeout_ms}ms"}
+                    )
+                    literal = await self._quote_literal(conn, tenant_id)
+                    await conn.execute(
+                        text(
+                            f"ALTER TABLE {partition} ADD CONSTRAINT {constraint} "
+                            f"CHECK (tenant_id <> {literal}) NOT VALID"
+                        )
+                    )
+            async with self._engine.begin() as conn:
+                await conn.execute(
+                    text(f"ALTER TABLE {partition} VALIDATE CONSTRAINT {constraint}")
+                )
+        return partitions
+
+    async def attach_tenant_table(self, tenant_id: str, name: str, lock_timeout_ms: int) -> int:
+        """Move tenant_id's rows from the shared partitions into its own partition.
+
+        One transaction holding a lock that blocks chunk writes: replay the
+        last changes, delete the tenant's rows from the shared partition and
+        attach the table. ATTACH locks the shared partitions, reads included,
+        until commit. It scans only the hash partition holding the tenant's
+        rows, since exclude_from_shared has covered the others; their
+        constraints are dropped again once the tenant has its own partition.
+        """
+        async with self._engine.begin() as conn:
+            await conn.execute(text(_SET_LOCK_TIMEOUT_SQL), {"timeout": f"{lock_timeout_ms}ms"})
+            await conn.execute(text(f"LOCK TABLE {CHUNKS_TABLE} IN SHARE ROW EXCLUSIVE MODE"))
+            replayed = await self._replay(conn, CHUNKS_TABLE, name, tenant_id)
+            for statement in _DROP_CHANGE_LOG_SQL:
+                await conn.execute(text(statement.format(table=CHUNKS_TABLE)))
+            await conn.execute(
+                text(f"DELETE FROM {CHUNKS_TABLE} WHERE tenant_id = :tenant_id"),
+                {"tenant_id": tenant_id},
+            )
+            literal = await self._quote_literal(conn, tenant_id)
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {CHUNKS_TABLE} ATTACH PARTITION {name} "
+                    f"FOR VALUES IN ({literal})"
+                )
+            )
+            result = await conn.execute(
+                text(_OTHER_HASH_PARTITIONS_SQL),
+                {"table": SHARED_PARTITION, "tenant_id": tenant_id},
+            )
+            for partition in [row.name for row in result]:
+                await conn.execute(
+                    text(
+                        f"ALTER TABLE {partition} DROP CONSTRAINT IF EXISTS "
+                        f"{_exclusion_name(partition, tenant_id)}"
+                    )
+                )
+        return replayed
+
+    async def drop_legacy_table(self) -> None:
+        async with self._engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {LEGACY_TABLE}"))
+
+    async def dispose(self) -> None:
+        await self._engine.dispose()
+
+    async def _replay(
+        self, conn: AsyncConnection, source: str, target: str, tenant_id: str | None
+    ) -> int:
+        last_seq = (await conn.execute(text(_PENDING_CHANGES_SQL))).mappings().one()["last_seq"]
+        if last_seq is None:
+            return 0
+        params = {"last_seq": last_seq, "tenant_id": tenant_id}
+        change_filter = "AND ch.tenant_id = :tenant_id" if tenant_id is not None else ""
+        columns = await self._copy_columns(conn, source)
+        await conn.execute(
+            text(_REPLAY_DELETE_SQL.format(target=target, change_filter=change_filter)),
+            params,
+        )
+        replayed = await conn.execute(
+            text(
+                _REPLAY_INSERT_SQL.format(
+                    target=target,
+                    source=source,
+                    columns=columns,
+                    change_filter=change_filter,
+                    source_filter=(
+                        "AND tenant_id = :tenant_id" if tenant_id is not None else ""
+                    ),
+                )
+            ),
+            params,
+        )
+        await conn.execute(text(_REPLAY_CLEAR_SQL), params)
+        return replayed.rowcount
+
+    async def _copy_columns(self, conn: AsyncConnection, table: str) -> str:
+        if table not in self._columns:
+            result = await conn.execute(text(_COPY_COLUMNS_SQL), {"table": table})
+            self._columns[table] = ", ".join(row.attname for row in result)
+        return self._columns[table]
+
+    async def _quote_literal(self, conn: AsyncConnection, value: str) -> str:
+        # DDL takes no bind parameters; let the server quote tenant IDs.
+        return (await conn.execute(text(_QUOTE_LITERAL_SQL), {"value": value})).scalar_one()
+
+
+def _tenant_digest(tenant_id: str) -> str:
+    return hashlib.sha256(tenant_id.encode("utf-8")).hexdigest()[:8]
+
+
+def _exclusion_name(partition: str, tenant_id: str) -> str:
+    return f"{partition}_not_{_tenant_digest(tenant_id)}"
+
+
+def _tenant_filter(tenant_id: str | None) -> str:
+    return "AND tenant_id = :tenant_id" if tenant_id is not None else ""
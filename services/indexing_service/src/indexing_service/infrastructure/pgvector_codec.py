@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+import asyncpg
+
+# pgvector's binary wire format: uint16 dimensions, uint16 reserved (0),
+# then the components as big-endian float32.
+_HEADER = struct.Struct(">HH")
+_SWAP = sys.byteorder == "little"
+
+
+def encode_vector(values: Sequence[float]) -> bytes:
+    components = array("f", values)
+    if _SWAP:
+        components.byteswap()
+    return _HEADER.pack(len(components), 0) + components.tobytes()
+
+
+def decode_vector(data: bytes) -> list[float]:
+    dimensions, _ = _HEADER.unpack_from(data)
+    components = array("f")
+    components.frombytes(data[_HEADER.size : _HEADER.size + dimensions * 4])
+    if _SWAP:
+        components.byteswap()
+    return components.tolist()
+
+
+async def register_vector_codec(connection: asyncpg.Connection) -> None:
+    """Exchange `vector` values with Postgres in binary form as lists of floats.
+
+    Required for binary COPY into vector columns, and avoids formatting and
+    parsing 1536 decimal strings per embedding on regular queries.
+    """
+    await connection.set_type_codec(
+        "vector",
+        schema="public",
+        encoder=encode_vector,
+        decoder=decode_vector,
+        format="binary",
+    )
@@ -1,34 +1,41 @@
 from __future__ import annotations
 
-import json
-from uuid import UUID
+import asyncio
+from typing import Any
+from uuid import UUID, uuid4
 
 import structlog
 from aiokafka import AIOKafkaProducer
+from aiokafka.structs import RecordMetadata
 
-from shared.events.document_events import DocumentIndexedEvent
+from shared.config.base import BaseServiceSettings
+from shared.events.document_events import DocumentIndexedEvent, DocumentIndexingFailedEvent
+from shared.events.publisher import EventPublisher, create_producer
 
 logger = structlog.get_logger(__name__)
 
 
 class RedpandaIndexingProducer:
-    def __init__(self, bootstrap_servers: str) -> None:
-        self._bootstrap_servers = bootstrap_servers
+    def __init__(self, settings: BaseServiceSettings) -> None:
+        self._settings = settings
+        self._bootstrap_servers = settings.redpanda_bootstrap_servers
+        self._pipelined = settings.redpanda_publish_mode == "pipelined"
         self._producer: AIOKafkaProducer | None = None
+        self._publisher: EventPublisher | None = None
 
     async def start(self) -> None:
-        self._producer = AIOKafkaProducer(
+        self._producer = create_producer(self._settings)
+        self._publisher = EventPublisher(self._producer)
+        await self._producer.start()
+        logger.info(
+            "producer.started",
             bootstrap_servers=self._bootstrap_servers,
-            value_serializer=lambda v: json.dumps(v, default=str).encode("utf-8"),
-            key_serializer=lambda k: k.encode("utf-8") if k else None,
-            acks="all",
-            enable_idempotence=True,
+            publish_mode=self._settings.redpanda_publish_mode,
         )
-        await self._producer.start()
-        logger.info("producer.started", bootstrap_servers=self._bootstrap_servers)
 
     async def stop(self) -> None:
-        if self._producer:
+        if self._producer and self._publisher:
+            await self._publisher.flush()
             await self._producer.stop()
             logger.info("producer.stopped")
 
@@ -40,8 +47,8 @@ class RedpandaIndexingProducer:
         chunk_count: int,
         page_count: int,
         embedding_model: str,
-    ) -> None:
-        if not self._producer:
+    ) -> asyncio.Future[RecordMetadata]:
+        if not self._publisher:
             raise RuntimeError("Producer is not started.")
 
         event = DocumentIndexedEvent(
@@ -53,16 +60,65 @@ class RedpandaIndexingProducer:
             embedding_model=embedding_model,
         )
 
-        await self._producer.send_and_wait(
-            topic=event.topic,
-            value=event.model_dump(mode="json"),
-            key=tenant_id,
+        delivery = await self._publisher.send(
+            event.topic, event.model_dump(mode="json"), key=tenant_id
         )
+        if not self._pipelined:
+            await delivery
 
         logger.info(
-            "event.published",
+            "event.published" if not self._pipelined else "event.enqueued",
             topic=event.topic,
             event_id=str(event.event_id),
             document_id=str(document_id),
             chunk_count=chunk_count,
         )
+        return delivery
+
+    async def publish_document_indexing_failed(
+        self,
+        payload: dict[str, Any],
+        error_code: str,
+        error_message: str,
+    ) -> None:
+        """Publish the failure for the document.uploaded payload that could not be indexed."""
+        if not self._publisher:
+            raise RuntimeError("Producer is not started.")
+
+        event = DocumentIndexingFailedEvent(
+            correlation_id=payload.get("correlation_id") or uuid4(),
+            tenant_id=payload["tenant_id"],
+            document_id=payload["document_id"],
+            error_code=error_code,
+            error_message=error_message,
+        )
+
+        delivery = await self._publisher.send(
+            event.topic, event.model_dump(mode="json"), key=event.tenant_id
+        )
+        await delivery
+
+        logger.info(
+            "event.published",
+            topic=event.topic,
+            event_id=str(event.event_id),
+            document_id=str(event.document_id),
+            error_code=error_code,
+        )
+
+    async def send(
+        self,
+        topic: str,
+        value: Any,
+        key: str | None,
+        headers: list[tuple[str, bytes]],
+    ) -> None:
+        """Forward an already-deserialized message, e.g. to a retry or dead-letter topic.
+
+        Always waits for the ack: the source offset is committed right after.
+        """
+        if not self._publisher:
+            raise RuntimeError("Producer is not started.")
+
+        delivery = await self._publisher.send(topic, value, key=key, headers=headers)
+        await delivery
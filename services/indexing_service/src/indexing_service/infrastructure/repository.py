@@ -1,61 +1,288 @@
 from __future__ import annotations
 
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, get_args
 from uuid import UUID
 
 import structlog
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
-from indexing_service.domain.models import IndexedChunk
+from indexing_service.domain.models import DocumentChunk, IndexedChunk, StoredChunk
+from indexing_service.infrastructure.pgvector_codec import register_vector_codec
+from shared.schemas.documents import EmbeddingColumn, EmbeddingModel
 
 logger = structlog.get_logger(__name__)
 
+_CHUNK_COPY_COLUMNS = [
+    "id",
+    "document_id",
+    "tenant_id",
+    "content",
+    "page_number",
+    "chunk_index",
+    "token_count",
+]
+
+_ACTIVE_MODEL_SQL = """
+    SELECT target_model, embedding_column, dimensions
+    FROM embedding_migrations
+    WHERE status = 'active'
+    ORDER BY activated_at DESC
+    LIMIT 1
+"""
+
+
+# {column} is the slot holding the model's vectors. It is formatted once per name
+# in EmbeddingColumn, so no other text can reach the SQL.
+_DOCUMENT_CHUNKS_SQL = """
+    SELECT id, content
+    FROM document_chunks
+    WHERE document_id = :document_id
+      AND tenant_id = :tenant_id
+      AND {column}_model = :embedding_model
+"""
+
+# A superseded version stays superseded, e.g. when a retry of its own upload
+# finishes after the revision that replaced it.
+_UPDATE_STATUS_SQL = """
+    UPDATE documents
+    SET status = :status,
+        chunk_count = COALESCE(:chunk_count, chunk_count),
+        page_count  = COALESCE(:page_count, page_count),
+        updated_at  = NOW()
+    WHERE (id = :id OR canonical_document_id = :id)
+      AND status <> 'superseded'
+"""
+
+# Taken first in a unit of work: a revision superseding this document waits
+# for it to commit, and one that already did is seen before any chunk is written.
+_LOCK_DOCUMENT_SQL = """
+    SELECT status FROM documents WHERE id = :id FOR UPDATE
+"""
+
+_MARK_EVENT_SQL = """
+    INSERT INTO processed_events (event_id, consumer_group)
+    VALUES (:event_id, :consumer_group)
+    ON CONFLICT DO NOTHING
+"""
+
+_RELINK_CHUNKS_SQL = """
+    UPDATE document_chunks AS c
+    SET document_id = :document_id,
+        content     = r.content,
+        page_number = r.page_number,
+        chunk_index = r.chunk_index,
+        token_count = r.token_count
+    FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:contents AS text[]),
+        CAST(:page_numbers AS int[]),
+        CAST(:chunk_indexes AS int[]),
+        CAST(:token_counts AS int[])
+    ) AS r(id, content, page_number, chunk_index, token_count)
+    WHERE c.tenant_id = :tenant_id
+      AND c.document_id = :previous_document_id
+      AND c.id = r.id
+"""
+
+# The tenant filter prunes both statements to the tenant's partition. Both match
+# only rows still on the previous version, so concurrent revisions of it cannot
+# move or delete rows another revision has already taken over. Run after the
+# relink, the delete also drops rows without a vector for the active model,
+# which the reindex plan never sees.
+_DELETE_DOCUMENT_CHUNKS_SQL = """
+    DELETE FROM document_chunks
+    WHERE tenant_id = :tenant_id
+      AND document_id = :document_id
+"""
+
+
+@dataclass(frozen=True)
+class _StatusChange:
+    document_id: UUID
+    status: str
+    chunk_count: int | None
+    page_count: int | None
+
+    def params(self) -> dict[str, Any]:
+        return {
+            "id": self.document_id,
+            "status": self.status,
+            "chunk_count": self.chunk_count,
+            "page_count": self.page_count,
+        }
+
+
+class IndexingUnitOfWork:
+    """Collects the writes that finish indexing a document.
+
+    Nothing touches the database until the owning unit_of_work() block exits
+    cleanly; the staged writes are then applied in a single transaction.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: list[IndexedChunk] = []
+        self.chunks_column: EmbeddingColumn | None = None
+        self.relinked: list[tuple[UUID, DocumentChunk]] = []
+        self.relink_target: UUID | None = None
+        self.relink_source: UUID | None = None
+        self.deleted_document: tuple[str, UUID] | None = None
+        self.status_changes: list[_StatusChange] = []
+        self.processed_event: tuple[str, str] | None = None
+        self.locked_document: UUID | None = None
+        self.superseded = False
+
+    def add_chunks(
+        self, chunks: list[IndexedChunk], embedding_column: EmbeddingColumn = "embedding"
+    ) -> None:
+        """Insert chunks with their vectors in embedding_column."""
+        if self.chunks_column not in (None, embedding_column):
+            raise ValueError("A unit of work writes chunk vectors to a single column.")
+        self.chunks_column = embedding_column
+        self.chunks.extend(chunks)
+
+    def relink_chunks(
+        self,
+        document_id: UUID,
+        previous_document_id: UUID,
+        chunks: list[tuple[UUID, DocumentChunk]],
+    ) -> None:
+        """Move previous_document_id's stored rows to document_id.
+
+        Each row takes the position of the paired chunk; rows no longer on
+        previous_document_id are left alone.
+        """
+        if (self.relink_target, self.relink_source) not in (
+            (None, None),
+            (document_id, previous_document_id),
+        ):
+            raise ValueError("A unit of work relinks chunks between a single pair of documents.")
+        self.relink_target = document_id
+        self.relink_source = previous_document_id
+        self.relinked.extend(chunks)
+
+    def delete_document_chunks(self, tenant_id: str, document_id: UUID) -> None:
+        """Delete the rows still attached to document_id once any relink is applied."""
+        if self.deleted_document not in (None, (tenant_id, document_id)):
+            raise ValueError("A unit of work deletes the chunks of a single document.")
+        self.deleted_document = (tenant_id, document_id)
+
+    def update_document_status(
+        self,
+        document_id: UUID,
+        status: str,
+        chunk_count: int | None = None,
+        page_count: int | None = None,
+    ) -> None:
+        self.status_changes.append(_StatusChange(document_id, status, chunk_count, page_count))
+
+    def mark_event_processed(self, event_id: str, consumer_group: str) -> None:
+        self.processed_event = (event_id, consumer_group)
+
+    def skip_if_superseded(self, document_id: UUID) -> None:
+        """Lock document_id's row first; if it is superseded, write only the event marker.
+
+        superseded tells the caller which happened once the block exits.
+        """
+        self.locked_document = document_id
+
+
+def _chunk_records(chunks: list[IndexedChunk]) -> Iterator[tuple[Any, ...]]:
+    for chunk in chunks:
+        yield (
+            chunk.chunk_id,
+            chunk.document_id,
+            chunk.tenant_id,
+            chunk.content,
+            chunk.page_number,
+            chunk.chunk_index,
+            chunk.token_count,
+            chunk.embedding_model,
+            chunk.embedding,
+        )
+
+
+def _on_connect(dbapi_connection: Any, _connection_record: Any) -> None:
+    dbapi_connection.run_async(register_vector_codec)
+
 
 class PostgresChunkRepository:
-    def __init__(self, database_url: str) -> None:
+    def __init__(
+        self,
+        database_url: str,
+        default_embedding_model: str,
+        model_refresh_seconds: float = 5.0,
+    ) -> None:
         self._engine: AsyncEngine = create_async_engine(
             database_url, pool_size=5, max_overflow=10
         )
         self._session_factory = sessionmaker(
             self._engine, class_=AsyncSession, expire_on_commit=False
         )
+        event.listen(self._engine.sync_engine, "connect", _on_connect)
+        self._embedding_model = EmbeddingModel(name=default_embedding_model)
+        self._model_refresh_seconds = model_refresh_seconds
+        self._model_checked_at = float("-inf")
+        self._document_chunks_sql = {
+            column: text(_DOCUMENT_CHUNKS_SQL.format(column=column))
+            for column in get_args(EmbeddingColumn)
+        }
 
-    async def save_chunks_batch(self, chunks: list[IndexedChunk]) -> None:
-        if not chunks:
-            return
+    async def active_embedding_model(self) -> EmbeddingModel:
+        """Model new chunks are embedded with, and the column their vectors go to.
+
+        Follows cutovers made by the embedding backfill, re-reading at most
+        every model_refresh_seconds.
+        """
+        now = time.monotonic()
+        if now - self._model_checked_at < self._model_refresh_seconds:
+            return self._embedding_model
 
-        insert_sql = text("""
-            INSERT INTO document_chunks (
-                id, document_id, tenant_id, content,
-                page_number, chunk_index, token_count,
-                embedding_model, embedding
-            ) VALUES (
-                :id, :document_id, :tenant_id, :content,
-                :page_number, :chunk_index, :token_count,
-                :embedding_model, :embedding::vector
+        async with self._session_factory() as session:
+            row = (await session.execute(text(_ACTIVE_MODEL_SQL))).mappings().first()
+        self._model_checked_at = now
+        active = (
+            EmbeddingModel(
+                name=row["target_model"],
+                column=row["embedding_column"],
+                dimensions=row["dimensions"],
             )
-            ON CONFLICT (id) DO NOTHING
-        """)
+            if row
+            else None
+        )
+        if active and active != self._embedding_model:
+            logger.info(
+                "indexing.embedding_model.switched",
+                previous_model=self._embedding_model.name,
+                embedding_model=active.name,
+                embedding_column=active.column,
+            )
+            self._embedding_model = active
+        return self._embedding_model
 
-        rows = [
-            {
-                "id": chunk.chunk_id,
-                "document_id": chunk.document_id,
-                "tenant_id": chunk.tenant_id,
-                "content": chunk.content,
-                "page_number": chunk.page_number,
-                "chunk_index": chunk.chunk_index,
-                "token_count": chunk.token_count,
-                "embedding_model": chunk.embedding_model,
-                "embedding": "[" + ",".join(str(v) for v in chunk.embedding) + "]",
-            }
-            for chunk in chunks
-        ]
+    async def save_chunks_batch(
+        self, chunks: list[IndexedChunk], embedding_column: EmbeddingColumn = "embedding"
+    ) -> None:
+        """Bulk-load chunks with binary COPY.
 
-        async with self._session_factory() as session:
-            await session.execute(insert_sql, rows)
-            await session.commit()
+        Rows are generated lazily while asyncpg streams them, and embeddings go
+        over the wire as packed float32 via the vector codec.
+        """
+        if not chunks:
+            return
+
+        async with self._engine.begin() as conn:
+            await self._copy_chunks(conn, chunks, embedding_column)
 
         logger.info(
             "repository.chunks.saved",
@@ -63,6 +290,102 @@ class PostgresChunkRepository:
             chunk_count=len(chunks),
         )
 
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[IndexingUnitOfWork]:
+        """Stage chunk, status and processed-event writes; apply them atomically.
+
+        If the block raises, nothing is written and the event stays
+        unprocessed, so a redelivery starts from a clean slate.
+        """
+        uow = IndexingUnitOfWork()
+        yield uow
+
+        async with self._engine.begin() as conn:
+            if uow.locked_document is not None:
+                status = (
+                    await conn.execute(text(_LOCK_DOCUMENT_SQL), {"id": uow.locked_document})
+                ).scalar_one_or_none()
+                uow.superseded = status == "superseded"
+            if not uow.superseded:
+                deleted_count = await self._apply(conn, uow)
+            elif uow.processed_event:
+                event_id, consumer_group = uow.processed_event
+                await conn.execute(
+                    text(_MARK_EVENT_SQL),
+                    {"event_id": event_id, "consumer_group": consumer_group},
+                )
+
+        if uow.superseded:
+            logger.info(
+                "repository.unit_of_work.superseded",
+                document_id=str(uow.locked_document),
+                event_marked=uow.processed_event is not None,
+            )
+            return
+
+        logger.info(
+            "repository.unit_of_work.committed",
+            chunk_count=len(uow.chunks),
+            relinked_count=len(uow.relinked),
+            deleted_count=deleted_count,
+            statuses=[change.status for change in uow.status_changes],
+            event_marked=uow.processed_event is not None,
+        )
+
+    async def _apply(self, conn: AsyncConnection, uow: IndexingUnitOfWork) -> int:
+        """Write the staged changes; returns the number of chunk rows deleted."""
+        statuses, processed = list(uow.status_changes), uow.processed_event
+        # The first status update and the event marker share one statement. It
+        # runs before COPY so the driver has opened the transaction COPY joins.
+        if statuses and processed:
+            await conn.execute(
+                text(f"WITH marked AS ({_MARK_EVENT_SQL}) {_UPDATE_STATUS_SQL}"),
+                {
+                    **statuses.pop(0).params(),
+                    "event_id": processed[0],
+                    "consumer_group": processed[1],
+                },
+            )
+        elif processed:
+            await conn.execute(
+                text(_MARK_EVENT_SQL),
+                {"event_id": processed[0], "consumer_group": processed[1]},
+            )
+        for change in statuses:
+            await conn.execute(text(_UPDATE_STATUS_SQL), change.params())
+        if uow.relinked:
+            result = await conn.execute(
+                text(_RELINK_CHUNKS_SQL),
+                {
+                    "document_id": uow.relink_target,
+                    "previous_document_id": uow.relink_source,
+                    "tenant_id": uow.relinked[0][1].tenant_id,
+                    "ids": [chunk_id for chunk_id, _ in uow.relinked],
+                    "contents": [c.content for _, c in uow.relinked],
+                    "page_numbers": [c.page_number for _, c in uow.relinked],
+                    "chunk_indexes": [c.chunk_index for _, c in uow.relinked],
+                    "token_counts": [c.token_count for _, c in uow.relinked],
+                },
+            )
+            if result.rowcount != len(uow.relinked):
+                # Another revision took over some of the rows since the plan
+                # was made; roll back so a redelivery plans against what is left.
+                raise RuntimeError(
+                    f"Relinked {result.rowcount} of {len(uow.relinked)} chunks of "
+                    f"document {uow.relink_source}."
+                )
+        deleted_count = 0
+        if uow.deleted_document:
+            tenant_id, document_id = uow.deleted_document
+            result = await conn.execute(
+                text(_DELETE_DOCUMENT_CHUNKS_SQL),
+                {"tenant_id": tenant_id, "document_id": document_id},
+            )
+            deleted_count = result.rowcount
+        if uow.chunks:
+            await self._copy_chunks(conn, uow.chunks, uow.chunks_column or "embedding")
+        return deleted_count
+
     async def update_document_status(
         self,
         document_id: UUID,
@@ -70,26 +393,29 @@ class PostgresChunkRepository:
         chunk_count: int | None = None,
         page_count: int | None = None,
     ) -> None:
-        sql = text("""
-            UPDATE documents
-            SET status = :status,
-                chunk_count = COALESCE(:chunk_count, chunk_count),
-                page_count  = COALESCE(:page_count, page_count),
-                updated_at  = NOW()
-            WHERE id = :id
-        """)
+        change = _StatusChange(document_id, status, chunk_count, page_count)
+        async with self._session_factory() as session:
+            await session.execute(text(_UPDATE_STATUS_SQL), change.params())
+            await session.commit()
 
+    async def get_document_chunks(
+        self, document_id: UUID, tenant_id: str, embedding_model: EmbeddingModel
+    ) -> list[StoredChunk]:
+        """Chunks of a document that have an embedding_model vector (no vectors)."""
         async with self._session_factory() as session:
-            await session.execute(
-                sql,
+            result = await session.execute(
+                self._document_chunks_sql[embedding_model.column],
                 {
-                    "id": document_id,
-                    "status": status,
-                    "chunk_count": chunk_count,
-                    "page_count": page_count,
+                    "document_id": document_id,
+                    "tenant_id": tenant_id,
+                    "embedding_model": embedding_model.name,
                 },
             )
-            await session.commit()
+            rows = result.mappings().all()
+        return [
+            StoredChunk(chunk_id=row["id"], tenant_id=tenant_id, content=row["content"])
+            for row in rows
+        ]
 
     async def is_event_processed(self, event_id: str, consumer_group: str) -> bool:
         sql = text("""
@@ -102,17 +428,73 @@ class PostgresChunkRepository:
             )
             return result.first() is not None
 
+    async def get_document_status(self, document_id: UUID) -> str | None:
+        sql = text("SELECT status FROM documents WHERE id = :id")
+        async with self._session_factory() as session:
+            result = await session.execute(sql, {"id": document_id})
+            return result.scalar_one_or_none()
+
     async def mark_event_processed(self, event_id: str, consumer_group: str) -> None:
+        async with self._session_factory() as session:
+            await session.execute(
+                text(_MARK_EVENT_SQL), {"event_id": event_id, "consumer_group": consumer_group}
+            )
+            await session.commit()
+
+    async def get_cached_embeddings(
+        self, content_hashes: list[str], embedding_model: str
+    ) -> dict[str, list[float]]:
+        if not content_hashes:
+            return {}
+
         sql = text("""
-            INSERT INTO processed_events (event_id, consumer_group)
-            VALUES (:event_id, :consumer_group)
-            ON CONFLICT DO NOTHING
+            SELECT content_hash, embedding
+            FROM embedding_cache
+            WHERE embedding_model = :embedding_model
+              AND content_hash = ANY(:content_hashes)
         """)
         async with self._session_factory() as session:
-            await session.execute(
-                sql, {"event_id": event_id, "consumer_group": consumer_group}
+            result = await session.execute(
+                sql,
+                {"embedding_model": embedding_model, "content_hashes": content_hashes},
             )
+            rows = result.mappings().all()
+
+        return {row["content_hash"]: row["embedding"] for row in rows}
+
+    async def save_cached_embeddings(
+        self, embeddings: dict[str, list[float]], embedding_model: str
+    ) -> None:
+        if not embeddings:
+            return
+
+        sql = text("""
+            INSERT INTO embedding_cache (content_hash, embedding_model, embedding)
+            VALUES (:content_hash, :embedding_model, CAST(:embedding AS vector))
+            ON CONFLICT (content_hash, embedding_model) DO NOTHING
+        """)
+        rows = [
+            {
+                "content_hash": content_hash,
+                "embedding_model": embedding_model,
+                "embedding": embedding,
+            }
+            for content_hash, embedding in embeddings.items()
+        ]
+        async with self._session_factory() as session:
+            await session.execute(sql, rows)
             await session.commit()
 
+    @staticmethod
+    async def _copy_chunks(
+        conn: AsyncConnection, chunks: list[IndexedChunk], embedding_column: EmbeddingColumn
+    ) -> None:
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "document_chunks",
+            records=_chunk_records(chunks),
+            columns=[*_CHUNK_COPY_COLUMNS, f"{embedding_column}_model", embedding_column],
+        )
+
     async def dispose(self) -> None:
         await self._engine.dispose()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+import structlog
+from aiokafka import ConsumerRecord
+
+from indexing_service.infrastructure.producer import RedpandaIndexingProducer
+
+logger = structlog.get_logger(__name__)
+
+ATTEMPT_HEADER = "x-attempt"
+NOT_BEFORE_HEADER = "x-not-before-ms"
+ORIGINAL_TOPIC_HEADER = "x-original-topic"
+ERROR_HEADER = "x-error"
+
+_MAX_ERROR_CHARS = 1000
+
+# Failures that no amount of waiting will fix (malformed payloads).
+NON_RETRYABLE_ERRORS: tuple[type[Exception], ...] = (KeyError, ValueError, TypeError)
+
+DeadLetterCallback = Callable[[dict[str, Any], Exception], Awaitable[None]]
+
+
+def header_value(message: ConsumerRecord, name: str) -> str | None:
+    for key, value in message.headers or ():
+        if key == name and value is not None:
+            return value.decode("utf-8")
+    return None
+
+
+def attempt_of(message: ConsumerRecord) -> int:
+    value = header_value(message, ATTEMPT_HEADER)
+    return int(value) if value and value.isdigit() else 1
+
+
+def retry_topic_name(topic: str, tier: int) -> str:
+    return f"{topic}.retry.{tier}"
+
+
+class RetryRouter:
+    """Moves failed messages off the main topic instead of blocking their partition.
+
+    Attempt n (1-based, from the x-attempt header) that fails is republished to
+    retry tier n with x-not-before-ms set to now + that tier's delay. Once the
+    tiers are exhausted, or for non-retryable errors, the message goes to the
+    dead-letter topic and a DocumentIndexingFailedEvent is published.
+    """
+
+    def __init__(
+        self,
+        producer: RedpandaIndexingProducer,
+        topic: str,
+        retry_delays_seconds: Sequence[float],
+        dead_letter_topic: str,
+        on_dead_letter: DeadLetterCallback | None = None,
+    ) -> None:
+        self._producer = producer
+        self._topic = topic
+        self._retry_delays_seconds = list(retry_delays_seconds)
+        self._dead_letter_topic = dead_letter_topic
+        self._on_dead_letter = on_dead_letter
+
+    @property
+    def retry_topics(self) -> list[tuple[str, float]]:
+        return [
+            (retry_topic_name(self._topic, tier), delay)
+            for tier, delay in enumerate(self._retry_delays_seconds, start=1)
+        ]
+
+    async def route_failure(self, message: ConsumerRecord, error: Exception) -> None:
+        """Republish the failed message; raises if it could not be handed off."""
+        attempt = attempt_of(message)
+        error_text = f"{type(error).__name__}: {error}"[:_MAX_ERROR_CHARS]
+        headers = [
+            (ATTEMPT_HEADER, str(attempt + 1).encode()),
+            (ORIGINAL_TOPIC_HEADER, self._topic.encode()),
+            (ERROR_HEADER, error_text.encode()),
+        ]
+        key = message.key.decode("utf-8") if message.key else None
+        log = logger.bind(
+            topic=message.topic,
+            partition=message.partition,
+            offset=message.offset,
+            attempt=attempt,
+            error=error_text,
+        )
+
+        retryable = not isinstance(error, NON_RETRYABLE_ERRORS)
+        if retryable and attempt <= len(self._retry_delays_seconds):
+            retry_topic, delay = self.retry_topics[attempt - 1]
+            not_before_ms = int((time.time() + delay) * 1000)
+            headers.append((NOT_BEFORE_HEADER, str(not_before_ms).encode()))
+            await self._producer.send(retry_topic, message.value, key, headers)
+            log.warning("consumer.message.retry_scheduled", retry_topic=retry_topic, delay_s=delay)
+            return
+
+        await self._producer.send(self._dead_letter_topic, message.value, key, headers)
+        log.error(
+            "consumer.message.dead_lettered",
+            dead_letter_topic=self._dead_letter_topic,
+            retryable=retryable,
+        )
+
+        # The message is safely parked from here on; follow-up failures are only logged
+        # so the offset still gets committed.
+        payload = message.value if isinstance(message.value, dict) else {}
+        try:
+            await self._producer.publish_document_indexing_failed(
+                payload,
+                error_code="INDEXING_RETRIES_EXHAUSTED" if retryable else "INDEXING_INPUT_INVALID",
+                error_message=f"Attempt {attempt} failed with {error_text}",
+            )
+            if self._on_dead_letter:
+                await self._on_dead_letter(payload, error)
+        except Exception as exc:  # noqa: BLE001
+            log.warning("consumer.dead_letter.followup_failed", followup_error=str(exc))
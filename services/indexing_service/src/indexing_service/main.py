@@ -1,47 +1,80 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from typing import Any
 from uuid import UUID
 
-import aiofiles
 import structlog
-from fastapi import FastAPI
+from aiokafka.structs import RecordMetadata
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from indexing_service.domain.models import IndexedChunk
-from indexing_service.domain.services import ChunkingService, TextExtractionService
-from indexing_service.infrastructure.consumer import RedpandaConsumer
+from indexing_service.domain.services import ReindexPlan, plan_reindex
+from indexing_service.infrastructure.consumer import ConsumerStats, RedpandaConsumer
+from indexing_service.infrastructure.embedding_batcher import EmbeddingBatcher
+from indexing_service.infrastructure.embedding_cache import EmbeddingCache
 from indexing_service.infrastructure.embedding_client import EmbeddingClient
+from indexing_service.infrastructure.extraction_pool import ExtractionExecutor
+from indexing_service.infrastructure.metrics import EMBEDDING_TOKENS_TOTAL, StageTimer
 from indexing_service.infrastructure.producer import RedpandaIndexingProducer
 from indexing_service.infrastructure.repository import PostgresChunkRepository
+from indexing_service.infrastructure.retry import RetryRouter
 from indexing_service.settings import Settings
+from shared.llm import create_openai_client
 from shared.logging.config import configure_logging
+from shared.ratelimit import AdaptiveRateLimiter, RateLimiterStats
 from shared.schemas.base import HealthResponse
+from shared.schemas.documents import EmbeddingModel
 
 settings = Settings()
 configure_logging(settings.service_name, settings.log_level)
 logger = structlog.get_logger(__name__)
 
-chunker = ChunkingService(
+extraction_executor = ExtractionExecutor(
+    mode=settings.extraction_mode,
     chunk_size_tokens=settings.chunk_size_tokens,
     overlap_tokens=settings.chunk_overlap_tokens,
+    chunking_strategy=settings.chunking_strategy,
+    max_workers=settings.extraction_max_workers,
+    max_tasks_per_child=settings.extraction_max_tasks_per_child,
+)
+embedding_rate_limiter = AdaptiveRateLimiter(
+    name=settings.azure_openai_embedding_deployment,
+    requests_per_minute=settings.azure_openai_requests_per_minute,
+    tokens_per_minute=settings.azure_openai_tokens_per_minute,
+    max_concurrency=settings.azure_openai_max_concurrency,
 )
-extractor = TextExtractionService()
 embedding_client = EmbeddingClient(
-    endpoint=settings.azure_openai_endpoint,
-    api_key=settings.azure_openai_api_key.get_secret_value(),
-    api_version=settings.azure_openai_api_version,
+    client=create_openai_client(settings, embedding_rate_limiter),
     deployment=settings.azure_openai_embedding_deployment,
+    rate_limiter=embedding_rate_limiter,
+)
+embedding_batcher = EmbeddingBatcher(
+    client=embedding_client,
+    max_items=settings.embedding_batch_max_items,
+    max_tokens=settings.embedding_batch_max_tokens,
+    max_wait_ms=settings.embedding_batch_max_wait_ms,
+    max_concurrent_requests=settings.embedding_max_concurrent_requests,
 )
 
 _repository: PostgresChunkRepository | None = None
 _producer: RedpandaIndexingProducer | None = None
+_embedding_cache: EmbeddingCache | None = None
 
 
-async def handle_document_uploaded(payload: dict[str, Any]) -> None:
-    global _repository, _producer
+async def handle_document_uploaded(
+    payload: dict[str, Any],
+) -> asyncio.Future[RecordMetadata] | None:
+    """Index one document.
+
+    Returns the pending broker ack of document.indexed; the consumer awaits it
+    before committing the offset.
+    """
+    global _repository, _producer, _embedding_cache
 
     event_id = str(payload.get("event_id", ""))
     document_id = UUID(payload["document_id"])
@@ -49,6 +82,9 @@ async def handle_document_uploaded(payload: dict[str, Any]) -> None:
     storage_path = payload["storage_path"]
     content_type = payload["content_type"]
     correlation_id = UUID(str(payload.get("correlation_id", "")))
+    previous_document_id = (
+        UUID(payload["previous_document_id"]) if payload.get("previous_document_id") else None
+    )
 
     log = logger.bind(
         document_id=str(document_id),
@@ -59,26 +95,70 @@ async def handle_document_uploaded(payload: dict[str, Any]) -> None:
     if _repository and await _repository.is_event_processed(event_id, settings.consumer_group_id):
         log.debug("indexing.event.already_processed", event_id=event_id)
         return
+    if _repository and await _repository.get_document_status(document_id) == "superseded":
+        # A later revision already replaced this version (e.g. this is a late retry).
+        log.info("indexing.document.superseded_skipped", event_id=event_id)
+        return
 
     log.info("indexing.document.started")
+    timer = StageTimer()
 
     if _repository:
-        await _repository.update_document_status(document_id, "indexing")
-
-    async with aiofiles.open(storage_path, "rb") as f:
-        content = await f.read()
-
-    text, page_count = extractor.extract(content, content_type)
-    raw_chunks = chunker.chunk_text(document_id, tenant_id, text)
+        with timer.stage("db_prepare"):
+            await _repository.update_document_status(document_id, "indexing")
+
+    started = time.perf_counter()
+    extracted = await extraction_executor.run(storage_path, content_type, document_id, tenant_id)
+    worker_seconds = extracted.read_seconds + extracted.extract_seconds + extracted.chunk_seconds
+    timer.record("read", extracted.read_seconds, extracted.content_bytes)
+    timer.record("extract", extracted.extract_seconds, extracted.content_bytes)
+    timer.record("chunk", extracted.chunk_seconds, extracted.text_bytes)
+    # Time queued for a pool worker plus pickling; zero-ish in inline mode.
+    timer.record("pool_wait", max(0.0, time.perf_counter() - started - worker_seconds))
+    raw_chunks = extracted.chunks
+    page_count = extracted.page_count
+    file_size_bytes = int(payload.get("file_size_bytes") or extracted.content_bytes)
 
     if not raw_chunks:
-        log.warning("indexing.document.no_chunks_extracted")
+        log.warning("indexing.document.no_chunks_extracted", stage_ms=timer.milliseconds())
         if _repository:
             await _repository.update_document_status(document_id, "failed")
+        timer.observe(content_type, file_size_bytes, "no_chunks")
         return
 
-    texts = [c.content for c in raw_chunks]
-    embeddings = await embedding_client.embed_texts(texts)
+    embedding_model = (
+        await _repository.active_embedding_model()
+        if _repository
+        else EmbeddingModel(name=settings.azure_openai_embedding_deployment)
+    )
+    plan: ReindexPlan | None = None
+    if (
+        _repository
+        and previous_document_id
+        and previous_document_id != document_id
+        and settings.incremental_reindex_enabled
+    ):
+        with timer.stage("reindex_plan"):
+            previous_chunks = await _repository.get_document_chunks(
+                previous_document_id, tenant_id, embedding_model
+            )
+            plan = plan_reindex(raw_chunks, previous_chunks, embedding_model.name)
+        log.info(
+            "indexing.reindex.planned",
+            previous_document_id=str(previous_document_id),
+            reused_count=len(plan.reused),
+            changed_count=len(plan.changed),
+            obsolete_count=len(plan.obsolete),
+        )
+    to_embed = plan.changed if plan else raw_chunks
+
+    if not _embedding_cache:
+        raise RuntimeError("Embedding cache is not initialised.")
+    with timer.stage("embed", sum(len(c.content.encode("utf-8")) for c in to_embed)):
+        cached = await _embedding_cache.embed_chunks(to_embed, embedding_model)
+    embeddings = cached.embeddings
+    tokens_total = sum(c.token_count for c in to_embed)
+    tokens_embedded = tokens_total - cached.tokens_saved
 
     indexed_chunks = [
         IndexedChunk(
@@ -90,58 +170,154 @@ async def handle_document_uploaded(payload: dict[str, Any]) -> None:
             chunk_index=raw.chunk_index,
             token_count=raw.token_count,
             embedding=embeddings[i],
-            embedding_model=settings.azure_openai_embedding_deployment,
+            embedding_model=embedding_model.name,
         )
-        for i, raw in enumerate(raw_chunks)
+        for i, raw in enumerate(to_embed)
     ]
+    chunk_count = len(raw_chunks)
 
     if _repository:
-        await _repository.save_chunks_batch(indexed_chunks)
-        await _repository.update_document_status(
-            document_id, "indexed",
-            chunk_count=len(indexed_chunks),
-            page_count=page_count,
+        db_bytes = sum(
+            len(c.content.encode("utf-8")) + 4 * len(c.embedding) for c in indexed_chunks
         )
-        await _repository.mark_event_processed(event_id, settings.consumer_group_id)
-
+        with timer.stage("db_write", db_bytes):
+            async with _repository.unit_of_work() as uow:
+                uow.skip_if_superseded(document_id)
+                uow.add_chunks(indexed_chunks, embedding_model.column)
+                uow.update_document_status(
+                    document_id, "indexed",
+                    chunk_count=chunk_count,
+                    page_count=page_count,
+                )
+                if plan and previous_document_id:
+                    uow.relink_chunks(document_id, previous_document_id, plan.reused)
+                    uow.delete_document_chunks(tenant_id, previous_document_id)
+                    uow.update_document_status(
+                        previous_document_id, "superseded", chunk_count=0
+                    )
+                uow.mark_event_processed(event_id, settings.consumer_group_id)
+        if uow.superseded:
+            # A revision replaced this version while it was being indexed.
+            log.info("indexing.document.superseded_skipped", event_id=event_id)
+            timer.observe(content_type, file_size_bytes, "superseded")
+            return
+
+    delivery = None
     if _producer:
-        await _producer.publish_document_indexed(
-            correlation_id=correlation_id,
-            tenant_id=tenant_id,
-            document_id=document_id,
-            chunk_count=len(indexed_chunks),
-            page_count=page_count,
-            embedding_model=settings.azure_openai_embedding_deployment,
-        )
+        with timer.stage("publish"):
+            delivery = await _producer.publish_document_indexed(
+                correlation_id=correlation_id,
+                tenant_id=tenant_id,
+                document_id=document_id,
+                chunk_count=chunk_count,
+                page_count=page_count,
+                embedding_model=embedding_model.name,
+            )
+
+    timer.observe(content_type, file_size_bytes, "indexed")
+    EMBEDDING_TOKENS_TOTAL.labels(content_type, "embedded").inc(tokens_embedded)
+    EMBEDDING_TOKENS_TOTAL.labels(content_type, "cached").inc(cached.tokens_saved)
+
+    log.info(
+        "indexing.document.completed",
+        chunk_count=chunk_count,
+        chunks_reused=len(plan.reused) if plan else 0,
+        page_count=page_count,
+        embedding_cache_hits=cached.hits,
+        embedding_cache_misses=cached.misses,
+        embedding_cache_hit_rate=round(cached.hit_rate, 3),
+        embedding_inputs_saved=cached.hits,
+        embedding_tokens_saved=cached.tokens_saved,
+        embedding_tokens=tokens_embedded,
+        file_size_bytes=file_size_bytes,
+        stage_ms=timer.milliseconds(),
+        stage_bytes=timer.bytes,
+    )
+    return delivery
+
 
-    log.info("indexing.document.completed", chunk_count=len(indexed_chunks), page_count=page_count)
+async def mark_document_failed(payload: dict[str, Any], error: Exception) -> None:
+    if _repository and payload.get("document_id"):
+        await _repository.update_document_status(UUID(str(payload["document_id"])), "failed")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    global _repository, _producer
+    global _repository, _producer, _embedding_cache
 
     logger.info("service.starting", version=settings.app_version)
 
-    _repository = PostgresChunkRepository(database_url=settings.database_url.get_secret_value())
-    _producer = RedpandaIndexingProducer(bootstrap_servers=settings.redpanda_bootstrap_servers)
+    _repository = PostgresChunkRepository(
+        database_url=settings.database_url.get_secret_value(),
+        default_embedding_model=settings.azure_openai_embedding_deployment,
+        model_refresh_seconds=settings.embedding_model_refresh_seconds,
+    )
+    _producer = RedpandaIndexingProducer(settings)
     await _producer.start()
+    extraction_executor.start()
+    await embedding_batcher.start()
+    _embedding_cache = EmbeddingCache(
+        embedder=embedding_batcher,
+        repository=_repository if settings.embedding_cache_persistent else None,
+        max_entries=settings.embedding_cache_max_entries,
+    )
 
-    consumer = RedpandaConsumer(
-        bootstrap_servers=settings.redpanda_bootstrap_servers,
+    retry_router = RetryRouter(
+        producer=_producer,
         topic=settings.consumer_topic,
-        group_id=settings.consumer_group_id,
-        handler=handle_document_uploaded,
+        retry_delays_seconds=settings.consumer_retry_delays_seconds,
+        dead_letter_topic=settings.consumer_dead_letter_topic,
+        on_dead_letter=mark_document_failed,
     )
-    await consumer.start()
-    consume_task = asyncio.create_task(consumer.consume())
-    app.state.consumer = consumer
+    consumers = [
+        RedpandaConsumer(
+            bootstrap_servers=settings.redpanda_bootstrap_servers,
+            topic=settings.consumer_topic,
+            group_id=settings.consumer_group_id,
+            handler=handle_document_uploaded,
+            max_concurrency=settings.consumer_max_concurrency,
+            max_pending=settings.consumer_max_pending,
+            drain_timeout_seconds=settings.consumer_drain_timeout_seconds,
+            on_failure=retry_router.route_failure,
+            ordering_field="document_id",
+        )
+    ]
+    # Retry tiers get a small share of capacity so poison documents cannot crowd
+    # out fresh uploads. Each tier is its own consumer group, so holding a tier's
+    # partitions never stalls a rebalance of the main topic or another tier.
+    consumers += [
+        RedpandaConsumer(
+            bootstrap_servers=settings.redpanda_bootstrap_servers,
+            topic=retry_topic,
+            group_id=f"{settings.consumer_group_id}.retry.{tier}",
+            handler=handle_document_uploaded,
+            max_concurrency=settings.consumer_retry_max_concurrency,
+            max_pending=settings.consumer_retry_max_concurrency,
+            drain_timeout_seconds=settings.consumer_drain_timeout_seconds,
+            on_failure=retry_router.route_failure,
+            ordering_field="document_id",
+        )
+        for tier, (retry_topic, _) in enumerate(retry_router.retry_topics, start=1)
+    ]
+    for consumer in consumers:
+        await consumer.start()
+    consume_tasks = [asyncio.create_task(consumer.consume()) for consumer in consumers]
+    app.state.consumers = consumers
 
-    logger.info("service.ready", topic=settings.consumer_topic)
+    logger.info(
+        "service.ready",
+        topic=settings.consumer_topic,
+        retry_topics=[topic for topic, _ in retry_router.retry_topics],
+        max_concurrency=settings.consumer_max_concurrency,
+    )
     yield
 
-    consume_task.cancel()
-    await consumer.stop()
+    for task in consume_tasks:
+        task.cancel()
+    for consumer in consumers:
+        await consumer.stop()
+    await embedding_batcher.stop()
+    extraction_executor.stop()
     await _producer.stop()
     await _repository.dispose()
     logger.info("service.stopped")
@@ -162,3 +338,19 @@ async def health() -> HealthResponse:
         service=settings.service_name,
         version=settings.app_version,
     )
+
+
+@app.get("/consumer/stats", response_model=list[ConsumerStats], tags=["ops"])
+async def consumer_stats(request: Request) -> list[ConsumerStats]:
+    consumers: list[RedpandaConsumer] = request.app.state.consumers
+    return [consumer.stats() for consumer in consumers]
+
+
+@app.get("/rate-limit/stats", response_model=RateLimiterStats, tags=["ops"])
+async def rate_limit_stats() -> RateLimiterStats:
+    return embedding_rate_limiter.stats()
+
+
+@app.get("/metrics", tags=["ops"], include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,251 @@
+"""Partition document_chunks by tenant and move large tenants to their own partition.
+
+Usage (same environment as the indexing service):
+
+    python -m indexing_service.partitions status [--min-rows 1000000]
+    python -m indexing_service.partitions convert [--hash-partitions 16] \
+        [--dedicate TENANT ...] [--min-rows 1000000]
+    python -m indexing_service.partitions promote TENANT
+    python -m indexing_service.partitions drop-legacy
+
+convert migrates a database created before document_chunks was partitioned:
+it builds the partitioned table next to the old one (tenants given with
+--dedicate or holding at least --min-rows chunks get their own partition, the
+rest share hash partitions), copies the rows in keyset batches, builds the
+indexes, then swaps the tables in one short transaction and keeps the old
+table as document_chunks_legacy until drop-legacy.
+
+promote moves one tenant out of the shared hash partitions into a dedicated
+partition with its own HNSW graph, e.g. when status lists it as a candidate.
+
+A trigger logs chunk writes made during the copy and only the final replay
+of that log runs under a lock, which blocks chunk writes. For promote the
+same transaction also locks the shared partitions against reads: it deletes
+the tenant's rows there and attaches the new partition, which scans the one
+hash partition the tenant's rows were in (the others are ruled out by
+constraints validated beforehand). Searches of tenants in the shared
+partitions wait for that, so run promote when a pause of that length is
+acceptable. Both can be stopped and run again to resume. Run one at a time.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import signal
+import time
+from collections.abc import Awaitable, Callable
+from uuid import UUID
+
+import structlog
+from sqlalchemy.exc import DBAPIError
+
+from indexing_service.infrastructure.partition_repository import (
+    CHUNKS_TABLE,
+    LEGACY_TABLE,
+    SHARED_PARTITION,
+    STAGED_TABLE,
+    ChunkPartitionRepository,
+    partition_name,
+)
+from indexing_service.settings import Settings
+from shared.logging.config import configure_logging
+
+logger = structlog.get_logger(__name__)
+
+_FIRST_CHUNK_ID = UUID(int=0)
+
+
+class ChunkPartitioner:
+    def __init__(
+        self,
+        repository: ChunkPartitionRepository,
+        batch_size: int = 5_000,
+        cutover_lock_timeout_ms: int = 10_000,
+        retry_interval_seconds: float = 30.0,
+    ) -> None:
+        self._repository = repository
+        self._batch_size = batch_size
+        self._cutover_lock_timeout_ms = cutover_lock_timeout_ms
+        self._retry_interval_seconds = retry_interval_seconds
+
+    async def convert(
+        self, hash_partitions: int, dedicated_tenants: list[str], min_rows: int
+    ) -> None:
+        relkind = await self._repository.relkind(CHUNKS_TABLE)
+        if relkind == "p":
+            logger.info("partitions.convert.skipped", reason="already partitioned")
+            return
+
+        if await self._repository.relkind(STAGED_TABLE) is None:
+            large = await self._repository.tenant_sizes(CHUNKS_TABLE, min_rows)
+            dedicated_tenants = list(
+                dict.fromkeys([*dedicated_tenants, *(tenant for tenant, _ in large)])
+            )
+        logger.info(
+            "partitions.convert.started",
+            hash_partitions=hash_partitions,
+            dedicated_tenants=dedicated_tenants,
+        )
+        await self._repository.start_change_log()
+        await self._repository.create_partitioned_table(hash_partitions, dedicated_tenants)
+        await self._copy(CHUNKS_TABLE, STAGED_TABLE)
+        await self._repository.build_indexes(CHUNKS_TABLE, STAGED_TABLE)
+        await self._cut_over(
+            CHUNKS_TABLE,
+            STAGED_TABLE,
+            None,
+            lambda: self._repository.swap_tables(self._cutover_lock_timeout_ms),
+        )
+        logger.info("partitions.convert.completed", legacy_table=LEGACY_TABLE)
+
+    async def promote(self, tenant_id: str) -> None:
+        if await self._repository.relkind(CHUNKS_TABLE) != "p":
+            raise SystemExit(f"{CHUNKS_TABLE} is not partitioned yet; run convert first.")
+        name = partition_name(tenant_id)
+        if any(partition.name == name for partition in await self._repository.partitions()):
+            logger.info("partitions.promote.skipped", tenant_id=tenant_id, partition=name)
+            return
+
+        logger.info("partitions.promote.started", tenant_id=tenant_id, partition=name)
+        await self._repository.start_change_log()
+        await self._repository.create_tenant_table(tenant_id)
+        await self._copy(CHUNKS_TABLE, name, tenant_id)
+        await self._repository.build_indexes(CHUNKS_TABLE, name, name_prefix=name)
+        excluded = await self._repository.exclude_from_shared(
+            tenant_id, self._cutover_lock_timeout_ms
+        )
+        logger.info("partitions.shared.excluded", tenant_id=tenant_id, partitions=len(excluded))
+        await self._cut_over(
+            CHUNKS_TABLE,
+            name,
+            tenant_id,
+            lambda: self._repository.attach_tenant_table(
+                tenant_id, name, self._cutover_lock_timeout_ms
+            ),
+        )
+        logger.info("partitions.promote.completed", tenant_id=tenant_id, partition=name)
+
+    async def _copy(self, source: str, target: str, tenant_id: str | None = None) -> None:
+        cursor = await self._repository.last_copied_id(target, tenant_id) or _FIRST_CHUNK_ID
+        started = time.monotonic()
+        copied = 0
+        while True:
+            count, last_id = await self._repository.copy_batch(
+                source, target, cursor, self._batch_size, tenant_id
+            )
+            if last_id is None:
+                break
+            cursor = last_id
+            copied += count
+            elapsed = time.monotonic() - started
+            logger.info(
+                "partitions.copy.progress",
+                target=target,
+                copied_rows=copied,
+                rows_per_s=round(copied / elapsed, 1) if elapsed > 0 else None,
+            )
+        logger.info("partitions.copy.completed", target=target, copied_rows=copied)
+
+    async def _cut_over(
+        self,
+        source: str,
+        target: str,
+        tenant_id: str | None,
+        cut_over: Callable[[], Awaitable[int]],
+    ) -> None:
+        # Shrink the log outside the lock first so the final replay is short.
+        while await self._repository.pending_changes() > self._batch_size:
+            replayed = await self._repository.replay_changes(source, target, tenant_id)
+            logger.info("partitions.changes.replayed", target=target, replayed_rows=replayed)
+        while True:
+            try:
+                replayed = await cut_over()
+            except DBAPIError as exc:
+                logger.warning("partitions.cutover.deferred", error=str(exc.orig or exc))
+                await asyncio.sleep(self._retry_interval_seconds)
+                await self._repository.replay_changes(source, target, tenant_id)
+                continue
+            logger.info("partitions.cutover.completed", target=target, replayed_rows=replayed)
+            return
+
+
+async def _log_status(repository: ChunkPartitionRepository, min_rows: int) -> None:
+    relkind = await repository.relkind(CHUNKS_TABLE)
+    if relkind != "p":
+        logger.warning("partitions.status.not_partitioned", table=CHUNKS_TABLE)
+        candidates = await repository.tenant_sizes(CHUNKS_TABLE, min_rows)
+    else:
+        for partition in await repository.partitions():
+            logger.info(
+                "partitions.status.partition",
+                partition=partition.name,
+                approx_rows=partition.approx_rows,
+                bound=partition.bound,
+            )
+        candidates = await repository.tenant_sizes(SHARED_PARTITION, min_rows)
+    if await repository.relkind(LEGACY_TABLE) is not None:
+        logger.warning("partitions.status.legacy_present", table=LEGACY_TABLE)
+    logger.info(
+        "partitions.status.candidates",
+        min_rows=min_rows,
+        candidates=[
+            {"tenant_id": tenant_id, "chunks": chunks} for tenant_id, chunks in candidates
+        ],
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    status = commands.add_parser("status", help="Log partitions and promotion candidates.")
+    status.add_argument("--min-rows", type=int, default=1_000_000)
+    convert = commands.add_parser("convert", help="Partition an unpartitioned document_chunks.")
+    convert.add_argument("--hash-partitions", type=int, default=16)
+    convert.add_argument(
+        "--dedicate",
+        action="append",
+        default=[],
+        metavar="TENANT",
+        help="Give this tenant its own partition (repeatable).",
+    )
+    convert.add_argument(
+        "--min-rows",
+        type=int,
+        default=1_000_000,
+        help="Also dedicate a partition to every tenant with at least this many chunks.",
+    )
+    promote = commands.add_parser("promote", help="Move a tenant to its own partition.")
+    promote.add_argument("tenant_id")
+    commands.add_parser("drop-legacy", help=f"Drop {LEGACY_TABLE} after a convert.")
+    args = parser.parse_args()
+
+    settings = Settings()
+    configure_logging(f"{settings.service_name}.partitions", settings.log_level)
+    repository = ChunkPartitionRepository(settings.database_url.get_secret_value())
+    partitioner = ChunkPartitioner(
+        repository,
+        batch_size=settings.partition_copy_batch_size,
+        cutover_lock_timeout_ms=settings.partition_cutover_lock_timeout_ms,
+    )
+
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        if args.command == "status":
+            await _log_status(repository, args.min_rows)
+        elif args.command == "convert":
+            await partitioner.convert(args.hash_partitions, args.dedicate, args.min_rows)
+        elif args.command == "promote":
+            await partitioner.promote(args.tenant_id)
+        else:
+            await repository.drop_legacy_table()
+    except asyncio.CancelledError:
+        logger.info("partitions.stopped", command=args.command)
+    finally:
+        await repository.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
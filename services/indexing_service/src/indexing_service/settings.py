@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import Field
 from shared.config.base import BaseServiceSettings
 
@@ -13,3 +15,39 @@ class Settings(BaseServiceSettings):
 
     chunk_size_tokens: int = Field(default=512, ge=64, le=2048)
     chunk_overlap_tokens: int = Field(default=64, ge=0, le=256)
+    chunking_strategy: Literal["token_window", "boundary"] = Field(default="token_window")
+
+    extraction_mode: Literal["inline", "process"] = Field(default="process")
+    extraction_max_workers: int | None = Field(default=None, ge=1, le=64)
+    extraction_max_tasks_per_child: int | None = Field(default=100, ge=1)
+
+    consumer_max_concurrency: int = Field(default=4, ge=1, le=64)
+    consumer_max_pending: int = Field(default=32, ge=1, le=1024)
+    consumer_drain_timeout_seconds: float = Field(default=30.0, ge=0.0)
+    consumer_retry_delays_seconds: list[float] = Field(default=[15.0, 60.0, 300.0])
+    consumer_retry_max_concurrency: int = Field(default=1, ge=1, le=16)
+    consumer_dead_letter_topic: str = Field(default="document.uploaded.dlt")
+
+    embedding_batch_max_items: int = Field(default=256, ge=1, le=2048)
+    embedding_batch_max_tokens: int = Field(default=64_000, ge=1024)
+    embedding_batch_max_wait_ms: int = Field(default=20, ge=0, le=5000)
+    embedding_max_concurrent_requests: int = Field(default=4, ge=1, le=64)
+    # How often to re-read the model activated by the embedding backfill.
+    embedding_model_refresh_seconds: float = Field(default=5.0, ge=0.0)
+
+    embedding_cache_max_entries: int = Field(default=10_000, ge=0)
+    embedding_cache_persistent: bool = Field(default=True)
+
+    incremental_reindex_enabled: bool = Field(default=True)
+
+    # Embedding-model backfill worker (python -m indexing_service.backfill)
+    backfill_batch_size: int = Field(default=128, ge=1, le=2048)
+    backfill_requests_per_minute: int = Field(default=0, ge=0)
+    backfill_tokens_per_minute: int = Field(default=150_000, ge=0)
+    backfill_batch_pause_ms: int = Field(default=0, ge=0)
+    backfill_follow_interval_seconds: float = Field(default=60.0, gt=0.0)
+    backfill_cutover_lock_timeout_ms: int = Field(default=10_000, ge=0)
+
+    # Chunk partition maintenance (python -m indexing_service.partitions)
+    partition_copy_batch_size: int = Field(default=5_000, ge=1)
+    partition_cutover_lock_timeout_ms: int = Field(default=10_000, ge=0)
@@ -25,6 +25,7 @@ def get_ingestion_service(request: Request) -> IngestionService:
     return IngestionService(
         storage=request.app.state.storage,
         repository=request.app.state.repository,
-        publisher=request.app.state.publisher,
         max_file_size_bytes=_settings.max_document_size_mb * 1024 * 1024,
+        max_batch_files=_settings.max_batch_files,
+        max_archive_size_bytes=_settings.max_archive_size_mb * 1024 * 1024,
     )
@@ -1,18 +1,41 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import AsyncIterator
 
 import structlog
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from ingestion_service.api.dependencies import get_ingestion_service
+from ingestion_service.api.dependencies import get_ingestion_service, get_storage
 from ingestion_service.domain.exceptions import (
+    BatchNotFoundError,
+    BatchTooLargeError,
     DocumentTooLargeError,
     IngestionError,
+    InvalidArchiveError,
+    PreviousDocumentNotFoundError,
     UnsupportedContentTypeError,
 )
-from ingestion_service.domain.models import DocumentUploadResponse
+from ingestion_service.domain.interfaces import DocumentStoragePort
+from ingestion_service.domain.models import (
+    BatchStatusResponse,
+    BatchUploadResponse,
+    DocumentUploadResponse,
+    IncomingFile,
+)
 from ingestion_service.domain.services import IngestionService
+from ingestion_service.infrastructure.archive import iter_zip_files
 from ingestion_service.settings import Settings
 from shared.logging.config import bind_request_context
 from shared.schemas.base import ErrorResponse, HealthResponse
@@ -21,6 +44,22 @@ logger = structlog.get_logger(__name__)
 router = APIRouter()
 settings = Settings()
 
+_UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
+
+
+async def _read_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(_UPLOAD_READ_CHUNK_BYTES):
+        yield chunk
+
+
+async def _incoming_files(files: list[UploadFile]) -> AsyncIterator[IncomingFile]:
+    for file in files:
+        yield IncomingFile(
+            filename=file.filename or "unknown",
+            content_type=file.content_type or "application/octet-stream",
+            content=_read_chunks(file),
+        )
+
 
 @router.get("/health", response_model=HealthResponse, tags=["ops"])
 async def health() -> HealthResponse:
@@ -31,6 +70,11 @@ async def health() -> HealthResponse:
     )
 
 
+@router.get("/metrics", tags=["ops"], include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @router.post(
     "/documents",
     response_model=DocumentUploadResponse,
@@ -42,6 +86,7 @@ async def upload_document(
     file: UploadFile = File(...),
     tenant_id: str = Form(...),
     uploaded_by: str = Form(...),
+    previous_document_id: uuid.UUID | None = Form(default=None),
     service: IngestionService = Depends(get_ingestion_service),
 ) -> DocumentUploadResponse:
     correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
@@ -54,21 +99,22 @@ async def upload_document(
     )
     log.info("ingestion.request.received")
 
-    content = await file.read()
-
     try:
         document = await service.ingest_document(
             tenant_id=tenant_id,
             uploaded_by=uploaded_by,
             filename=file.filename or "unknown",
             content_type=file.content_type or "application/octet-stream",
-            content=content,
+            content=_read_chunks(file),
             correlation_id=correlation_id,
+            previous_document_id=previous_document_id,
         )
     except UnsupportedContentTypeError as exc:
         raise HTTPException(status_code=415, detail=exc.error_code) from exc
     except DocumentTooLargeError as exc:
         raise HTTPException(status_code=413, detail=exc.error_code) from exc
+    except PreviousDocumentNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=exc.error_code) from exc
     except IngestionError as exc:
         log.error("ingestion.request.failed", error_code=exc.error_code, error=str(exc))
         raise HTTPException(status_code=500, detail=exc.error_code) from exc
@@ -78,4 +124,93 @@ async def upload_document(
         filename=document.filename,
         status=document.status,
         correlation_id=correlation_id,
+        duplicate_of=document.canonical_document_id,
     )
+
+
+@router.post(
+    "/documents/batch",
+    response_model=BatchUploadResponse,
+    status_code=202,
+    tags=["ingestion"],
+)
+async def upload_batch(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    tenant_id: str = Form(...),
+    uploaded_by: str = Form(...),
+    service: IngestionService = Depends(get_ingestion_service),
+) -> BatchUploadResponse:
+    correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
+    bind_request_context(correlation_id=correlation_id, tenant_id=tenant_id, user_id=uploaded_by)
+    log = logger.bind(correlation_id=correlation_id, tenant_id=tenant_id)
+    log.info("ingestion.batch.received", file_count=len(files))
+
+    try:
+        return await service.ingest_batch(
+            tenant_id=tenant_id,
+            uploaded_by=uploaded_by,
+            files=_incoming_files(files),
+            correlation_id=correlation_id,
+        )
+    except BatchTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=exc.error_code) from exc
+    except IngestionError as exc:
+        log.error("ingestion.batch.failed", error_code=exc.error_code, error=str(exc))
+        raise HTTPException(status_code=500, detail=exc.error_code) from exc
+
+
+@router.post(
+    "/documents/batch/archive",
+    response_model=BatchUploadResponse,
+    status_code=202,
+    tags=["ingestion"],
+)
+async def upload_archive(
+    request: Request,
+    tenant_id: str = Query(...),
+    uploaded_by: str = Query(...),
+    service: IngestionService = Depends(get_ingestion_service),
+    storage: DocumentStoragePort = Depends(get_storage),
+) -> BatchUploadResponse:
+    """Ingest every file of a zip archive sent as the raw request body."""
+    correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
+    bind_request_context(correlation_id=correlation_id, tenant_id=tenant_id, user_id=uploaded_by)
+    log = logger.bind(correlation_id=correlation_id, tenant_id=tenant_id)
+    log.info("ingestion.archive.received")
+
+    staging_path: str | None = None
+    try:
+        staging_path = await service.stage_archive(request.stream(), correlation_id)
+        return await service.ingest_batch(
+            tenant_id=tenant_id,
+            uploaded_by=uploaded_by,
+            files=iter_zip_files(staging_path, _UPLOAD_READ_CHUNK_BYTES),
+            correlation_id=correlation_id,
+        )
+    except InvalidArchiveError as exc:
+        raise HTTPException(status_code=400, detail=exc.error_code) from exc
+    except (BatchTooLargeError, DocumentTooLargeError) as exc:
+        raise HTTPException(status_code=413, detail=exc.error_code) from exc
+    except IngestionError as exc:
+        log.error("ingestion.batch.failed", error_code=exc.error_code, error=str(exc))
+        raise HTTPException(status_code=500, detail=exc.error_code) from exc
+    finally:
+        if staging_path:
+            await storage.delete(staging_path)
+
+
+@router.get(
+    "/documents/batch/{batch_id}",
+    response_model=BatchStatusResponse,
+    tags=["ingestion"],
+)
+async def get_batch_status(
+    batch_id: uuid.UUID,
+    tenant_id: str = Query(...),
+    service: IngestionService = Depends(get_ingestion_service),
+) -> BatchStatusResponse:
+    try:
+        return await service.get_batch_status(batch_id, tenant_id)
+    except BatchNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=exc.error_code) from exc
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from uuid import UUID
+
 
 class IngestionError(Exception):
     def __init__(self, message: str, error_code: str) -> None:
@@ -23,9 +25,41 @@ class DocumentTooLargeError(IngestionError):
         )
 
 
+class PreviousDocumentNotFoundError(IngestionError):
+    def __init__(self, document_id: UUID) -> None:
+        super().__init__(
+            message=f"Previous document {document_id} does not exist for this tenant.",
+            error_code="PREVIOUS_DOCUMENT_NOT_FOUND",
+        )
+
+
 class StorageError(IngestionError):
     def __init__(self, detail: str) -> None:
         super().__init__(
             message=f"Storage operation failed: {detail}",
             error_code="STORAGE_ERROR",
         )
+
+
+class BatchTooLargeError(IngestionError):
+    def __init__(self, limit_files: int) -> None:
+        super().__init__(
+            message=f"Batch contains more than {limit_files} files.",
+            error_code="BATCH_TOO_LARGE",
+        )
+
+
+class BatchNotFoundError(IngestionError):
+    def __init__(self, batch_id: UUID) -> None:
+        super().__init__(
+            message=f"Batch {batch_id} does not exist for this tenant.",
+            error_code="BATCH_NOT_FOUND",
+        )
+
+
+class InvalidArchiveError(IngestionError):
+    def __init__(self, detail: str) -> None:
+        super().__init__(
+            message=f"Archive could not be read: {detail}",
+            error_code="INVALID_ARCHIVE",
+        )
@@ -1,32 +1,86 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, Awaitable, Callable, Sequence
 from uuid import UUID
 
-from ingestion_service.domain.models import UploadedDocument
+from ingestion_service.domain.models import IngestionBatch, OutboxMessage, UploadedDocument
 
 
 class DocumentStoragePort(ABC):
     @abstractmethod
-    async def save(self, document_id: UUID, filename: str, content: bytes) -> str:
-        """Persist document binary. Returns storage_path."""
+    async def stage(self, chunks: AsyncIterable[bytes]) -> str:
+        """Stream a document binary to a temporary location. Returns the staging path."""
+
+    @abstractmethod
+    async def commit(self, staging_path: str, document_id: UUID, filename: str) -> str:
+        """Atomically move a staged binary into place. Returns storage_path."""
 
     @abstractmethod
     async def exists(self, storage_path: str) -> bool:
         """Check whether a document exists at the given path."""
 
+    @abstractmethod
+    async def delete(self, storage_path: str) -> None:
+        """Remove a stored document binary. Missing files are ignored."""
+
 
 class DocumentRepositoryPort(ABC):
     @abstractmethod
-    async def save(self, document: UploadedDocument) -> None:
-        """Persist document metadata record."""
+    async def save(self, document: UploadedDocument, correlation_id: str | None = None) -> bool:
+        """Persist document metadata record. Returns False if it conflicted with an existing row.
+
+        With a correlation_id, the document.uploaded event is written to the
+        outbox in the same transaction.
+        """
 
     @abstractmethod
     async def get_by_id(self, document_id: UUID, tenant_id: str) -> UploadedDocument | None:
         """Retrieve document metadata by ID scoped to tenant."""
 
+    @abstractmethod
+    async def find_by_content_digest(
+        self, tenant_id: str, content_sha256: str
+    ) -> UploadedDocument | None:
+        """Return the live canonical (non-alias) document with this digest, if any."""
+
+    @abstractmethod
+    async def find_by_content_digests(
+        self, tenant_id: str, content_sha256s: list[str]
+    ) -> dict[str, UploadedDocument]:
+        """Live canonical documents for any of the digests, keyed by digest."""
+
+    @abstractmethod
+    async def save_many(
+        self, documents: list[UploadedDocument], correlation_id: str | None = None
+    ) -> set[UUID]:
+        """Persist document records in one statement. Returns the IDs that were inserted.
+
+        With a correlation_id, document.uploaded events for the inserted rows
+        are written to the outbox in the same transaction.
+        """
+
+    @abstractmethod
+    async def create_batch(self, batch: IngestionBatch) -> None:
+        """Persist a bulk upload record."""
+
+    @abstractmethod
+    async def get_batch(
+        self, batch_id: UUID, tenant_id: str
+    ) -> tuple[IngestionBatch, list[UploadedDocument]] | None:
+        """Bulk upload record and its documents, scoped to tenant."""
+
+    @abstractmethod
+    async def drain_outbox(
+        self, limit: int, publish: Callable[[list[OutboxMessage]], Awaitable[set[int]]]
+    ) -> int:
+        """Claim up to limit of the oldest outbox rows, publish them, delete the acked ones.
+
+        Returns the number of rows claimed.
+        """
+
 
 class EventPublisherPort(ABC):
     @abstractmethod
-    async def publish_document_uploaded(self, document: UploadedDocument, correlation_id: str) -> None:
-        """Emit document.uploaded event to event bus."""
+    async def publish_outbox(self, messages: Sequence[OutboxMessage]) -> set[int]:
+        """Send outbox messages as one producer batch. Returns the IDs the broker acked."""
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterable
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Any
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -20,6 +23,14 @@ class UploadedDocument(BaseModel):
     uploaded_by: str
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     status: DocumentStatus = DocumentStatus.UPLOADED
+    content_sha256: str | None = None
+    canonical_document_id: UUID | None = None
+    previous_document_id: UUID | None = None
+    batch_id: UUID | None = None
+
+    @property
+    def is_alias(self) -> bool:
+        return self.canonical_document_id is not None
 
 
 class DocumentUploadRequest(BaseModel):
@@ -36,3 +47,68 @@ class DocumentUploadResponse(BaseModel):
     filename: str
     status: DocumentStatus
     correlation_id: str
+    duplicate_of: UUID | None = None
+
+
+class OutboxMessage(BaseModel):
+    """An event committed to event_outbox that the relay has not yet delivered."""
+
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    event_id: UUID
+    topic: str
+    key: str | None
+    payload: dict[str, Any]
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class IncomingFile:
+    """One file of a bulk upload; content is consumed once, chunk by chunk."""
+
+    filename: str
+    content_type: str
+    content: AsyncIterable[bytes]
+
+
+class IngestionBatch(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    batch_id: UUID = Field(default_factory=uuid4)
+    tenant_id: str
+    uploaded_by: str
+    file_count: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class BatchFileResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    filename: str
+    document_id: UUID | None = None
+    status: DocumentStatus | None = None
+    duplicate_of: UUID | None = None
+    error_code: str | None = None
+
+
+class BatchUploadResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    batch_id: UUID
+    correlation_id: str
+    accepted_count: int
+    duplicate_count: int
+    rejected_count: int
+    files: list[BatchFileResult]
+
+
+class BatchStatusResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    batch_id: UUID
+    tenant_id: str
+    created_at: datetime
+    file_count: int
+    status_counts: dict[str, int]
+    documents: list[BatchFileResult]
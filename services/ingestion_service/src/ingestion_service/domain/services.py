@@ -1,17 +1,29 @@
 from __future__ import annotations
 
+import hashlib
+from collections.abc import AsyncIterable, AsyncIterator
+from uuid import UUID
+
 import structlog
 
 from ingestion_service.domain.exceptions import (
+    BatchNotFoundError,
+    BatchTooLargeError,
     DocumentTooLargeError,
+    IngestionError,
+    InvalidArchiveError,
+    PreviousDocumentNotFoundError,
     UnsupportedContentTypeError,
 )
-from ingestion_service.domain.interfaces import (
-    DocumentRepositoryPort,
-    DocumentStoragePort,
-    EventPublisherPort,
+from ingestion_service.domain.interfaces import DocumentRepositoryPort, DocumentStoragePort
+from ingestion_service.domain.models import (
+    BatchFileResult,
+    BatchStatusResponse,
+    BatchUploadResponse,
+    IncomingFile,
+    IngestionBatch,
+    UploadedDocument,
 )
-from ingestion_service.domain.models import UploadedDocument
 
 logger = structlog.get_logger(__name__)
 
@@ -21,6 +33,8 @@ ALLOWED_CONTENT_TYPES = frozenset({
     "text/plain",
 })
 MAX_FILE_SIZE_BYTES = 50 * 1024 * 1024  # 50 MB
+MAX_BATCH_FILES = 1000
+MAX_ARCHIVE_SIZE_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
 
 
 class IngestionService:
@@ -28,15 +42,17 @@ class IngestionService:
         self,
         storage: DocumentStoragePort,
         repository: DocumentRepositoryPort,
-        publisher: EventPublisherPort,
         max_file_size_bytes: int = MAX_FILE_SIZE_BYTES,
         allowed_content_types: frozenset[str] = ALLOWED_CONTENT_TYPES,
+        max_batch_files: int = MAX_BATCH_FILES,
+        max_archive_size_bytes: int = MAX_ARCHIVE_SIZE_BYTES,
     ) -> None:
         self._storage = storage
         self._repository = repository
-        self._publisher = publisher
         self._max_file_size_bytes = max_file_size_bytes
         self._allowed_content_types = allowed_content_types
+        self._max_batch_files = max_batch_files
+        self._max_archive_size_bytes = max_archive_size_bytes
 
     async def ingest_document(
         self,
@@ -44,9 +60,20 @@ class IngestionService:
         uploaded_by: str,
         filename: str,
         content_type: str,
-        content: bytes,
+        content: AsyncIterable[bytes],
         correlation_id: str,
+        previous_document_id: UUID | None = None,
     ) -> UploadedDocument:
+        """Validate, store and announce one upload.
+
+        The document.uploaded event is committed to the outbox together with
+        the document row and delivered by the relay, so the upload does not
+        wait on the broker.
+
+        content is consumed once, chunk by chunk: it is size-checked and hashed
+        while being streamed to a staging file, so memory use does not depend
+        on the document size.
+        """
         log = logger.bind(
             tenant_id=tenant_id,
             filename=filename,
@@ -58,33 +85,55 @@ class IngestionService:
             log.warning("ingestion.rejected.unsupported_type", content_type=content_type)
             raise UnsupportedContentTypeError(content_type)
 
-        if len(content) > self._max_file_size_bytes:
-            log.warning(
-                "ingestion.rejected.file_too_large",
-                size_bytes=len(content),
-                limit_bytes=self._max_file_size_bytes,
-            )
-            raise DocumentTooLargeError(len(content), self._max_file_size_bytes)
+        if previous_document_id is not None:
+            previous = await self._repository.get_by_id(previous_document_id, tenant_id)
+            if not previous:
+                raise PreviousDocumentNotFoundError(previous_document_id)
+            # Chunks of an alias live under its canonical document.
+            previous_document_id = previous.canonical_document_id or previous.document_id
+
+        staging_path, size_bytes, content_sha256 = await self._stage(
+            content, self._max_file_size_bytes, log
+        )
 
         document = UploadedDocument(
             tenant_id=tenant_id,
             filename=filename,
             content_type=content_type,
-            file_size_bytes=len(content),
-            storage_path="",  # Populated after storage.save()
+            file_size_bytes=size_bytes,
+            storage_path="",  # Populated after storage.commit()
             uploaded_by=uploaded_by,
+            content_sha256=content_sha256,
+            previous_document_id=previous_document_id,
         )
 
-        storage_path = await self._storage.save(
-            document_id=document.document_id,
-            filename=filename,
-            content=content,
-        )
+        try:
+            canonical = await self._repository.find_by_content_digest(tenant_id, content_sha256)
+            if canonical:
+                await self._storage.delete(staging_path)
+                return await self._save_alias(document, canonical, correlation_id)
+
+            storage_path = await self._storage.commit(
+                staging_path,
+                document_id=document.document_id,
+                filename=filename,
+            )
+        except BaseException:
+            await self._storage.delete(staging_path)
+            raise
 
         document = document.model_copy(update={"storage_path": storage_path})
 
-        await self._repository.save(document)
-        await self._publisher.publish_document_uploaded(document, correlation_id)
+        if not await self._repository.save(document, correlation_id):
+            # An identical upload for this tenant won the race between lookup and insert.
+            await self._storage.delete(storage_path)
+            canonical = await self._repository.find_by_content_digest(tenant_id, content_sha256)
+            if not canonical:
+                raise IngestionError(
+                    message=f"Document {document.document_id} could not be persisted.",
+                    error_code="DOCUMENT_PERSIST_CONFLICT",
+                )
+            return await self._save_alias(document, canonical, correlation_id)
 
         log.info(
             "ingestion.document.accepted",
@@ -94,3 +143,251 @@ class IngestionService:
         )
 
         return document
+
+    async def ingest_batch(
+        self,
+        tenant_id: str,
+        uploaded_by: str,
+        files: AsyncIterable[IncomingFile],
+        correlation_id: str,
+    ) -> BatchUploadResponse:
+        """Ingest many files under one batch ID.
+
+        Files are staged one at a time as they stream in. Invalid files are
+        reported per file rather than failing the batch. The documents rows are
+        then written with one multi-row insert (plus one for duplicates), with
+        their outbox events in the same transaction.
+        """
+        batch = IngestionBatch(tenant_id=tenant_id, uploaded_by=uploaded_by)
+        log = logger.bind(
+            tenant_id=tenant_id,
+            correlation_id=correlation_id,
+            batch_id=str(batch.batch_id),
+        )
+
+        results: list[BatchFileResult] = []
+        staged: list[tuple[int, UploadedDocument, str]] = []
+        new_documents: list[tuple[int, UploadedDocument]] = []
+        aliases: list[tuple[int, UploadedDocument]] = []
+        try:
+            async for incoming in files:
+                if len(results) >= self._max_batch_files:
+                    raise BatchTooLargeError(self._max_batch_files)
+                result = BatchFileResult(filename=incoming.filename)
+                results.append(result)
+                if incoming.content_type not in self._allowed_content_types:
+                    error = UnsupportedContentTypeError(incoming.content_type)
+                    results[-1] = result.model_copy(update={"error_code": error.error_code})
+                    continue
+                try:
+                    staging_path, size_bytes, content_sha256 = await self._stage(
+                        incoming.content, self._max_file_size_bytes, log
+                    )
+                except (DocumentTooLargeError, InvalidArchiveError) as exc:
+                    # e.g. a corrupt or encrypted archive member; the rest of the batch goes on.
+                    results[-1] = result.model_copy(update={"error_code": exc.error_code})
+                    continue
+                document = UploadedDocument(
+                    tenant_id=tenant_id,
+                    filename=incoming.filename,
+                    content_type=incoming.content_type,
+                    file_size_bytes=size_bytes,
+                    storage_path="",  # Populated after storage.commit()
+                    uploaded_by=uploaded_by,
+                    content_sha256=content_sha256,
+                    batch_id=batch.batch_id,
+                )
+                staged.append((len(results) - 1, document, staging_path))
+
+            canonicals = await self._repository.find_by_content_digests(
+                tenant_id, sorted({document.content_sha256 or "" for _, document, _ in staged})
+            )
+            while staged:
+                index, document, staging_path = staged.pop(0)
+                canonical = canonicals.get(document.content_sha256 or "")
+                if canonical:
+                    await self._storage.delete(staging_path)
+                    aliases.append((index, _alias_of(document, canonical)))
+                    continue
+                storage_path = await self._storage.commit(
+                    staging_path, document_id=document.document_id, filename=document.filename
+                )
+                document = document.model_copy(update={"storage_path": storage_path})
+                # Later copies within the batch become aliases of this one.
+                canonicals[document.content_sha256 or ""] = document
+                new_documents.append((index, document))
+
+            batch = batch.model_copy(update={"file_count": len(results)})
+            await self._repository.create_batch(batch)
+            inserted = await self._repository.save_many(
+                [d for _, d in new_documents], correlation_id
+            )
+        except BaseException:
+            for _, _, staging_path in staged:
+                await self._storage.delete(staging_path)
+            for _, document in new_documents:
+                await self._storage.delete(document.storage_path)
+            raise
+
+        lost = [(i, d) for i, d in new_documents if d.document_id not in inserted]
+        if lost:
+            new_documents = [(i, d) for i, d in new_documents if d.document_id in inserted]
+            aliases = await self._resolve_lost_races(tenant_id, lost, aliases, results)
+        await self._repository.save_many([alias for _, alias in aliases])
+
+        for index, document in new_documents:
+            results[index] = results[index].model_copy(
+                update={"document_id": document.document_id, "status": document.status}
+            )
+        for index, alias in aliases:
+            results[index] = results[index].model_copy(
+                update={
+                    "document_id": alias.document_id,
+                    "status": alias.status,
+                    "duplicate_of": alias.canonical_document_id,
+                }
+            )
+
+        response = BatchUploadResponse(
+            batch_id=batch.batch_id,
+            correlation_id=correlation_id,
+            accepted_count=len(new_documents),
+            duplicate_count=len(aliases),
+            rejected_count=sum(1 for r in results if r.error_code),
+            files=results,
+        )
+        log.info(
+            "ingestion.batch.accepted",
+            file_count=len(results),
+            accepted_count=response.accepted_count,
+            duplicate_count=response.duplicate_count,
+            rejected_count=response.rejected_count,
+        )
+        return response
+
+    async def stage_archive(self, content: AsyncIterable[bytes], correlation_id: str) -> str:
+        """Stream an uploaded archive to a staging file. Returns the staging path."""
+        log = logger.bind(correlation_id=correlation_id)
+        staging_path, size_bytes, _ = await self._stage(
+            content, self._max_archive_size_bytes, log
+        )
+        log.info("ingestion.archive.staged", size_bytes=size_bytes)
+        return staging_path
+
+    async def get_batch_status(self, batch_id: UUID, tenant_id: str) -> BatchStatusResponse:
+        found = await self._repository.get_batch(batch_id, tenant_id)
+        if not found:
+            raise BatchNotFoundError(batch_id)
+        batch, documents = found
+
+        status_counts: dict[str, int] = {}
+        for document in documents:
+            status_counts[document.status.value] = status_counts.get(document.status.value, 0) + 1
+        return BatchStatusResponse(
+            batch_id=batch.batch_id,
+            tenant_id=batch.tenant_id,
+            created_at=batch.created_at,
+            file_count=batch.file_count,
+            status_counts=status_counts,
+            documents=[
+                BatchFileResult(
+                    filename=document.filename,
+                    document_id=document.document_id,
+                    status=document.status,
+                    duplicate_of=document.canonical_document_id,
+                )
+                for document in documents
+            ],
+        )
+
+    async def _stage(
+        self,
+        content: AsyncIterable[bytes],
+        limit_bytes: int,
+        log: structlog.stdlib.BoundLogger,
+    ) -> tuple[str, int, str]:
+        """Stream content to a staging file. Returns (staging path, size, SHA-256).
+
+        Size is checked and the digest updated chunk by chunk, so memory use
+        does not depend on the document size.
+        """
+        digest = hashlib.sha256()
+        size_bytes = 0
+
+        async def measured() -> AsyncIterator[bytes]:
+            nonlocal size_bytes
+            async for chunk in content:
+                size_bytes += len(chunk)
+                if size_bytes > limit_bytes:
+                    log.warning(
+                        "ingestion.rejected.file_too_large",
+                        size_bytes=size_bytes,
+                        limit_bytes=limit_bytes,
+                    )
+                    raise DocumentTooLargeError(size_bytes, limit_bytes)
+                digest.update(chunk)
+                yield chunk
+
+        staging_path = await self._storage.stage(measured())
+        return staging_path, size_bytes, digest.hexdigest()
+
+    async def _resolve_lost_races(
+        self,
+        tenant_id: str,
+        lost: list[tuple[int, UploadedDocument]],
+        aliases: list[tuple[int, UploadedDocument]],
+        results: list[BatchFileResult],
+    ) -> list[tuple[int, UploadedDocument]]:
+        """Turn documents beaten by a concurrent identical upload into aliases of the winner."""
+        for _, document in lost:
+            await self._storage.delete(document.storage_path)
+        winners = await self._repository.find_by_content_digests(
+            tenant_id, sorted({document.content_sha256 or "" for _, document in lost})
+        )
+        lost_ids = {document.document_id for _, document in lost}
+
+        orphaned = [a for a in aliases if a[1].canonical_document_id in lost_ids]
+        resolved: list[tuple[int, UploadedDocument]] = []
+        for index, document in lost + orphaned:
+            winner = winners.get(document.content_sha256 or "")
+            if winner:
+                resolved.append((index, _alias_of(document, winner)))
+            else:
+                results[index] = results[index].model_copy(
+                    update={"error_code": "DOCUMENT_PERSIST_CONFLICT"}
+                )
+        return [a for a in aliases if a not in orphaned] + resolved
+
+    async def _save_alias(
+        self,
+        document: UploadedDocument,
+        canonical: UploadedDocument,
+        correlation_id: str,
+    ) -> UploadedDocument:
+        """Record a re-upload as an alias of an already ingested document.
+
+        The alias shares the canonical document's stored binary and chunks, so
+        no document.uploaded event is emitted.
+        """
+        alias = _alias_of(document, canonical)
+        await self._repository.save(alias)
+
+        logger.info(
+            "ingestion.document.deduplicated",
+            tenant_id=alias.tenant_id,
+            correlation_id=correlation_id,
+            document_id=str(alias.document_id),
+            canonical_document_id=str(canonical.document_id),
+            file_size_bytes=alias.file_size_bytes,
+        )
+        return alias
+
+
+def _alias_of(document: UploadedDocument, canonical: UploadedDocument) -> UploadedDocument:
+    return document.model_copy(
+        update={
+            "storage_path": canonical.storage_path,
+            "status": canonical.status,
+            "canonical_document_id": canonical.document_id,
+        }
+    )
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import zipfile
+import zlib
+from collections.abc import AsyncIterator
+from pathlib import PurePosixPath
+
+import structlog
+
+from ingestion_service.domain.exceptions import InvalidArchiveError
+from ingestion_service.domain.models import IncomingFile
+
+logger = structlog.get_logger(__name__)
+
+_CONTENT_TYPES_BY_SUFFIX = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+
+
+async def iter_zip_files(path: str, chunk_size: int) -> AsyncIterator[IncomingFile]:
+    """Yield the files of a staged zip archive, each streamed in chunk_size reads.
+
+    Members are decompressed one at a time off the event loop; a member must
+    be fully consumed (or abandoned) before the next one is yielded. Content
+    types are inferred from the file suffix. An unreadable member raises
+    InvalidArchiveError from its content stream; the following members can
+    still be read.
+    """
+    try:
+        archive = await asyncio.to_thread(zipfile.ZipFile, path)
+    except (zipfile.BadZipFile, OSError) as exc:
+        raise InvalidArchiveError(str(exc)) from exc
+
+    try:
+        for info in archive.infolist():
+            name = PurePosixPath(info.filename)
+            if info.is_dir() or name.parts[0] == "__MACOSX" or name.name.startswith("."):
+                continue
+            content_type = _CONTENT_TYPES_BY_SUFFIX.get(
+                name.suffix.lower(), "application/octet-stream"
+            )
+            yield IncomingFile(
+                filename=name.name,
+                content_type=content_type,
+                content=_read_member(archive, info, chunk_size),
+            )
+    finally:
+        archive.close()
+
+
+async def _read_member(
+    archive: zipfile.ZipFile, info: zipfile.ZipInfo, chunk_size: int
+) -> AsyncIterator[bytes]:
+    try:
+        member = await asyncio.to_thread(archive.open, info)
+        try:
+            while chunk := await asyncio.to_thread(member.read, chunk_size):
+                yield chunk
+        finally:
+            member.close()
+    except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError) as exc:
+        # Corrupt member, unsupported compression or an encrypted entry.
+        logger.warning("ingestion.archive.member_unreadable", member=info.filename, error=str(exc))
+        raise InvalidArchiveError(f"{info.filename}: {exc}") from exc
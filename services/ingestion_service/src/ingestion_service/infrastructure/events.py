@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from ingestion_service.domain.models import UploadedDocument
+from shared.events.document_events import DocumentUploadedEvent
+
+DOCUMENT_UPLOADED_TOPIC = "docs.uploaded"
+
+
+def document_uploaded_event(
+    document: UploadedDocument, correlation_id: str
+) -> DocumentUploadedEvent:
+    return DocumentUploadedEvent(
+        correlation_id=UUID(correlation_id),
+        tenant_id=document.tenant_id,
+        document_id=document.document_id,
+        filename=document.filename,
+        content_type=document.content_type,
+        file_size_bytes=document.file_size_bytes,
+        storage_path=document.storage_path,
+        uploaded_by=document.uploaded_by,
+        previous_document_id=document.previous_document_id,
+        batch_id=document.batch_id,
+    )
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from datetime import datetime, timezone
+
+import structlog
+from prometheus_client import Counter, Histogram
+
+from ingestion_service.domain.interfaces import DocumentRepositoryPort, EventPublisherPort
+from ingestion_service.domain.models import OutboxMessage
+
+logger = structlog.get_logger(__name__)
+
+OUTBOX_DELIVERY_LAG_SECONDS = Histogram(
+    "outbox_delivery_lag_seconds",
+    "Time from committing an event to the outbox until the broker acknowledged it.",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+OUTBOX_RELAYED_TOTAL = Counter(
+    "outbox_relayed_total",
+    "Outbox events handed to the broker, by delivery outcome.",
+    ["outcome"],
+)
+
+
+class OutboxRelay:
+    """Background task that drains event_outbox to the broker.
+
+    Each drain claims the oldest rows, sends them as one producer batch and
+    deletes the acked ones in the same transaction. A crash after the ack
+    but before the commit redelivers the batch, so delivery is at-least-once;
+    consumers dedupe on event_id. Drains repeat back to back while full
+    batches come back, then poll at poll_interval_seconds, backing off
+    exponentially while the broker or database is failing.
+    """
+
+    def __init__(
+        self,
+        repository: DocumentRepositoryPort,
+        publisher: EventPublisherPort,
+        batch_size: int = 500,
+        poll_interval_seconds: float = 0.2,
+        max_backoff_seconds: float = 5.0,
+    ) -> None:
+        self._repository = repository
+        self._publisher = publisher
+        self._batch_size = batch_size
+        self._poll_interval_seconds = poll_interval_seconds
+        self._max_backoff_seconds = max_backoff_seconds
+        self._task: asyncio.Task[None] | None = None
+        self._failed_in_last_drain = 0
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="outbox-relay")
+        logger.info(
+            "outbox.relay.started",
+            batch_size=self._batch_size,
+            poll_interval_s=self._poll_interval_seconds,
+        )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        logger.info("outbox.relay.stopped")
+
+    async def drain_once(self) -> int:
+        """Relay one batch. Returns the number of rows claimed."""
+        return await self._repository.drain_outbox(self._batch_size, self._publish)
+
+    async def _run(self) -> None:
+        delay = self._poll_interval_seconds
+        while True:
+            self._failed_in_last_drain = 0
+            try:
+                claimed = await self.drain_once()
+                failed = self._failed_in_last_drain > 0
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("outbox.relay.drain_failed", error=str(exc))
+                claimed, failed = 0, True
+
+            if failed:
+                delay = min(delay * 2, self._max_backoff_seconds)
+                await asyncio.sleep(delay)
+                continue
+
+            delay = self._poll_interval_seconds
+            if claimed < self._batch_size:
+                await asyncio.sleep(delay)
+
+    async def _publish(self, messages: list[OutboxMessage]) -> set[int]:
+        acked = await self._publisher.publish_outbox(messages)
+
+        now = datetime.now(timezone.utc)
+        for message in messages:
+            if message.id in acked:
+                OUTBOX_DELIVERY_LAG_SECONDS.observe((now - message.created_at).total_seconds())
+        OUTBOX_RELAYED_TOTAL.labels("acked").inc(len(acked))
+        OUTBOX_RELAYED_TOTAL.labels("failed").inc(len(messages) - len(acked))
+        # Unacked rows stay in the outbox; the run loop backs off before retrying them.
+        self._failed_in_last_drain = len(messages) - len(acked)
+        logger.debug("outbox.relay.batch_relayed", event_count=len(acked))
+        return acked
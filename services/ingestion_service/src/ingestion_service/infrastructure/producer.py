@@ -1,34 +1,32 @@
 from __future__ import annotations
 
-import json
-from uuid import UUID
+import asyncio
+from collections.abc import Sequence
 
 import structlog
 from aiokafka import AIOKafkaProducer
 from aiokafka.errors import KafkaError
+from aiokafka.structs import RecordMetadata
 
 from ingestion_service.domain.interfaces import EventPublisherPort
-from ingestion_service.domain.models import UploadedDocument
-from shared.events.document_events import DocumentUploadedEvent
+from ingestion_service.domain.models import OutboxMessage
+from ingestion_service.infrastructure.events import DOCUMENT_UPLOADED_TOPIC
+from shared.config.base import BaseServiceSettings
+from shared.events.publisher import EventPublisher, create_producer
 
 logger = structlog.get_logger(__name__)
 
-_TOPIC = "docs.uploaded"
-
 
 class RedpandaEventPublisher(EventPublisherPort):
-    def __init__(self, bootstrap_servers: str) -> None:
-        self._bootstrap_servers = bootstrap_servers
+    def __init__(self, settings: BaseServiceSettings) -> None:
+        self._settings = settings
+        self._bootstrap_servers = settings.redpanda_bootstrap_servers
         self._producer: AIOKafkaProducer | None = None
+        self._publisher: EventPublisher | None = None
 
     async def start(self) -> None:
-        self._producer = AIOKafkaProducer(
-            bootstrap_servers=self._bootstrap_servers,
-            value_serializer=lambda v: json.dumps(v, default=str).encode("utf-8"),
-            key_serializer=lambda k: k.encode("utf-8") if k else None,
-            acks="all",
-            enable_idempotence=True,
-        )
+        self._producer = create_producer(self._settings)
+        self._publisher = EventPublisher(self._producer)
         try:
             await self._producer.start()
         except KafkaError as exc:
@@ -38,49 +36,51 @@ class RedpandaEventPublisher(EventPublisherPort):
                 error=str(exc),
             )
             raise
-        logger.info("producer.started", bootstrap_servers=self._bootstrap_servers, topic=_TOPIC)
+        logger.info(
+            "producer.started",
+            bootstrap_servers=self._bootstrap_servers,
+            topic=DOCUMENT_UPLOADED_TOPIC,
+        )
 
     async def stop(self) -> None:
-        if self._producer:
+        if self._producer and self._publisher:
             try:
+                await self._publisher.flush()
                 await self._producer.stop()
             except Exception as exc:  # noqa: BLE001
                 logger.warning("producer.stop.error", error=str(exc))
             finally:
                 logger.info("producer.stopped")
 
-    async def publish_document_uploaded(
-        self, document: UploadedDocument, correlation_id: str
-    ) -> None:
-        if not self._producer:
+    async def publish_outbox(self, messages: Sequence[OutboxMessage]) -> set[int]:
+        """Hand every message to the producer before awaiting any ack, so they share batches."""
+        if not self._publisher:
             raise RuntimeError("Producer is not started. Call start() first.")
 
-        event = DocumentUploadedEvent(
-            correlation_id=UUID(correlation_id),
-            tenant_id=document.tenant_id,
-            document_id=document.document_id,
-            filename=document.filename,
-            content_type=document.content_type,
-            file_size_bytes=document.file_size_bytes,
-            storage_path=document.storage_path,
-            uploaded_by=document.uploaded_by,
-        )
-
-        log = logger.bind(
-            correlation_id=correlation_id,
-            topic=_TOPIC,
-            event_id=str(event.event_id),
-            document_id=str(document.document_id),
-        )
-
+        deliveries: list[asyncio.Future[RecordMetadata]] = []
         try:
-            await self._producer.send_and_wait(
-                topic=_TOPIC,
-                value=event.model_dump(mode="json"),
-                key=document.tenant_id,
-            )
+            for message in messages:
+                deliveries.append(
+                    await self._publisher.send(message.topic, message.payload, key=message.key)
+                )
         except KafkaError as exc:
-            log.error("event.publish.failed", error=str(exc))
-            raise
+            # Messages not handed over count as failed and stay in the outbox.
+            logger.error("event.batch.send.failed", sent_count=len(deliveries), error=str(exc))
+        outcomes = await asyncio.gather(*deliveries, return_exceptions=True)
 
-        log.info("event.published")
+        # outcomes is shorter than messages when a send failed part-way; the
+        # messages past it were never handed over, so they are left out.
+        acked = {
+            message.id
+            for message, outcome in zip(messages, outcomes, strict=False)
+            if not isinstance(outcome, BaseException)
+        }
+        if len(acked) < len(messages):
+            errors = {str(outcome) for outcome in outcomes if isinstance(outcome, BaseException)}
+            logger.error(
+                "event.batch.publish.failed",
+                event_count=len(messages),
+                failed_count=len(messages) - len(acked),
+                errors=sorted(errors),
+            )
+        return acked
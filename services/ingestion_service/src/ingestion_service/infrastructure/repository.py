@@ -1,17 +1,80 @@
 from __future__ import annotations
 
+import json
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
 from uuid import UUID
 
 import structlog
-from sqlalchemy import text
+from sqlalchemy import RowMapping, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from ingestion_service.domain.interfaces import DocumentRepositoryPort
-from ingestion_service.domain.models import UploadedDocument
+from ingestion_service.domain.models import IngestionBatch, OutboxMessage, UploadedDocument
+from ingestion_service.infrastructure.events import (
+    DOCUMENT_UPLOADED_TOPIC,
+    document_uploaded_event,
+)
 
 logger = structlog.get_logger(__name__)
 
+# A constant column list, the only text formatted into the statements below; the
+# S608 findings on them are suppressed where each statement ends.
+_DOCUMENT_COLUMNS = """
+    id, tenant_id, filename, content_type,
+    file_size_bytes, storage_path, status,
+    uploaded_by, uploaded_at,
+    content_sha256, canonical_document_id, previous_document_id, batch_id
+"""
+
+# One multi-row INSERT for a whole bulk upload: each column travels as an array.
+_SAVE_MANY_SQL = f"""
+    INSERT INTO documents ({_DOCUMENT_COLUMNS})
+    SELECT * FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:tenant_ids AS varchar[]),
+        CAST(:filenames AS varchar[]),
+        CAST(:content_types AS varchar[]),
+        CAST(:file_size_bytes AS bigint[]),
+        CAST(:storage_paths AS text[]),
+        CAST(:statuses AS varchar[]),
+        CAST(:uploaded_bys AS varchar[]),
+        CAST(:uploaded_ats AS timestamptz[]),
+        CAST(:content_sha256s AS char(64)[]),
+        CAST(:canonical_document_ids AS uuid[]),
+        CAST(:previous_document_ids AS uuid[]),
+        CAST(:batch_ids AS uuid[])
+    )
+    ON CONFLICT DO NOTHING
+    RETURNING id
+"""  # noqa: S608
+
+_ENQUEUE_EVENTS_SQL = """
+    INSERT INTO event_outbox (event_id, topic, event_key, payload)
+    SELECT e.event_id, e.topic, e.event_key, CAST(e.payload AS jsonb)
+    FROM unnest(
+        CAST(:event_ids AS uuid[]),
+        CAST(:topics AS varchar[]),
+        CAST(:event_keys AS varchar[]),
+        CAST(:payloads AS text[])
+    ) AS e(event_id, topic, event_key, payload)
+"""
+
+# Row locks keep concurrent relays (one per replica) off each other's rows
+# until the claiming transaction deletes them or rolls back.
+_CLAIM_OUTBOX_SQL = """
+    SELECT id, event_id, topic, event_key, payload::text AS payload, created_at
+    FROM event_outbox
+    ORDER BY id
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+"""
+
+_DELETE_OUTBOX_SQL = """
+    DELETE FROM event_outbox WHERE id = ANY(CAST(:ids AS bigint[]))
+"""
+
 
 class PostgresDocumentRepository(DocumentRepositoryPort):
     def __init__(self, database_url: str) -> None:
@@ -22,22 +85,26 @@ class PostgresDocumentRepository(DocumentRepositoryPort):
             self._engine, class_=AsyncSession, expire_on_commit=False
         )
 
-    async def save(self, document: UploadedDocument) -> None:
+    async def save(self, document: UploadedDocument, correlation_id: str | None = None) -> bool:
+        # No conflict target: also covers the (tenant_id, content_sha256) unique index
+        # when two identical uploads race.
         sql = text("""
             INSERT INTO documents (
                 id, tenant_id, filename, content_type,
                 file_size_bytes, storage_path, status,
-                uploaded_by, uploaded_at
+                uploaded_by, uploaded_at,
+                content_sha256, canonical_document_id, previous_document_id, batch_id
             ) VALUES (
                 :id, :tenant_id, :filename, :content_type,
                 :file_size_bytes, :storage_path, :status,
-                :uploaded_by, :uploaded_at
+                :uploaded_by, :uploaded_at,
+                :content_sha256, :canonical_document_id, :previous_document_id, :batch_id
             )
-            ON CONFLICT (id) DO NOTHING
+            ON CONFLICT DO NOTHING
         """)
 
         async with self._session_factory() as session:
-            await session.execute(
+            result = await session.execute(
                 sql,
                 {
                     "id": document.document_id,
@@ -49,24 +116,33 @@ class PostgresDocumentRepository(DocumentRepositoryPort):
                     "status": document.status.value,
                     "uploaded_by": document.uploaded_by,
                     "uploaded_at": document.uploaded_at,
+                    "content_sha256": document.content_sha256,
+                    "canonical_document_id": document.canonical_document_id,
+                    "previous_document_id": document.previous_document_id,
+                    "batch_id": document.batch_id,
                 },
             )
+            inserted = result.rowcount == 1
+            if inserted and correlation_id:
+                await session.execute(
+                    text(_ENQUEUE_EVENTS_SQL), _outbox_params([document], correlation_id)
+                )
             await session.commit()
 
         logger.debug(
             "repository.document.saved",
             document_id=str(document.document_id),
             tenant_id=document.tenant_id,
+            inserted=inserted,
         )
+        return inserted
 
     async def get_by_id(self, document_id: UUID, tenant_id: str) -> UploadedDocument | None:
-        sql = text("""
-            SELECT id, tenant_id, filename, content_type,
-                   file_size_bytes, storage_path, status,
-                   uploaded_by, uploaded_at
+        sql = text(f"""
+            SELECT {_DOCUMENT_COLUMNS}
             FROM documents
             WHERE id = :id AND tenant_id = :tenant_id
-        """)
+        """)  # noqa: S608
 
         async with self._session_factory() as session:
             result = await session.execute(sql, {"id": document_id, "tenant_id": tenant_id})
@@ -75,6 +151,172 @@ class PostgresDocumentRepository(DocumentRepositoryPort):
         if not row:
             return None
 
+        return self._to_document(row)
+
+    async def find_by_content_digest(
+        self, tenant_id: str, content_sha256: str
+    ) -> UploadedDocument | None:
+        sql = text(f"""
+            SELECT {_DOCUMENT_COLUMNS}
+            FROM documents
+            WHERE tenant_id = :tenant_id
+              AND content_sha256 = :content_sha256
+              AND canonical_document_id IS NULL
+              AND status NOT IN ('failed', 'superseded')
+            LIMIT 1
+        """)  # noqa: S608
+
+        async with self._session_factory() as session:
+            result = await session.execute(
+                sql, {"tenant_id": tenant_id, "content_sha256": content_sha256}
+            )
+            row = result.mappings().first()
+
+        return self._to_document(row) if row else None
+
+    async def find_by_content_digests(
+        self, tenant_id: str, content_sha256s: list[str]
+    ) -> dict[str, UploadedDocument]:
+        if not content_sha256s:
+            return {}
+
+        sql = text(f"""
+            SELECT {_DOCUMENT_COLUMNS}
+            FROM documents
+            WHERE tenant_id = :tenant_id
+              AND content_sha256 = ANY(CAST(:content_sha256s AS char(64)[]))
+              AND canonical_document_id IS NULL
+              AND status NOT IN ('failed', 'superseded')
+        """)  # noqa: S608
+
+        async with self._session_factory() as session:
+            result = await session.execute(
+                sql, {"tenant_id": tenant_id, "content_sha256s": content_sha256s}
+            )
+            rows = result.mappings().all()
+
+        return {row["content_sha256"]: self._to_document(row) for row in rows}
+
+    async def save_many(
+        self, documents: list[UploadedDocument], correlation_id: str | None = None
+    ) -> set[UUID]:
+        if not documents:
+            return set()
+
+        params = {
+            "ids": [d.document_id for d in documents],
+            "tenant_ids": [d.tenant_id for d in documents],
+            "filenames": [d.filename for d in documents],
+            "content_types": [d.content_type for d in documents],
+            "file_size_bytes": [d.file_size_bytes for d in documents],
+            "storage_paths": [d.storage_path for d in documents],
+            "statuses": [d.status.value for d in documents],
+            "uploaded_bys": [d.uploaded_by for d in documents],
+            "uploaded_ats": [d.uploaded_at for d in documents],
+            "content_sha256s": [d.content_sha256 for d in documents],
+            "canonical_document_ids": [d.canonical_document_id for d in documents],
+            "previous_document_ids": [d.previous_document_id for d in documents],
+            "batch_ids": [d.batch_id for d in documents],
+        }
+        async with self._session_factory() as session:
+            result = await session.execute(text(_SAVE_MANY_SQL), params)
+            inserted = {row[0] for row in result}
+            if inserted and correlation_id:
+                await session.execute(
+                    text(_ENQUEUE_EVENTS_SQL),
+                    _outbox_params(
+                        [d for d in documents if d.document_id in inserted], correlation_id
+                    ),
+                )
+            await session.commit()
+
+        logger.debug(
+            "repository.documents.saved",
+            document_count=len(documents),
+            inserted_count=len(inserted),
+        )
+        return inserted
+
+    async def create_batch(self, batch: IngestionBatch) -> None:
+        sql = text("""
+            INSERT INTO ingestion_batches (id, tenant_id, uploaded_by, file_count, created_at)
+            VALUES (:id, :tenant_id, :uploaded_by, :file_count, :created_at)
+        """)
+        async with self._session_factory() as session:
+            await session.execute(
+                sql,
+                {
+                    "id": batch.batch_id,
+                    "tenant_id": batch.tenant_id,
+                    "uploaded_by": batch.uploaded_by,
+                    "file_count": batch.file_count,
+                    "created_at": batch.created_at,
+                },
+            )
+            await session.commit()
+
+    async def get_batch(
+        self, batch_id: UUID, tenant_id: str
+    ) -> tuple[IngestionBatch, list[UploadedDocument]] | None:
+        batch_sql = text("""
+            SELECT id, tenant_id, uploaded_by, file_count, created_at
+            FROM ingestion_batches
+            WHERE id = :id AND tenant_id = :tenant_id
+        """)
+        documents_sql = text(f"""
+            SELECT {_DOCUMENT_COLUMNS}
+            FROM documents
+            WHERE batch_id = :id
+            ORDER BY uploaded_at, filename
+        """)  # noqa: S608
+        params = {"id": batch_id, "tenant_id": tenant_id}
+
+        async with self._session_factory() as session:
+            row = (await session.execute(batch_sql, params)).mappings().first()
+            if not row:
+                return None
+            documents = (await session.execute(documents_sql, params)).mappings().all()
+
+        batch = IngestionBatch(
+            batch_id=row["id"],
+            tenant_id=row["tenant_id"],
+            uploaded_by=row["uploaded_by"],
+            file_count=row["file_count"],
+            created_at=row["created_at"],
+        )
+        return batch, [self._to_document(d) for d in documents]
+
+    async def drain_outbox(
+        self, limit: int, publish: Callable[[list[OutboxMessage]], Awaitable[set[int]]]
+    ) -> int:
+        async with self._session_factory() as session:
+            rows = (
+                await session.execute(text(_CLAIM_OUTBOX_SQL), {"limit": limit})
+            ).mappings().all()
+            if not rows:
+                return 0
+
+            messages = [
+                OutboxMessage(
+                    id=row["id"],
+                    event_id=row["event_id"],
+                    topic=row["topic"],
+                    key=row["event_key"],
+                    payload=json.loads(row["payload"]),
+                    created_at=row["created_at"],
+                )
+                for row in rows
+            ]
+            # Rows stay locked until commit; unacked ones are picked up by the next drain.
+            acked = await publish(messages)
+            if acked:
+                await session.execute(text(_DELETE_OUTBOX_SQL), {"ids": sorted(acked)})
+            await session.commit()
+
+        return len(messages)
+
+    @staticmethod
+    def _to_document(row: RowMapping) -> UploadedDocument:
         return UploadedDocument(
             document_id=row["id"],
             tenant_id=row["tenant_id"],
@@ -85,7 +327,21 @@ class PostgresDocumentRepository(DocumentRepositoryPort):
             status=row["status"],
             uploaded_by=row["uploaded_by"],
             uploaded_at=row["uploaded_at"],
+            content_sha256=row["content_sha256"],
+            canonical_document_id=row["canonical_document_id"],
+            previous_document_id=row["previous_document_id"],
+            batch_id=row["batch_id"],
         )
 
     async def dispose(self) -> None:
         await self._engine.dispose()
+
+
+def _outbox_params(documents: Sequence[UploadedDocument], correlation_id: str) -> dict[str, Any]:
+    events = [document_uploaded_event(document, correlation_id) for document in documents]
+    return {
+        "event_ids": [event.event_id for event in events],
+        "topics": [DOCUMENT_UPLOADED_TOPIC] * len(events),
+        "event_keys": [event.tenant_id for event in events],
+        "payloads": [event.model_dump_json() for event in events],
+    }
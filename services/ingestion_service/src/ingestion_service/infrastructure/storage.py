@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import os
+from collections.abc import AsyncIterable
 from pathlib import Path
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import aiofiles
 import structlog
@@ -22,15 +24,44 @@ class LocalFileStorage(DocumentStoragePort):
     def __init__(self, base_path: str) -> None:
         self._base_path = Path(base_path)
         self._base_path.mkdir(parents=True, exist_ok=True)
+        # Under base_path so commit() is a same-filesystem rename.
+        self._staging_path = self._base_path / ".staging"
 
-    async def save(self, document_id: UUID, filename: str, content: bytes) -> str:
+    async def stage(self, chunks: AsyncIterable[bytes]) -> str:
+        """Write chunks to a temp file as they arrive; at most one chunk is held in memory.
+
+        The temp file is removed if the stream raises (e.g. the size limit is hit).
+        """
+        self._staging_path.mkdir(parents=True, exist_ok=True)
+        file_path = self._staging_path / f"{uuid4()}.part"
+        size_bytes = 0
+
+        try:
+            async with aiofiles.open(file_path, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+                    size_bytes += len(chunk)
+                await f.flush()
+                # Durable before commit() renames it into place.
+                await asyncio.to_thread(os.fsync, f.fileno())
+        except BaseException as exc:
+            file_path.unlink(missing_ok=True)
+            if isinstance(exc, OSError):
+                logger.error("storage.stage.failed", path=str(file_path), error=str(exc))
+                raise StorageError(str(exc)) from exc
+            raise
+
+        logger.debug("storage.stage.success", path=str(file_path), size_bytes=size_bytes)
+        return str(file_path)
+
+    async def commit(self, staging_path: str, document_id: UUID, filename: str) -> str:
         doc_dir = self._base_path / str(document_id)
-        doc_dir.mkdir(parents=True, exist_ok=True)
         file_path = doc_dir / filename
 
         try:
-            async with aiofiles.open(file_path, "wb") as f:
-                await f.write(content)
+            doc_dir.mkdir(parents=True, exist_ok=True)
+            # Same filesystem as the staging area, so the rename is atomic.
+            os.replace(staging_path, file_path)
         except OSError as exc:
             logger.error(
                 "storage.write.failed",
@@ -45,9 +76,21 @@ class LocalFileStorage(DocumentStoragePort):
             "storage.write.success",
             document_id=str(document_id),
             path=storage_path,
-            size_bytes=len(content),
         )
         return storage_path
 
     async def exists(self, storage_path: str) -> bool:
         return os.path.isfile(storage_path)
+
+    async def delete(self, storage_path: str) -> None:
+        path = Path(storage_path)
+        try:
+            path.unlink(missing_ok=True)
+            if path.parent not in (self._base_path, self._staging_path) and not any(
+                path.parent.iterdir()
+            ):
+                path.parent.rmdir()
+        except OSError as exc:
+            logger.warning("storage.delete.failed", path=storage_path, error=str(exc))
+            return
+        logger.debug("storage.delete.success", path=storage_path)
@@ -8,6 +8,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from ingestion_service.api.routes import router
+from ingestion_service.infrastructure.outbox_relay import OutboxRelay
 from ingestion_service.infrastructure.producer import RedpandaEventPublisher
 from ingestion_service.infrastructure.repository import PostgresDocumentRepository
 from ingestion_service.infrastructure.storage import LocalFileStorage
@@ -32,9 +33,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     repository = PostgresDocumentRepository(
         database_url=settings.database_url.get_secret_value()
     )
-    publisher = RedpandaEventPublisher(
-        bootstrap_servers=settings.redpanda_bootstrap_servers
-    )
+    publisher = RedpandaEventPublisher(settings)
 
     try:
         await publisher.start()
@@ -46,6 +45,16 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         )
         raise
 
+    # Uploads only commit to the outbox; this task delivers the events.
+    relay = OutboxRelay(
+        repository=repository,
+        publisher=publisher,
+        batch_size=settings.outbox_batch_size,
+        poll_interval_seconds=settings.outbox_poll_interval_ms / 1000,
+        max_backoff_seconds=settings.outbox_max_backoff_seconds,
+    )
+    await relay.start()
+
     app.state.storage = storage
     app.state.repository = repository
     app.state.publisher = publisher
@@ -53,6 +62,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("service.ready", port=settings.service_port)
     yield
 
+    await relay.stop()
     await publisher.stop()
     await repository.dispose()
     logger.info("service.stopped")
@@ -16,3 +16,9 @@ class Settings(BaseServiceSettings):
             "text/plain",
         ]
     )
+    max_batch_files: int = Field(default=1000, ge=1, le=10000)
+    max_archive_size_mb: int = Field(default=2048, ge=1)
+
+    outbox_batch_size: int = Field(default=500, ge=1, le=10000)
+    outbox_poll_interval_ms: int = Field(default=200, ge=10)
+    outbox_max_backoff_seconds: float = Field(default=5.0, ge=0.1)
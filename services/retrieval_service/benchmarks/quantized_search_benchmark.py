@@ -0,0 +1,177 @@
+"""Benchmark: binary-quantized coarse search + exact re-rank vs the full-precision HNSW path.
+
+Usage (from the repository root, against a database with indexed chunks):
+
+    PYTHONPATH=services/retrieval_service/src:. \
+        python services/retrieval_service/benchmarks/quantized_search_benchmark.py \
+        --database-url postgresql+asyncpg://... --tenant-id TENANT --embedding-model MODEL \
+        [--queries 100] [--top-k 5] [--multipliers 4,10,20] [--noise 0.05]
+
+Query vectors are stored chunk embeddings of the tenant with Gaussian noise
+added. Ground truth is an exact sequential scan (index scans disabled);
+recall@k and latency percentiles are reported for each search path.
+"""
+# The printed table is this script's output, not logging.
+# ruff: noqa: T201
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import time
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from retrieval_service.domain.models import RetrievalRequest
+from retrieval_service.infrastructure.pgvector_repo import IndexMode, PgVectorRetrievalRepository
+from shared.schemas.documents import EmbeddingModel
+
+_SAMPLE_SQL = text("""
+    SELECT embedding::text AS embedding
+    FROM document_chunks
+    WHERE tenant_id = :tenant_id
+    ORDER BY random()
+    LIMIT :limit
+""")
+
+_EXACT_SQL = text("""
+    SELECT id
+    FROM document_chunks
+    WHERE tenant_id = :tenant_id
+    ORDER BY embedding <=> CAST(:embedding AS vector)
+    LIMIT :top_k
+""")
+
+
+def perturb(vector: list[float], rng: random.Random, noise: float) -> list[float]:
+    noisy = [v + rng.gauss(0.0, noise / math.sqrt(len(vector))) for v in vector]
+    norm = math.sqrt(sum(v * v for v in noisy)) or 1.0
+    return [v / norm for v in noisy]
+
+
+async def sample_queries(
+    database_url: str, tenant_id: str, count: int, noise: float, seed: int
+) -> list[list[float]]:
+    rng = random.Random(seed)  # noqa: S311 - reproducible queries, not crypto
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT setseed(:seed)"), {"seed": (seed % 1000) / 1000})
+            rows = await conn.execute(_SAMPLE_SQL, {"tenant_id": tenant_id, "limit": count})
+            stored = [[float(v) for v in row.embedding.strip("[]").split(",")] for row in rows]
+    finally:
+        await engine.dispose()
+    return [perturb(vector, rng, noise) for vector in stored]
+
+
+async def exact_neighbours(
+    database_url: str, tenant_id: str, queries: list[list[float]], top_k: int
+) -> list[set[UUID]]:
+    engine = create_async_engine(database_url)
+    result: list[set[UUID]] = []
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("SET LOCAL enable_indexscan = off"))
+            await conn.execute(text("SET LOCAL enable_bitmapscan = off"))
+            for query in queries:
+                rows = await conn.execute(
+                    _EXACT_SQL,
+                    {
+                        "tenant_id": tenant_id,
+                        "embedding": "[" + ",".join(str(v) for v in query) + "]",
+                        "top_k": top_k,
+                    },
+                )
+                result.append({row.id for row in rows})
+    finally:
+        await engine.dispose()
+    return result
+
+
+async def run_path(
+    database_url: str,
+    tenant_id: str,
+    embedding_model: str,
+    queries: list[list[float]],
+    truth: list[set[UUID]],
+    top_k: int,
+    index_mode: IndexMode,
+    multiplier: int,
+) -> dict[str, float]:
+    repository = PgVectorRetrievalRepository(
+        database_url, embedding_model, index_mode=index_mode, rerank_multiplier=multiplier
+    )
+    request = RetrievalRequest(
+        query="benchmark", tenant_id=tenant_id, top_k=top_k, similarity_threshold=0.0
+    )
+    model = EmbeddingModel(name=embedding_model)
+    latencies: list[float] = []
+    recalls: list[float] = []
+    try:
+        # Warm the pool and the index pages before timing.
+        await repository.similarity_search(queries[0], request, model)
+        for query, expected in zip(queries, truth, strict=True):
+            started = time.perf_counter()
+            result = await repository.similarity_search(query, request, model)
+            latencies.append(time.perf_counter() - started)
+            found = {chunk.chunk_id for chunk in result.chunks}
+            recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+    finally:
+        await repository.dispose()
+
+    latencies.sort()
+    return {
+        "recall": statistics.fmean(recalls),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--tenant-id", required=True)
+    parser.add_argument("--embedding-model", required=True)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--multipliers", default="4,10,20")
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    queries = await sample_queries(
+        args.database_url, args.tenant_id, args.queries, args.noise, args.seed
+    )
+    if not queries:
+        raise SystemExit(f"No chunks stored for tenant {args.tenant_id!r}")
+    truth = await exact_neighbours(args.database_url, args.tenant_id, queries, args.top_k)
+
+    paths: list[tuple[str, IndexMode, int]] = [("full (hnsw)", "full", 1)]
+    paths += [
+        (f"binary x{m}", "binary", m) for m in (int(v) for v in args.multipliers.split(","))
+    ]
+
+    print(f"{len(queries)} queries, top_k={args.top_k}, recall vs exact sequential scan")
+    print(f"{'path':<14} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, mode, multiplier in paths:
+        stats = await run_path(
+            args.database_url,
+            args.tenant_id,
+            args.embedding_model,
+            queries,
+            truth,
+            args.top_k,
+            mode,
+            multiplier,
+        )
+        print(
+            f"{label:<14} {stats['recall']:>9.3f} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,7 +2,12 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 
-from retrieval_service.domain.models import RetrievalRequest, RetrievalResult
+from retrieval_service.domain.models import (
+    BatchRetrievalRequest,
+    RetrievalRequest,
+    RetrievalResult,
+)
+from shared.schemas.documents import EmbeddingModel
 
 
 class RetrievalRepositoryPort(ABC):
@@ -11,4 +16,13 @@ class RetrievalRepositoryPort(ABC):
         self,
         query_embedding: list[float],
         request: RetrievalRequest,
+        embedding_model: EmbeddingModel,
     ) -> RetrievalResult: ...
+
+    @abstractmethod
+    async def similarity_search_batch(
+        self,
+        query_embeddings: list[list[float]],
+        request: BatchRetrievalRequest,
+        embedding_model: EmbeddingModel,
+    ) -> list[RetrievalResult]: ...
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+from typing import Annotated, Literal
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from shared.schemas.documents import Citation, RetrievedChunk
 
+# "hybrid": cosine ANN and full-text ranks merged with reciprocal rank fusion.
+SearchMode = Literal["vector", "hybrid"]
+
 
 class RetrievalRequest(BaseModel):
     model_config = ConfigDict(frozen=True)
@@ -14,6 +18,29 @@ class RetrievalRequest(BaseModel):
     tenant_id: str = Field(min_length=1, max_length=255)
     top_k: int = Field(default=5, ge=1, le=20)
     similarity_threshold: float = Field(default=0.75, ge=0.0, le=1.0)
+    search_mode: SearchMode | None = None  # None: RETRIEVAL_SEARCH_MODE
+    # Hybrid mode: each list contributes weight / (rrf_k + rank) per chunk.
+    vector_weight: float = Field(default=1.0, ge=0.0, le=10.0)
+    lexical_weight: float = Field(default=1.0, ge=0.0, le=10.0)
+    # HNSW candidate list size for the first scan; None: RETRIEVAL_EF_SEARCH.
+    ef_search: int | None = Field(default=None, ge=1, le=1000)
+
+
+class BatchRetrievalRequest(BaseModel):
+    """Several queries against one tenant, e.g. a contract review checklist."""
+
+    model_config = ConfigDict(frozen=True)
+
+    queries: list[Annotated[str, Field(min_length=1, max_length=4096)]] = Field(
+        min_length=1, max_length=100
+    )
+    tenant_id: str = Field(min_length=1, max_length=255)
+    top_k: int = Field(default=5, ge=1, le=20)
+    similarity_threshold: float = Field(default=0.75, ge=0.0, le=1.0)
+    search_mode: SearchMode | None = None
+    vector_weight: float = Field(default=1.0, ge=0.0, le=10.0)
+    lexical_weight: float = Field(default=1.0, ge=0.0, le=10.0)
+    ef_search: int | None = Field(default=None, ge=1, le=1000)
 
 
 class RetrievalResult(BaseModel):
@@ -24,13 +51,25 @@ class RetrievalResult(BaseModel):
     chunks: list[RetrievedChunk]
     has_context: bool
     refusal_reason: str | None = None
+    # Re-runs of the search with a doubled ef_search to fill top_k.
+    widening_steps: int = 0
 
     @classmethod
-    def empty(cls, query: str, tenant_id: str, reason: str) -> "RetrievalResult":
+    def empty(
+        cls, query: str, tenant_id: str, reason: str, widening_steps: int = 0
+    ) -> "RetrievalResult":
         return cls(
             query=query,
             tenant_id=tenant_id,
             chunks=[],
             has_context=False,
             refusal_reason=reason,
+            widening_steps=widening_steps,
         )
+
+
+class BatchRetrievalResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    tenant_id: str
+    results: list[RetrievalResult]  # One per query, in request order
@@ -1,98 +1,664 @@
 from __future__ import annotations
 
+import json
+import time
+from collections.abc import Sequence
+from typing import Any, Literal, get_args
 from uuid import UUID
 
 import structlog
-from sqlalchemy import text
+from prometheus_client import Histogram
+from sqlalchemy import RowMapping, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from retrieval_service.domain.models import RetrievalRequest, RetrievalResult
-from shared.schemas.documents import RetrievedChunk
+from retrieval_service.domain.models import (
+    BatchRetrievalRequest,
+    RetrievalRequest,
+    RetrievalResult,
+    SearchMode,
+)
+from shared.schemas.documents import EmbeddingColumn, EmbeddingModel, RetrievedChunk
 
 logger = structlog.get_logger(__name__)
 
+IndexMode = Literal["full", "binary"]
+IterativeScan = Literal["off", "strict_order", "relaxed_order"]
+
+SEARCH_WIDENING_STEPS = Histogram(
+    "retrieval_search_widening_steps",
+    "Searches re-run with a wider ef_search before returning, per query.",
+    ["search_mode"],
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8),
+)
+
+# Search bodies are formatted with {query_vector} (and {all_terms}, {any_terms}): the bound
+# query for a single search, or the LATERAL-joined row of a batch search; and
+# with {embedding}, the document_chunks slot holding the active model's vectors.
+#
+# Each body ranks the output of one ANN scan, the MATERIALIZED "nearest" CTE.
+# Only the tenant and model filters run inside it, so the index scan stops at
+# its LIMIT instead of iterating through rows the threshold would reject; the
+# threshold applies to its output. Every row carries the scan's row count as
+# "scanned", and a search with no hits returns one row of NULLs carrying it,
+# so a result cut short by the threshold can be told apart from a short scan.
+# Chunks of superseded document versions are dropped at the documents join.
+_FULL_SEARCH_SQL = """
+    WITH nearest AS MATERIALIZED (
+        SELECT cand.id, cand.{embedding} <=> {query_vector} AS distance
+        FROM document_chunks cand
+        WHERE cand.tenant_id = :tenant_id
+          AND cand.{embedding}_model = :embedding_model
+        ORDER BY cand.{embedding} <=> {query_vector}
+        LIMIT :top_k
+    )
+    SELECT hits.*, scan.scanned
+    FROM (SELECT count(*) AS scanned FROM nearest) scan
+    LEFT JOIN (
+        SELECT
+            dc.id AS chunk_id,
+            dc.document_id,
+            dc.tenant_id,
+            dc.content,
+            dc.page_number,
+            dc.chunk_index,
+            d.filename AS document_filename,
+            1 - n.distance AS similarity_score,
+            1 - n.distance AS rank_score
+        FROM nearest n
+        JOIN document_chunks dc ON dc.tenant_id = :tenant_id AND dc.id = n.id
+        JOIN documents d ON d.id = dc.document_id AND d.status <> 'superseded'
+        WHERE 1 - n.distance >= :threshold
+    ) hits ON true
+    ORDER BY hits.rank_score DESC
+"""
+
+# Coarse Hamming-distance search on the binary-quantized expression index, then
+# exact cosine re-rank of the candidates on the full-precision vectors. The
+# ORDER BY expression must match the slot's binary-quantized index exactly.
+_BINARY_RERANK_SEARCH_SQL = """
+    WITH nearest AS MATERIALIZED (
+        SELECT cand.id
+        FROM document_chunks cand
+        WHERE cand.tenant_id = :tenant_id
+          AND cand.{embedding}_model = :embedding_model
+        ORDER BY binary_quantize(cand.{embedding})::bit({dimensions})
+            <~> binary_quantize({query_vector})
+        LIMIT :candidates
+    )
+    SELECT hits.*, scan.scanned
+    FROM (SELECT count(*) AS scanned FROM nearest) scan
+    LEFT JOIN (
+        SELECT
+            dc.id AS chunk_id,
+            dc.document_id,
+            dc.tenant_id,
+            dc.content,
+            dc.page_number,
+            dc.chunk_index,
+            d.filename AS document_filename,
+            1 - (dc.{embedding} <=> {query_vector}) AS similarity_score,
+            1 - (dc.{embedding} <=> {query_vector}) AS rank_score
+        FROM nearest c
+        JOIN document_chunks dc ON dc.tenant_id = :tenant_id AND dc.id = c.id
+        JOIN documents d ON d.id = dc.document_id AND d.status <> 'superseded'
+        WHERE 1 - (dc.{embedding} <=> {query_vector}) >= :threshold
+        ORDER BY dc.{embedding} <=> {query_vector}
+        LIMIT :top_k
+    ) hits ON true
+    ORDER BY hits.rank_score DESC
+"""
+
+# Reciprocal rank fusion of the top :candidates of the cosine ANN ranking and
+# the full-text ranking. A chunk's rank_score is the sum over the lists it is
+# in of weight / (:rrf_k + rank), so a strong lexical match ("Section 14.2")
+# surfaces even when its cosine similarity is below :threshold, which only
+# filters the vector list. similarity_score stays the cosine similarity, floored
+# at 0 for lexical hits pointing away from the query.
+#
+# The full-text list holds chunks matching every query term. Only when fewer
+# than :candidates do is it topped up with chunks matching any term, ranked
+# below them; the one-time filter on lexical_any skips that broader scan and
+# its ts_rank_cd over every matching row otherwise.
+_HYBRID_SEARCH_SQL = """
+    WITH nearest AS MATERIALIZED (
+        SELECT cand.id, cand.{embedding} <=> {query_vector} AS distance
+        FROM document_chunks cand
+        WHERE cand.tenant_id = :tenant_id
+          AND cand.{embedding}_model = :embedding_model
+        ORDER BY cand.{embedding} <=> {query_vector}
+        LIMIT :candidates
+    ),
+    lexical_all AS MATERIALIZED (
+        SELECT cand.id, ts_rank_cd(cand.content_tsv, {all_terms}) AS text_rank
+        FROM document_chunks cand
+        WHERE cand.tenant_id = :tenant_id
+          AND cand.{embedding}_model = :embedding_model
+          AND cand.content_tsv @@ {all_terms}
+        ORDER BY text_rank DESC
+        LIMIT :candidates
+    ),
+    lexical_any AS (
+        SELECT cand.id, ts_rank_cd(cand.content_tsv, {any_terms}) AS text_rank
+        FROM document_chunks cand
+        WHERE (SELECT count(*) FROM lexical_all) < :candidates
+          AND cand.tenant_id = :tenant_id
+          AND cand.{embedding}_model = :embedding_model
+          AND cand.content_tsv @@ {any_terms}
+          AND cand.id NOT IN (SELECT id FROM lexical_all)
+        ORDER BY text_rank DESC
+        LIMIT :candidates
+    )
+    SELECT hits.*, scan.scanned
+    FROM (SELECT count(*) AS scanned FROM nearest) scan
+    LEFT JOIN (
+        SELECT
+            dc.id AS chunk_id,
+            dc.document_id,
+            dc.tenant_id,
+            dc.content,
+            dc.page_number,
+            dc.chunk_index,
+            d.filename AS document_filename,
+            GREATEST(1 - (dc.{embedding} <=> {query_vector}), 0) AS similarity_score,
+            fused.rank_score
+        FROM (
+            SELECT ranked.id, SUM(ranked.score) AS rank_score
+            FROM (
+                SELECT
+                    v.id,
+                    CAST(:vector_weight AS float8)
+                        / (:rrf_k + row_number() OVER (ORDER BY v.distance)) AS score
+                FROM nearest v
+                WHERE 1 - v.distance >= :threshold
+                UNION ALL
+                SELECT
+                    l.id,
+                    CAST(:lexical_weight AS float8)
+                        / (:rrf_k + row_number() OVER (ORDER BY l.tier, l.text_rank DESC))
+                FROM (
+                    SELECT matched.id, matched.tier, matched.text_rank
+                    FROM (
+                        SELECT id, 1 AS tier, text_rank FROM lexical_all
+                        UNION ALL
+                        SELECT id, 2 AS tier, text_rank FROM lexical_any
+                    ) matched
+                    ORDER BY matched.tier, matched.text_rank DESC
+                    LIMIT :candidates
+                ) l
+            ) ranked
+            GROUP BY ranked.id
+            ORDER BY rank_score DESC
+            LIMIT :top_k
+        ) fused
+        JOIN document_chunks dc ON dc.tenant_id = :tenant_id AND dc.id = fused.id
+        JOIN documents d ON d.id = dc.document_id AND d.status <> 'superseded'
+    ) hits ON true
+    ORDER BY hits.rank_score DESC
+"""
+
+# Every query term must match, or any one may. The text search config must
+# match document_chunks.content_tsv.
+_ALL_TERMS_SQL = "plainto_tsquery('english', {text})"
+_ANY_TERMS_SQL = (
+    "CAST(replace(CAST(plainto_tsquery('english', {text}) AS text), ' & ', ' | ') AS tsquery)"
+)
+
+# All queries of a batch in one statement: the embeddings travel as one text[]
+# and each row drives its own index search through the LATERAL join. q is
+# MATERIALIZED so the vectors and tsqueries are parsed once per query; as a
+# plain subquery it is pulled up and the casts are re-evaluated inside every
+# search, per candidate row where they appear in a filter or re-rank.
+_BATCH_SEARCH_SQL = """
+    WITH q AS MATERIALIZED (
+        SELECT
+            u.query_index,
+            CAST(u.embedding AS vector) AS embedding,
+            {all_terms} AS all_terms,
+            {any_terms} AS any_terms
+        FROM unnest(CAST(:embeddings AS text[]), CAST(:query_texts AS text[]))
+            WITH ORDINALITY AS u(embedding, query_text, query_index)
+    )
+    SELECT q.query_index, hits.*
+    FROM q
+    CROSS JOIN LATERAL ({search}) hits
+    ORDER BY q.query_index, hits.rank_score DESC
+"""
+
+_ACTIVE_MODEL_SQL = text("""
+    SELECT target_model, embedding_column, dimensions
+    FROM embedding_migrations
+    WHERE status = 'active'
+    ORDER BY activated_at DESC
+    LIMIT 1
+""")
+
+_GET_CACHED_QUERIES_SQL = text("""
+    SELECT query_hash, embedding::text AS embedding
+    FROM query_embedding_cache
+    WHERE query_hash = ANY(CAST(:query_hashes AS char(64)[]))
+      AND embedding_model = :embedding_model
+      AND created_at > NOW() - make_interval(secs => :max_age_seconds)
+""")
+
+_SAVE_CACHED_QUERIES_SQL = text("""
+    INSERT INTO query_embedding_cache (query_hash, embedding_model, embedding)
+    SELECT q.query_hash, :embedding_model, CAST(q.embedding AS vector)
+    FROM unnest(CAST(:query_hashes AS char(64)[]), CAST(:embeddings AS text[]))
+        AS q(query_hash, embedding)
+    ON CONFLICT (query_hash, embedding_model) DO UPDATE
+    SET embedding = EXCLUDED.embedding,
+        created_at = NOW()
+""")
+
+_PRUNE_CACHED_QUERIES_SQL = text("""
+    DELETE FROM query_embedding_cache
+    WHERE created_at <= NOW() - make_interval(secs => :max_age_seconds)
+""")
+
+# pgvector rejects hnsw.ef_search above 1000, and an HNSW scan returns at most
+# ef_search rows, so candidate counts are capped to the same value.
+_MAX_EF_SEARCH = 1000
+
+_SET_EF_SEARCH_SQL = text("SELECT set_config('hnsw.ef_search', :ef_search, true)")
+
+_SET_ITERATIVE_SCAN_SQL = text("""
+    SELECT
+        set_config('hnsw.iterative_scan', :iterative_scan, true),
+        set_config('hnsw.max_scan_tuples', :max_scan_tuples, true)
+""")
+
 
 class PgVectorRetrievalRepository:
-    def __init__(self, database_url: str) -> None:
+    def __init__(
+        self,
+        database_url: str,
+        default_embedding_model: str,
+        index_mode: IndexMode = "full",
+        rerank_multiplier: int = 10,
+        embedding_dimensions: int = 1536,
+        model_refresh_seconds: float = 5.0,
+        search_mode: SearchMode = "vector",
+        hybrid_candidates: int = 50,
+        rrf_k: int = 60,
+        ef_search: int = 40,
+        ef_search_max: int = 400,
+        iterative_scan: IterativeScan = "strict_order",
+        max_scan_tuples: int = 20_000,
+        widening_budget_ms: int = 150,
+    ) -> None:
         self._engine: AsyncEngine = create_async_engine(
             database_url, pool_size=10, max_overflow=20
         )
         self._session_factory = sessionmaker(
             self._engine, class_=AsyncSession, expire_on_commit=False
         )
+        self._index_mode = index_mode
+        self._rerank_multiplier = rerank_multiplier
+        self._search_mode = search_mode
+        self._hybrid_candidates = hybrid_candidates
+        self._rrf_k = rrf_k
+        self._ef_search = ef_search
+        self._ef_search_max = ef_search_max
+        self._iterative_scan = iterative_scan
+        self._max_scan_tuples = max_scan_tuples
+        self._widening_budget_seconds = widening_budget_ms / 1000
+
+        searches: dict[SearchMode, str] = {
+            "vector": _BINARY_RERANK_SEARCH_SQL if index_mode == "binary" else _FULL_SEARCH_SQL,
+            "hybrid": _HYBRID_SEARCH_SQL,
+        }
+        dimensions = int(embedding_dimensions)
+        columns: tuple[EmbeddingColumn, ...] = get_args(EmbeddingColumn)
+        self._search_sql = {
+            (mode, column): text(
+                search.format(
+                    query_vector="CAST(:embedding AS vector)",
+                    all_terms=_ALL_TERMS_SQL.format(text=":query_text"),
+                    any_terms=_ANY_TERMS_SQL.format(text=":query_text"),
+                    embedding=column,
+                    dimensions=dimensions,
+                )
+            )
+            for mode, search in searches.items()
+            for column in columns
+        }
+        self._batch_search_sql = {
+            (mode, column): text(
+                _BATCH_SEARCH_SQL.format(
+                    all_terms=_ALL_TERMS_SQL.format(text="u.query_text"),
+                    any_terms=_ANY_TERMS_SQL.format(text="u.query_text"),
+                    search=search.format(
+                        query_vector="q.embedding",
+                        all_terms="q.all_terms",
+                        any_terms="q.any_terms",
+                        embedding=column,
+                        dimensions=dimensions,
+                    ),
+                )
+            )
+            for mode, search in searches.items()
+            for column in columns
+        }
+        self._embedding_model = EmbeddingModel(name=default_embedding_model)
+        self._model_refresh_seconds = model_refresh_seconds
+        self._model_checked_at = float("-inf")
+
+    async def active_embedding_model(self) -> EmbeddingModel:
+        """Model that stored embeddings (and so query embeddings) must use.
+
+        Follows cutovers made by the embedding backfill, re-reading at most
+        every model_refresh_seconds.
+        """
+        now = time.monotonic()
+        if now - self._model_checked_at < self._model_refresh_seconds:
+            return self._embedding_model
+
+        async with self._session_factory() as session:
+            row = (await session.execute(_ACTIVE_MODEL_SQL)).mappings().first()
+        self._model_checked_at = now
+        active = (
+            EmbeddingModel(
+                name=row["target_model"],
+                column=row["embedding_column"],
+                dimensions=row["dimensions"],
+            )
+            if row
+            else None
+        )
+        if active and active != self._embedding_model:
+            logger.info(
+                "retrieval.embedding_model.switched",
+                previous_model=self._embedding_model.name,
+                embedding_model=active.name,
+                embedding_column=active.column,
+            )
+            self._embedding_model = active
+        return self._embedding_model
 
     async def similarity_search(
         self,
         query_embedding: list[float],
         request: RetrievalRequest,
+        embedding_model: EmbeddingModel,
     ) -> RetrievalResult:
-        embedding_str = "[" + ",".join(str(v) for v in query_embedding) + "]"
-
-        sql = text("""
-            SELECT
-                dc.id AS chunk_id,
-                dc.document_id,
-                dc.tenant_id,
-                dc.content,
-                dc.page_number,
-                dc.chunk_index,
-                d.filename AS document_filename,
-                1 - (dc.embedding <=> :embedding::vector) AS similarity_score
-            FROM document_chunks dc
-            JOIN documents d ON d.id = dc.document_id
-            WHERE dc.tenant_id = :tenant_id
-              AND 1 - (dc.embedding <=> :embedding::vector) >= :threshold
-            ORDER BY dc.embedding <=> :embedding::vector
-            LIMIT :top_k
-        """)
+        """Top_k chunks for the query, widening the HNSW scan while it comes back short.
+
+        A search with fewer than top_k hits whose ANN scan also fell short of
+        its LIMIT is re-run in the same transaction with ef_search doubled,
+        until the scan fills, stops gaining rows, reaches ef_search_max or
+        exceeds the widening budget. Hits cut short by the similarity
+        threshold are returned as they are; a wider scan cannot add to them.
+        """
+        mode = request.search_mode or self._search_mode
+        search_sql = self._search_sql[mode, embedding_model.column]
+        params = self._search_params(request, mode, embedding_model)
+        params["embedding"] = _vector_literal(query_embedding)
+        params["query_text"] = request.query
+        scan_limit = params.get("candidates", request.top_k)
+        ef_search, ef_search_max = self._ef_search_range(request, params)
+        started = time.perf_counter()
+        steps = 0
 
         async with self._session_factory() as session:
-            result = await session.execute(
-                sql,
-                {
-                    "embedding": embedding_str,
-                    "tenant_id": request.tenant_id,
-                    "threshold": request.similarity_threshold,
-                    "top_k": request.top_k,
-                },
-            )
-            rows = result.mappings().all()
+            await self._configure_scan(session, ef_search)
+            rows = (await session.execute(search_sql, params)).mappings().all()
+            while _scan_short(rows, request.top_k, scan_limit) and self._can_widen(
+                ef_search, ef_search_max, started
+            ):
+                ef_search = min(ef_search * 2, ef_search_max)
+                steps += 1
+                await session.execute(_SET_EF_SEARCH_SQL, {"ef_search": str(ef_search)})
+                wider = (await session.execute(search_sql, params)).mappings().all()
+                if _scanned(wider) <= _scanned(rows):
+                    break
+                rows = wider
+
+        hits = _hits(rows)
+        if self._iterative_scan == "relaxed_order":
+            # Relaxed iterative scans may yield rows slightly out of distance order.
+            hits = sorted(hits, key=lambda row: row["rank_score"], reverse=True)
+        chunks = [_to_chunk(row) for row in hits]
+        return self._to_result(request.query, request.tenant_id, mode, chunks, steps, ef_search)
+
+    async def similarity_search_batch(
+        self,
+        query_embeddings: list[list[float]],
+        request: BatchRetrievalRequest,
+        embedding_model: EmbeddingModel,
+    ) -> list[RetrievalResult]:
+        """Run one similarity search per query embedding in a single statement.
+
+        Widening works as in similarity_search; each step re-runs only the
+        queries that are still short of top_k.
+        """
+        mode = request.search_mode or self._search_mode
+        search_sql = self._batch_search_sql[mode, embedding_model.column]
+        params = self._search_params(request, mode, embedding_model)
+        embeddings = [_vector_literal(e) for e in query_embeddings]
+        scan_limit = params.get("candidates", request.top_k)
+        ef_search, ef_search_max = self._ef_search_range(request, params)
+        started = time.perf_counter()
+        rows: list[list[RowMapping]] = [[] for _ in request.queries]
+        steps = [0] * len(request.queries)
+        widened = [ef_search] * len(request.queries)
 
-        chunks = [
-            RetrievedChunk(
-                chunk_id=row["chunk_id"],
-                document_id=row["document_id"],
-                tenant_id=row["tenant_id"],
-                content=row["content"],
-                page_number=row["page_number"],
-                chunk_index=row["chunk_index"],
-                similarity_score=float(row["similarity_score"]),
-                document_filename=row["document_filename"],
+        async with self._session_factory() as session:
+            await self._configure_scan(session, ef_search)
+            pending = list(range(len(request.queries)))
+            first = True
+            while pending:
+                if not first:
+                    ef_search = min(ef_search * 2, ef_search_max)
+                    await session.execute(_SET_EF_SEARCH_SQL, {"ef_search": str(ef_search)})
+                params["embeddings"] = [embeddings[i] for i in pending]
+                params["query_texts"] = [request.queries[i] for i in pending]
+                result = await session.execute(search_sql, params)
+                found: list[list[RowMapping]] = [[] for _ in pending]
+                for row in result.mappings():
+                    found[row["query_index"] - 1].append(row)
+
+                still_short = []
+                for i, query_rows in zip(pending, found, strict=True):
+                    if not first:
+                        steps[i] += 1
+                        widened[i] = ef_search
+                    if first or _scanned(query_rows) > _scanned(rows[i]):
+                        rows[i] = query_rows
+                        if _scan_short(query_rows, request.top_k, scan_limit):
+                            still_short.append(i)
+                first = False
+                pending = (
+                    still_short if self._can_widen(ef_search, ef_search_max, started) else []
+                )
+
+        return [
+            self._to_result(
+                query,
+                request.tenant_id,
+                mode,
+                [_to_chunk(row) for row in _hits(query_rows)],
+                query_steps,
+                query_ef_search,
+            )
+            for query, query_rows, query_steps, query_ef_search in zip(
+                request.queries, rows, steps, widened, strict=True
             )
-            for row in rows
         ]
 
+    def _search_params(
+        self,
+        request: RetrievalRequest | BatchRetrievalRequest,
+        mode: SearchMode,
+        embedding_model: EmbeddingModel,
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {
+            "tenant_id": request.tenant_id,
+            "embedding_model": embedding_model.name,
+            "threshold": request.similarity_threshold,
+            "top_k": request.top_k,
+        }
+        if mode == "hybrid":
+            params["candidates"] = min(max(self._hybrid_candidates, request.top_k), _MAX_EF_SEARCH)
+            params["rrf_k"] = self._rrf_k
+            params["vector_weight"] = request.vector_weight
+            params["lexical_weight"] = request.lexical_weight
+        elif self._index_mode == "binary":
+            params["candidates"] = min(request.top_k * self._rerank_multiplier, _MAX_EF_SEARCH)
+        return params
+
+    def _ef_search_range(
+        self, request: RetrievalRequest | BatchRetrievalRequest, params: dict[str, Any]
+    ) -> tuple[int, int]:
+        """(first, largest) ef_search for a request.
+
+        HNSW returns at most ef_search rows, so the first scan is at least as
+        wide as the candidate count of hybrid and binary searches. Both stay
+        within pgvector's limit of 1000.
+        """
+        ef_search = max(request.ef_search or self._ef_search, params.get("candidates", 0))
+        ef_search = min(ef_search, _MAX_EF_SEARCH)
+        return ef_search, min(max(ef_search, self._ef_search_max), _MAX_EF_SEARCH)
+
+    def _can_widen(self, ef_search: int, ef_search_max: int, started: float) -> bool:
+        return (
+            ef_search < ef_search_max
+            and time.perf_counter() - started < self._widening_budget_seconds
+        )
+
+    async def _configure_scan(self, session: AsyncSession, ef_search: int) -> None:
+        # Transaction-local settings; the pooled connection keeps its defaults.
+        await session.execute(_SET_EF_SEARCH_SQL, {"ef_search": str(ef_search)})
+        if self._iterative_scan != "off":
+            await session.execute(
+                _SET_ITERATIVE_SCAN_SQL,
+                {
+                    "iterative_scan": self._iterative_scan,
+                    "max_scan_tuples": str(self._max_scan_tuples),
+                },
+            )
+
+    def _to_result(
+        self,
+        query: str,
+        tenant_id: str,
+        mode: SearchMode,
+        chunks: list[RetrievedChunk],
+        widening_steps: int,
+        ef_search: int,
+    ) -> RetrievalResult:
+        SEARCH_WIDENING_STEPS.labels(mode).observe(widening_steps)
         if not chunks:
+            logger.info(
+                "retrieval.similarity_search.empty",
+                tenant_id=tenant_id,
+                search_mode=mode,
+                widening_steps=widening_steps,
+                ef_search=ef_search,
+            )
             return RetrievalResult.empty(
-                query=request.query,
-                tenant_id=request.tenant_id,
+                query=query,
+                tenant_id=tenant_id,
                 reason="NO_RELEVANT_CONTEXT",
+                widening_steps=widening_steps,
             )
 
         logger.info(
             "retrieval.similarity_search.completed",
-            tenant_id=request.tenant_id,
+            tenant_id=tenant_id,
             chunk_count=len(chunks),
-            top_score=chunks[0].similarity_score if chunks else 0.0,
+            search_mode=mode,
+            index_mode=self._index_mode,
+            top_score=chunks[0].similarity_score,
+            widening_steps=widening_steps,
+            ef_search=ef_search,
         )
 
         return RetrievalResult(
-            query=request.query,
-            tenant_id=request.tenant_id,
+            query=query,
+            tenant_id=tenant_id,
             chunks=chunks,
             has_context=True,
+            widening_steps=widening_steps,
         )
 
+    async def get_cached_query_embeddings(
+        self, query_hashes: list[str], embedding_model: str, max_age_seconds: float
+    ) -> dict[str, list[float]]:
+        if not query_hashes:
+            return {}
+
+        async with self._session_factory() as session:
+            result = await session.execute(
+                _GET_CACHED_QUERIES_SQL,
+                {
+                    "query_hashes": query_hashes,
+                    "embedding_model": embedding_model,
+                    "max_age_seconds": max_age_seconds,
+                },
+            )
+            rows = result.mappings().all()
+        # pgvector's text form, '[0.1,0.2,...]', is a JSON array.
+        return {row["query_hash"]: json.loads(row["embedding"]) for row in rows}
+
+    async def save_cached_query_embeddings(
+        self, embeddings: dict[str, list[float]], embedding_model: str
+    ) -> None:
+        if not embeddings:
+            return
+
+        async with self._session_factory() as session:
+            await session.execute(
+                _SAVE_CACHED_QUERIES_SQL,
+                {
+                    "query_hashes": list(embeddings),
+                    "embedding_model": embedding_model,
+                    "embeddings": [_vector_literal(e) for e in embeddings.values()],
+                },
+            )
+            await session.commit()
+
+    async def prune_cached_query_embeddings(self, max_age_seconds: float) -> None:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                _PRUNE_CACHED_QUERIES_SQL, {"max_age_seconds": max_age_seconds}
+            )
+            await session.commit()
+        logger.info("query_embedding.cache.pruned", deleted_count=result.rowcount)
+
     async def dispose(self) -> None:
         await self._engine.dispose()
+
+
+def _vector_literal(embedding: list[float]) -> str:
+    return "[" + ",".join(str(v) for v in embedding) + "]"
+
+
+def _hits(rows: Sequence[RowMapping]) -> list[RowMapping]:
+    # A search with no hits still returns one row, carrying only the scan count.
+    return [row for row in rows if row["chunk_id"] is not None]
+
+
+def _scanned(rows: Sequence[RowMapping]) -> int:
+    return int(rows[0]["scanned"]) if rows else 0
+
+
+def _scan_short(rows: Sequence[RowMapping], top_k: int, scan_limit: int) -> bool:
+    """Fewer than top_k hits, and a wider scan could add some.
+
+    A scan that filled its LIMIT left the rest to the threshold.
+    """
+    return len(_hits(rows)) < top_k and _scanned(rows) < scan_limit
+
+
+def _to_chunk(row: RowMapping) -> RetrievedChunk:
+    return RetrievedChunk(
+        chunk_id=row["chunk_id"],
+        document_id=row["document_id"],
+        tenant_id=row["tenant_id"],
+        content=row["content"],
+        page_number=row["page_number"],
+        chunk_index=row["chunk_index"],
+        similarity_score=float(row["similarity_score"]),
+        document_filename=row["document_filename"],
+    )
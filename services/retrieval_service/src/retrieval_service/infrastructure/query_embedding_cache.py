@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+import structlog
+from prometheus_client import Counter
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy.exc import SQLAlchemyError
+
+from retrieval_service.infrastructure.pgvector_repo import PgVectorRetrievalRepository
+
+logger = structlog.get_logger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+QUERY_EMBEDDING_CACHE_LOOKUPS_TOTAL = Counter(
+    "query_embedding_cache_lookups_total",
+    "Query embedding lookups, by the tier that answered (memory, postgres) or miss.",
+    ["result"],
+)
+
+
+def normalize_query(query: str) -> str:
+    """Cache-key form of a query: NFKC, case-folded, collapsed whitespace."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", query)).strip().casefold()
+
+
+def query_hash(query: str, embedding_model: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(embedding_model.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_query(query).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class QueryEmbeddingCacheStats(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    entries: int
+    max_entries: int
+    persistent: bool
+    memory_hits: int
+    postgres_hits: int
+    misses: int
+    hit_rate: float
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache of query embeddings in front of the embeddings API.
+
+    Keys are SHA-256 of (embedding deployment, normalized query). Lookups go
+    to an in-process LRU first, then, when a repository is given, to the
+    query_embedding_cache table shared by all replicas. Entries expire after
+    ttl_seconds in memory and persistent_ttl_seconds in Postgres.
+    """
+
+    def __init__(
+        self,
+        repository: PgVectorRetrievalRepository | None,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 3600.0,
+        persistent_ttl_seconds: float = 7 * 24 * 3600.0,
+    ) -> None:
+        self._repository = repository
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._persistent_ttl_seconds = persistent_ttl_seconds
+        # (expires_at, float32 vector): ~6 KB per entry instead of ~50 KB for a list.
+        self._lru: OrderedDict[str, tuple[float, array[float]]] = OrderedDict()
+        self._pruned_at = time.monotonic()
+        self._memory_hits = 0
+        self._postgres_hits = 0
+        self._misses = 0
+
+    async def get_or_embed(
+        self,
+        query: str,
+        embedding_model: str,
+        embed_many: Callable[[list[str]], Awaitable[list[list[float]]]],
+    ) -> list[float]:
+        return (await self.get_or_embed_many([query], embedding_model, embed_many))[0]
+
+    async def get_or_embed_many(
+        self,
+        queries: list[str],
+        embedding_model: str,
+        embed_many: Callable[[list[str]], Awaitable[list[list[float]]]],
+    ) -> list[list[float]]:
+        """Embeddings of queries in order; one embed_many call covers every miss.
+
+        Queries that normalize to the same key are looked up and embedded once.
+        """
+        keys = [query_hash(query, embedding_model) for query in queries]
+        found: dict[str, list[float]] = {}
+
+        for key in dict.fromkeys(keys):
+            cached = self._lru_get(key)
+            if cached is not None:
+                self._record("memory")
+                found[key] = cached
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing and self._repository:
+            try:
+                stored = await self._repository.get_cached_query_embeddings(
+                    missing, embedding_model, self._persistent_ttl_seconds
+                )
+            except SQLAlchemyError as exc:
+                logger.warning("query_embedding.cache.lookup_failed", error=str(exc))
+                stored = {}
+            for key, embedding in stored.items():
+                self._record("postgres")
+                found[key] = embedding
+                self._lru_put(key, embedding)
+
+        to_embed: dict[str, str] = {}
+        for key, query in zip(keys, queries, strict=True):
+            if key not in found and key not in to_embed:
+                to_embed[key] = query
+
+        if to_embed:
+            for _ in to_embed:
+                self._record("miss")
+            fresh = dict(zip(to_embed, await embed_many(list(to_embed.values())), strict=True))
+            found.update(fresh)
+            for key, embedding in fresh.items():
+                self._lru_put(key, embedding)
+            if self._repository:
+                await self._store(self._repository, fresh, embedding_model)
+
+        return [found[key] for key in keys]
+
+    def stats(self) -> QueryEmbeddingCacheStats:
+        total = self._memory_hits + self._postgres_hits + self._misses
+        return QueryEmbeddingCacheStats(
+            entries=len(self._lru),
+            max_entries=self._max_entries,
+            persistent=self._repository is not None,
+            memory_hits=self._memory_hits,
+            postgres_hits=self._postgres_hits,
+            misses=self._misses,
+            hit_rate=round((total - self._misses) / total, 4) if total else 0.0,
+        )
+
+    async def _store(
+        self,
+        repository: PgVectorRetrievalRepository,
+        embeddings: dict[str, list[float]],
+        embedding_model: str,
+    ) -> None:
+        try:
+            await repository.save_cached_query_embeddings(embeddings, embedding_model)
+            # Expired rows are never served; clear them out about once per TTL.
+            if time.monotonic() - self._pruned_at >= self._persistent_ttl_seconds:
+                self._pruned_at = time.monotonic()
+                await repository.prune_cached_query_embeddings(
+                    self._persistent_ttl_seconds
+                )
+        except SQLAlchemyError as exc:
+            logger.warning("query_embedding.cache.store_failed", error=str(exc))
+
+    def _record(self, result: str) -> None:
+        QUERY_EMBEDDING_CACHE_LOOKUPS_TOTAL.labels(result).inc()
+        if result == "memory":
+            self._memory_hits += 1
+        elif result == "postgres":
+            self._postgres_hits += 1
+        else:
+            self._misses += 1
+
+    def _lru_get(self, key: str) -> list[float] | None:
+        entry = self._lru.get(key)
+        if entry is None:
+            return None
+        expires_at, embedding = entry
+        if expires_at <= time.monotonic():
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return embedding.tolist()
+
+    def _lru_put(self, key: str, embedding: list[float]) -> None:
+        if self._max_entries <= 0:
+            return
+        self._lru[key] = (time.monotonic() + self._ttl_seconds, array("f", embedding))
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._max_entries:
+            self._lru.popitem(last=False)
@@ -1,18 +1,31 @@
 from __future__ import annotations
 
 import uuid
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import asynccontextmanager
 
 import structlog
-from fastapi import FastAPI, HTTPException, Request
-from openai import AsyncAzureOpenAI
-
-from retrieval_service.domain.models import RetrievalRequest, RetrievalResult
+from fastapi import FastAPI, HTTPException, Request, Response
+from openai import NOT_GIVEN, AsyncAzureOpenAI
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from retrieval_service.domain.models import (
+    BatchRetrievalRequest,
+    BatchRetrievalResult,
+    RetrievalRequest,
+    RetrievalResult,
+)
 from retrieval_service.infrastructure.pgvector_repo import PgVectorRetrievalRepository
+from retrieval_service.infrastructure.query_embedding_cache import (
+    QueryEmbeddingCache,
+    QueryEmbeddingCacheStats,
+)
 from retrieval_service.settings import Settings
+from shared.llm import create_openai_client
 from shared.logging.config import bind_request_context, configure_logging
+from shared.ratelimit import AdaptiveRateLimiter, RateLimiterStats, estimate_tokens
 from shared.schemas.base import HealthResponse
+from shared.schemas.documents import EmbeddingModel
 
 settings = Settings()
 configure_logging(settings.service_name, settings.log_level)
@@ -23,17 +36,41 @@ logger = structlog.get_logger(__name__)
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("service.starting", version=settings.app_version)
 
-    openai_client = AsyncAzureOpenAI(
-        azure_endpoint=settings.azure_openai_endpoint,
-        api_key=settings.azure_openai_api_key.get_secret_value(),
-        api_version=settings.azure_openai_api_version,
+    rate_limiter = AdaptiveRateLimiter(
+        name=settings.azure_openai_embedding_deployment,
+        requests_per_minute=settings.azure_openai_requests_per_minute,
+        tokens_per_minute=settings.azure_openai_tokens_per_minute,
+        max_concurrency=settings.azure_openai_max_concurrency,
     )
+    openai_client = create_openai_client(settings, rate_limiter)
     repository = PgVectorRetrievalRepository(
-        database_url=settings.database_url.get_secret_value()
+        database_url=settings.database_url.get_secret_value(),
+        default_embedding_model=settings.azure_openai_embedding_deployment,
+        index_mode=settings.retrieval_index_mode,
+        rerank_multiplier=settings.retrieval_rerank_multiplier,
+        embedding_dimensions=settings.azure_openai_embedding_dimensions,
+        model_refresh_seconds=settings.retrieval_embedding_model_refresh_seconds,
+        search_mode=settings.retrieval_search_mode,
+        hybrid_candidates=settings.retrieval_hybrid_candidates,
+        rrf_k=settings.retrieval_rrf_k,
+        ef_search=settings.retrieval_ef_search,
+        ef_search_max=settings.retrieval_ef_search_max,
+        iterative_scan=settings.retrieval_iterative_scan,
+        max_scan_tuples=settings.retrieval_max_scan_tuples,
+        widening_budget_ms=settings.retrieval_widening_budget_ms,
+    )
+
+    query_cache = QueryEmbeddingCache(
+        repository=repository if settings.retrieval_query_cache_persistent else None,
+        max_entries=settings.retrieval_query_cache_max_entries,
+        ttl_seconds=settings.retrieval_query_cache_ttl_seconds,
+        persistent_ttl_seconds=settings.retrieval_query_cache_persistent_ttl_seconds,
     )
 
     app.state.openai_client = openai_client
+    app.state.rate_limiter = rate_limiter
     app.state.repository = repository
+    app.state.query_cache = query_cache
     app.state.settings = settings
 
     logger.info("service.ready")
@@ -60,6 +97,45 @@ async def health() -> HealthResponse:
     )
 
 
+@app.get("/rate-limit/stats", response_model=RateLimiterStats, tags=["ops"])
+async def rate_limit_stats(request: Request) -> RateLimiterStats:
+    rate_limiter: AdaptiveRateLimiter = request.app.state.rate_limiter
+    return rate_limiter.stats()
+
+
+def _embedder(
+    request: Request, embedding_model: EmbeddingModel
+) -> Callable[[list[str]], Awaitable[list[list[float]]]]:
+    """Embed texts with one embeddings.create call under the rate limiter."""
+    openai_client: AsyncAzureOpenAI = request.app.state.openai_client
+    rate_limiter: AdaptiveRateLimiter = request.app.state.rate_limiter
+
+    async def embed_many(texts: list[str]) -> list[list[float]]:
+        tokens = sum(estimate_tokens(text) for text in texts)
+        async with rate_limiter.acquire(tokens=tokens) as permit:
+            embedding_response = await openai_client.embeddings.create(
+                input=texts,
+                model=embedding_model.name,
+                dimensions=embedding_model.dimensions or NOT_GIVEN,
+            )
+            permit.record_usage(embedding_response.usage.total_tokens)
+        ordered = sorted(embedding_response.data, key=lambda item: item.index)
+        return [item.embedding for item in ordered]
+
+    return embed_many
+
+
+@app.get("/query-cache/stats", response_model=QueryEmbeddingCacheStats, tags=["ops"])
+async def query_cache_stats(request: Request) -> QueryEmbeddingCacheStats:
+    query_cache: QueryEmbeddingCache = request.app.state.query_cache
+    return query_cache.stats()
+
+
+@app.get("/metrics", tags=["ops"], include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.post("/retrieve", response_model=RetrievalResult, tags=["retrieval"])
 async def retrieve(request: Request, body: RetrievalRequest) -> RetrievalResult:
     correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
@@ -71,23 +147,56 @@ async def retrieve(request: Request, body: RetrievalRequest) -> RetrievalResult:
     log = logger.bind(correlation_id=correlation_id, tenant_id=body.tenant_id)
     log.info("retrieval.request.received", query_length=len(body.query))
 
-    openai_client: AsyncAzureOpenAI = request.app.state.openai_client
     repository: PgVectorRetrievalRepository = request.app.state.repository
+    query_cache: QueryEmbeddingCache = request.app.state.query_cache
+    embedding_model = await repository.active_embedding_model()
 
-    embedding_response = await openai_client.embeddings.create(
-        input=body.query,
-        model=settings.azure_openai_embedding_deployment,
+    query_embedding = await query_cache.get_or_embed(
+        body.query, embedding_model.name, _embedder(request, embedding_model)
     )
-    query_embedding = embedding_response.data[0].embedding
 
     result = await repository.similarity_search(
         query_embedding=query_embedding,
         request=body,
+        embedding_model=embedding_model,
     )
 
     log.info(
         "retrieval.request.completed",
         has_context=result.has_context,
         chunk_count=len(result.chunks),
+        widening_steps=result.widening_steps,
     )
     return result
+
+
+@app.post("/retrieve/batch", response_model=BatchRetrievalResult, tags=["retrieval"])
+async def retrieve_batch(request: Request, body: BatchRetrievalRequest) -> BatchRetrievalResult:
+    correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
+    bind_request_context(
+        correlation_id=correlation_id,
+        tenant_id=body.tenant_id,
+    )
+
+    log = logger.bind(correlation_id=correlation_id, tenant_id=body.tenant_id)
+    log.info("retrieval.batch.received", query_count=len(body.queries))
+
+    repository: PgVectorRetrievalRepository = request.app.state.repository
+    query_cache: QueryEmbeddingCache = request.app.state.query_cache
+    embedding_model = await repository.active_embedding_model()
+
+    query_embeddings = await query_cache.get_or_embed_many(
+        body.queries, embedding_model.name, _embedder(request, embedding_model)
+    )
+    results = await repository.similarity_search_batch(
+        query_embeddings=query_embeddings,
+        request=body,
+        embedding_model=embedding_model,
+    )
+
+    log.info(
+        "retrieval.batch.completed",
+        query_count=len(results),
+        with_context_count=sum(1 for result in results if result.has_context),
+    )
+    return BatchRetrievalResult(tenant_id=body.tenant_id, results=results)
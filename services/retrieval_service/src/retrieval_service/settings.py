@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import Field
 from shared.config.base import BaseServiceSettings
 
@@ -9,3 +11,41 @@ class Settings(BaseServiceSettings):
 
     retrieval_similarity_threshold: float = Field(default=0.75, ge=0.0, le=1.0)
     retrieval_top_k: int = Field(default=5, ge=1, le=20)
+
+    # "binary": coarse search on the binary-quantized HNSW index, exact re-rank of
+    # top_k * retrieval_rerank_multiplier candidates (at most 1000, the ef_search
+    # limit) on the full vectors.
+    retrieval_index_mode: Literal["full", "binary"] = Field(default="full")
+    retrieval_rerank_multiplier: int = Field(default=10, ge=1, le=100)
+
+    # Default for requests that do not set search_mode. Hybrid fuses the top
+    # retrieval_hybrid_candidates of the vector and full-text rankings with
+    # reciprocal rank fusion (score = sum of weight / (retrieval_rrf_k + rank)).
+    retrieval_search_mode: Literal["vector", "hybrid"] = Field(default="vector")
+    retrieval_hybrid_candidates: int = Field(default=50, ge=1, le=1000)
+    retrieval_rrf_k: int = Field(default=60, ge=1)
+
+    # HNSW scan width. The tenant and model filters apply to the rows the index
+    # scan yields, so a narrow scan can return fewer than top_k; the similarity
+    # threshold applies after the scan. Iterative scans (pgvector >= 0.8; "off"
+    # for older) keep scanning, up to retrieval_max_scan_tuples, until the
+    # LIMIT is met; scans still short are retried with ef_search doubled, up to
+    # retrieval_ef_search_max, while the search has run for less than
+    # retrieval_widening_budget_ms.
+    retrieval_ef_search: int = Field(default=40, ge=1, le=1000)
+    retrieval_ef_search_max: int = Field(default=400, ge=1, le=1000)
+    retrieval_iterative_scan: Literal["off", "strict_order", "relaxed_order"] = Field(
+        default="strict_order"
+    )
+    retrieval_max_scan_tuples: int = Field(default=20_000, ge=1)
+    retrieval_widening_budget_ms: int = Field(default=150, ge=0)
+
+    # How often to re-check embedding_migrations for a model cutover.
+    retrieval_embedding_model_refresh_seconds: float = Field(default=5.0, ge=0.0)
+
+    # Query embedding cache: in-process LRU (0 entries disables it), optionally
+    # backed by the query_embedding_cache table shared across replicas.
+    retrieval_query_cache_max_entries: int = Field(default=10_000, ge=0)
+    retrieval_query_cache_ttl_seconds: float = Field(default=3600.0, gt=0.0)
+    retrieval_query_cache_persistent: bool = Field(default=False)
+    retrieval_query_cache_persistent_ttl_seconds: float = Field(default=7 * 24 * 3600.0, gt=0.0)
@@ -35,11 +35,30 @@ class BaseServiceSettings(BaseSettings):
 
     # Redpanda
     redpanda_bootstrap_servers: str = Field(..., description="Comma-separated broker list")
+    # "pipelined" returns once an event is buffered instead of awaiting the broker ack;
+    # batches are sent when linger_ms elapses or max_batch_size bytes accumulate.
+    # Consumers still await the ack before committing the offset that produced it.
+    redpanda_publish_mode: Literal["sync", "pipelined"] = "sync"
+    redpanda_linger_ms: int = Field(default=5, ge=0, le=1000)
+    redpanda_max_batch_size: int = Field(default=64 * 1024, ge=1024)
+    redpanda_compression_type: Literal["none", "gzip", "lz4", "zstd"] = "none"
 
-    # Azure OpenAI
+    # Azure OpenAI ("local" answers in-process with deterministic fakes, for offline benchmarks)
+    openai_provider: Literal["azure", "local"] = "azure"
     azure_openai_endpoint: str = Field(default="")
     azure_openai_api_key: SecretStr = Field(default=SecretStr(""))
     azure_openai_api_version: str = Field(default="2024-08-01-preview")
     azure_openai_chat_deployment: str = Field(default="gpt-4o")
     azure_openai_embedding_deployment: str = Field(default="text-embedding-ada-002")
     azure_openai_embedding_dimensions: int = Field(default=1536)
+    # Client-side quota for the deployment this service calls; 0 disables a budget.
+    azure_openai_requests_per_minute: int = Field(default=0, ge=0)
+    azure_openai_tokens_per_minute: int = Field(default=0, ge=0)
+    azure_openai_max_concurrency: int = Field(default=16, ge=1, le=256)
+
+    # Local stand-in (openai_provider="local")
+    local_openai_latency_ms: float = Field(default=0.0, ge=0.0)
+    local_openai_latency_jitter_ms: float = Field(default=0.0, ge=0.0)
+    local_openai_error_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    local_openai_throttle_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    local_openai_seed: int = Field(default=0)
@@ -48,6 +48,14 @@ class DocumentUploadedEvent(BaseEvent):
     file_size_bytes: int = Field(ge=1, description="File size in bytes.")
     storage_path: str = Field(description="Absolute path to the document on the storage volume.")
     uploaded_by: str = Field(description="Identifier of the user who initiated the upload.")
+    previous_document_id: UUID | None = Field(
+        default=None,
+        description="Earlier version this upload revises; its chunks are reused where unchanged.",
+    )
+    batch_id: UUID | None = Field(
+        default=None,
+        description="Bulk upload this document arrived in (GET /documents/batch/{batch_id}).",
+    )
 
     @property
     def topic(self) -> str:
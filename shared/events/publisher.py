@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import defaultdict
+from typing import Any
+
+import structlog
+from aiokafka import AIOKafkaProducer
+from aiokafka.structs import RecordMetadata
+from prometheus_client import Counter, Histogram
+
+from shared.config.base import BaseServiceSettings
+
+logger = structlog.get_logger(__name__)
+
+PUBLISH_LATENCY_SECONDS = Histogram(
+    "event_publish_latency_seconds",
+    "Time from handing an event to the producer until the broker acknowledged it.",
+    ["topic"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PUBLISH_BATCH_RECORDS = Histogram(
+    "event_publish_batch_records",
+    "Events per produce batch acknowledged by the broker.",
+    ["topic"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+PUBLISH_TOTAL = Counter(
+    "event_publish_total",
+    "Events handed to the producer, by delivery outcome.",
+    ["topic", "outcome"],
+)
+
+
+def create_producer(settings: BaseServiceSettings) -> AIOKafkaProducer:
+    """Idempotent, acks=all producer with the configured batching and compression."""
+    compression = settings.redpanda_compression_type
+    return AIOKafkaProducer(
+        bootstrap_servers=settings.redpanda_bootstrap_servers,
+        value_serializer=lambda v: json.dumps(v, default=str).encode("utf-8"),
+        key_serializer=lambda k: k.encode("utf-8") if k else None,
+        acks="all",
+        enable_idempotence=True,
+        linger_ms=settings.redpanda_linger_ms,
+        max_batch_size=settings.redpanda_max_batch_size,
+        compression_type=None if compression == "none" else compression,
+    )
+
+
+class EventPublisher:
+    """Hands events to the producer's batching accumulator without awaiting the ack.
+
+    send() returns as soon as the event is buffered, with a future for the
+    broker acknowledgement; latency, outcome and per-batch record counts are
+    recorded when it resolves. flush() waits for everything still in flight.
+    """
+
+    def __init__(self, producer: AIOKafkaProducer) -> None:
+        self._producer = producer
+        self._pending: set[asyncio.Future[RecordMetadata]] = set()
+        # Acks of one produce batch resolve together in a single loop turn;
+        # count them per partition and record the counts at the end of the turn.
+        self._acked: defaultdict[tuple[str, int], int] = defaultdict(int)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def send(
+        self,
+        topic: str,
+        value: Any,
+        key: str | None = None,
+        headers: list[tuple[str, bytes]] | None = None,
+    ) -> asyncio.Future[RecordMetadata]:
+        started = time.perf_counter()
+        delivery = await self._producer.send(topic, value=value, key=key, headers=headers)
+        self._pending.add(delivery)
+        delivery.add_done_callback(lambda f: self._on_delivered(f, topic, started))
+        return delivery
+
+    async def flush(self, timeout_seconds: float = 30.0) -> None:
+        if not self._pending:
+            return
+        pending = len(self._pending)
+        try:
+            await asyncio.wait_for(self._producer.flush(), timeout_seconds)
+        except TimeoutError:
+            logger.error("producer.flush.timeout", pending=len(self._pending))
+            return
+        logger.info("producer.flushed", flushed=pending)
+
+    def _on_delivered(
+        self, delivery: asyncio.Future[RecordMetadata], topic: str, started: float
+    ) -> None:
+        self._pending.discard(delivery)
+        if delivery.cancelled() or delivery.exception() is not None:
+            PUBLISH_TOTAL.labels(topic, "failed").inc()
+            logger.error(
+                "event.publish.failed",
+                topic=topic,
+                error="cancelled" if delivery.cancelled() else str(delivery.exception()),
+            )
+            return
+
+        PUBLISH_TOTAL.labels(topic, "acked").inc()
+        PUBLISH_LATENCY_SECONDS.labels(topic).observe(time.perf_counter() - started)
+        if not self._acked:
+            asyncio.get_running_loop().call_soon(self._record_batches)
+        self._acked[(topic, delivery.result().partition)] += 1
+
+    def _record_batches(self) -> None:
+        for (topic, _partition), records in self._acked.items():
+            PUBLISH_BATCH_RECORDS.labels(topic).observe(records)
+        self._acked.clear()
@@ -0,0 +1,9 @@
+from shared.llm.client import create_openai_client
+from shared.llm.local import LocalOpenAITransport, hash_embedding, templated_answer
+
+__all__ = [
+    "create_openai_client",
+    "LocalOpenAITransport",
+    "hash_embedding",
+    "templated_answer",
+]
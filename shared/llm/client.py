@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import httpx
+import structlog
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
+
+from shared.config.base import BaseServiceSettings
+from shared.llm.local import LocalOpenAITransport
+from shared.ratelimit import AdaptiveRateLimiter
+
+logger = structlog.get_logger(__name__)
+
+_LOCAL_ENDPOINT = "http://local-openai"
+
+
+def create_openai_client(
+    settings: BaseServiceSettings,
+    rate_limiter: AdaptiveRateLimiter | None = None,
+) -> AsyncAzureOpenAI:
+    """Build the Azure OpenAI client for the configured provider.
+
+    With OPENAI_PROVIDER=local, requests are answered in-process by
+    LocalOpenAITransport; everything above the transport is the real SDK.
+    """
+    event_hooks = {"response": [rate_limiter.observe_response]} if rate_limiter else {}
+
+    if settings.openai_provider == "local":
+        logger.warning(
+            "openai.provider.local",
+            latency_ms=settings.local_openai_latency_ms,
+            error_rate=settings.local_openai_error_rate,
+            throttle_rate=settings.local_openai_throttle_rate,
+        )
+        transport = LocalOpenAITransport(
+            embedding_dimensions=settings.azure_openai_embedding_dimensions,
+            latency_ms=settings.local_openai_latency_ms,
+            latency_jitter_ms=settings.local_openai_latency_jitter_ms,
+            error_rate=settings.local_openai_error_rate,
+            throttle_rate=settings.local_openai_throttle_rate,
+            seed=settings.local_openai_seed,
+        )
+        return AsyncAzureOpenAI(
+            azure_endpoint=settings.azure_openai_endpoint or _LOCAL_ENDPOINT,
+            api_key="local",
+            api_version=settings.azure_openai_api_version,
+            http_client=httpx.AsyncClient(transport=transport, event_hooks=event_hooks),
+        )
+
+    return AsyncAzureOpenAI(
+        azure_endpoint=settings.azure_openai_endpoint,
+        api_key=settings.azure_openai_api_key.get_secret_value(),
+        api_version=settings.azure_openai_api_version,
+        http_client=DefaultAsyncHttpxClient(event_hooks=event_hooks),
+    )
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import time
+from array import array
+from typing import Any
+
+import httpx
+
+from shared.ratelimit import estimate_tokens
+
+_WORD_RE = re.compile(r"\w+")
+_CONTEXT_CHUNK_RE = re.compile(
+    r"\[CHUNK:(?P<chunk_id>[0-9a-fA-F-]{36})\][^\n]*\n(?P<content>.*?)"
+    r"(?=\n\n---\n\n\[CHUNK:|\n\n<user_query>|\Z)",
+    re.DOTALL,
+)
+_MAX_CITATIONS = 3
+_EXCERPT_CHARS = 200
+
+
+def hash_embedding(text: str, dimensions: int) -> list[float]:
+    """Deterministic unit vector built by feature-hashing the words of text.
+
+    Texts that share words get a positive cosine similarity, so retrieval
+    thresholds behave plausibly against the stand-in.
+    """
+    vector = [0.0] * dimensions
+    words = _WORD_RE.findall(text.lower()) or [text]
+    for word in words:
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dimensions
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def templated_answer(prompt: str) -> dict[str, Any]:
+    """JSON answer in the synthesis schema, citing the chunks found in prompt."""
+    chunks = [
+        (match["chunk_id"], " ".join(match["content"].split()))
+        for match in _CONTEXT_CHUNK_RE.finditer(prompt)
+    ]
+    if not chunks:
+        return {"answer": "NO_EVIDENCE", "citations": []}
+
+    cited = chunks[:_MAX_CITATIONS]
+    answer = " ".join(
+        f"{content[:_EXCERPT_CHARS]} [CHUNK:{chunk_id}]" for chunk_id, content in cited
+    )
+    return {
+        "answer": answer,
+        "citations": [
+            {"chunk_id": chunk_id, "excerpt": content[:_EXCERPT_CHARS]}
+            for chunk_id, content in cited
+        ],
+    }
+
+
+class LocalOpenAITransport(httpx.AsyncBaseTransport):
+    """In-process stand-in for the Azure OpenAI embeddings and chat endpoints.
+
+    Plugged into the SDK client as its httpx transport, so request building,
+    response parsing, SDK retries and rate-limiter hooks all run unchanged.
+    Latency and failures are drawn from a seeded RNG for repeatable runs.
+    """
+
+    def __init__(
+        self,
+        embedding_dimensions: int = 1536,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self._embedding_dimensions = embedding_dimensions
+        self._latency_ms = latency_ms
+        self._latency_jitter_ms = latency_jitter_ms
+        self._error_rate = error_rate
+        self._throttle_rate = throttle_rate
+        self._rng = random.Random(seed)  # noqa: S311 - reproducible fake traffic, not crypto
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay_ms = self._latency_ms + self._rng.uniform(0.0, self._latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+        roll = self._rng.random()
+        if roll < self._throttle_rate:
+            return _error_response(429, "RateLimitReached", {"retry-after-ms": "200"})
+        if roll < self._throttle_rate + self._error_rate:
+            return _error_response(500, "InternalServerError")
+
+        body = json.loads(await request.aread() or b"{}")
+        path = request.url.path
+        if path.endswith("/embeddings"):
+            return httpx.Response(200, json=self._embeddings(body))
+        if path.endswith("/chat/completions"):
+            return httpx.Response(200, json=self._chat_completion(body))
+        return _error_response(404, "DeploymentNotFound")
+
+    def _embeddings(self, body: dict[str, Any]) -> dict[str, Any]:
+        inputs = body.get("input", [])
+        texts = [inputs] if isinstance(inputs, str) else [str(t) for t in inputs]
+        as_base64 = body.get("encoding_format") == "base64"
+
+        data = []
+        for index, text in enumerate(texts):
+            embedding: Any = hash_embedding(text, self._embedding_dimensions)
+            if as_base64:
+                packed = array("f", embedding)
+                if sys.byteorder != "little":
+                    packed.byteswap()
+                embedding = base64.b64encode(packed.tobytes()).decode("ascii")
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+        tokens = sum(estimate_tokens(t) for t in texts)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "local"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def _chat_completion(self, body: dict[str, Any]) -> dict[str, Any]:
+        messages = body.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        user_prompt = next(
+            (str(m.get("content", "")) for m in reversed(messages) if m.get("role") == "user"),
+            "",
+        )
+        content = json.dumps(templated_answer(user_prompt))
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        return {
+            "id": f"chatcmpl-local-{hashlib.sha256(prompt.encode()).hexdigest()[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "local"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+def _error_response(
+    status_code: int, code: str, headers: dict[str, str] | None = None
+) -> httpx.Response:
+    return httpx.Response(
+        status_code,
+        headers=headers,
+        json={"error": {"code": code, "message": f"Injected by local stand-in ({code})."}},
+    )
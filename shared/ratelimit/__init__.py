@@ -0,0 +1,8 @@
+from shared.ratelimit.limiter import (
+    AdaptiveRateLimiter,
+    RateLimiterStats,
+    RatePermit,
+    estimate_tokens,
+)
+
+__all__ = ["AdaptiveRateLimiter", "RateLimiterStats", "RatePermit", "estimate_tokens"]
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+import structlog
+from pydantic import BaseModel, ConfigDict
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = structlog.get_logger(__name__)
+
+_DEFAULT_RETRY_AFTER_SECONDS = 1.0
+_WAIT_SAMPLES = 512
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-bound-ish token estimate (~4 characters per token) for budgeting."""
+    return len(text) // 4 + 1
+
+
+class RateLimiterStats(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    requests_per_minute: int
+    tokens_per_minute: int
+    concurrency_limit: int
+    max_concurrency: int
+    in_flight: int
+    waiting: int
+    requests_total: int
+    throttled_total: int
+    blocked_for_seconds: float
+    wait_ms_p50: float
+    wait_ms_p95: float
+    wait_ms_max: float
+
+
+class _TokenBucket:
+    """Continuously refilling budget; a rate of 0 means unlimited."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._level = self.capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        if not self._rate:
+            return 0.0
+        self._refill()
+        # A request larger than the whole bucket only has to wait for a full bucket.
+        needed = min(amount, self.capacity)
+        return max(0.0, (needed - self._level) / self._rate)
+
+    def take(self, amount: float) -> None:
+        if self._rate:
+            self._level -= amount
+
+
+class RatePermit:
+    """Handle for one admitted call; lets the caller report actual token usage."""
+
+    def __init__(self, limiter: AdaptiveRateLimiter, estimated_tokens: int) -> None:
+        self._limiter = limiter
+        self._estimated_tokens = estimated_tokens
+
+    def record_usage(self, total_tokens: int) -> None:
+        self._limiter._tokens.take(total_tokens - self._estimated_tokens)
+        self._estimated_tokens = total_tokens
+
+
+class AdaptiveRateLimiter:
+    """Client-side RPM/TPM budget plus an AIMD concurrency limit for one deployment.
+
+    Calls wait in acquire() until a concurrency slot and enough request and
+    token budget are available. Each successful call raises the concurrency
+    limit additively; a 429 halves it and pauses admission for Retry-After.
+    Wire observe_response() in as an httpx response hook so 429s are seen even
+    when the SDK retries them internally.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        decrease_factor: float = 0.5,
+    ) -> None:
+        self._name = name
+        self._requests_per_minute = requests_per_minute
+        self._tokens_per_minute = tokens_per_minute
+        self._max_concurrency = max_concurrency
+        self._min_concurrency = min_concurrency
+        self._decrease_factor = decrease_factor
+
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._slots = asyncio.Condition()
+        self._budget_lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        self._last_decrease_at = 0.0
+        self._requests_total = 0
+        self._throttled_total = 0
+        self._wait_samples: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0) -> AsyncIterator[RatePermit]:
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            async with self._slots:
+                await self._slots.wait_for(lambda: self._in_flight < int(self._limit))
+                self._in_flight += 1
+            try:
+                await self._reserve_budget(tokens)
+            except BaseException:
+                await self._release_slot()
+                raise
+        finally:
+            self._waiting -= 1
+
+        self._wait_samples.append(time.monotonic() - started)
+        self._requests_total += 1
+        try:
+            yield RatePermit(self, tokens)
+        except BaseException:
+            await self._release_slot()
+            raise
+        # Additive increase: about +1 slot per limit-many successful calls.
+        self._limit = min(float(self._max_concurrency), self._limit + 1.0 / self._limit)
+        await self._release_slot()
+
+    async def observe_response(self, response: httpx.Response) -> None:
+        if response.status_code == 429:
+            self.record_throttle(_retry_after_seconds(response.headers))
+
+    def record_throttle(self, retry_after_seconds: float | None = None) -> None:
+        now = time.monotonic()
+        pause = retry_after_seconds or _DEFAULT_RETRY_AFTER_SECONDS
+        self._throttled_total += 1
+        self._blocked_until = max(self._blocked_until, now + pause)
+        # 429s from calls that were already in flight reflect the same overload;
+        # cut the limit once per pause rather than once per response.
+        if now - self._last_decrease_at >= pause:
+            self._limit = max(float(self._min_concurrency), self._limit * self._decrease_factor)
+            self._last_decrease_at = now
+        logger.warning(
+            "ratelimit.throttled",
+            limiter=self._name,
+            retry_after_seconds=round(pause, 3),
+            concurrency_limit=int(self._limit),
+        )
+
+    def stats(self) -> RateLimiterStats:
+        waits = sorted(self._wait_samples)
+        return RateLimiterStats(
+            name=self._name,
+            requests_per_minute=self._requests_per_minute,
+            tokens_per_minute=self._tokens_per_minute,
+            concurrency_limit=int(self._limit),
+            max_concurrency=self._max_concurrency,
+            in_flight=self._in_flight,
+            waiting=self._waiting,
+            requests_total=self._requests_total,
+            throttled_total=self._throttled_total,
+            blocked_for_seconds=round(max(0.0, self._blocked_until - time.monotonic()), 3),
+            wait_ms_p50=_percentile_ms(waits, 0.50),
+            wait_ms_p95=_percentile_ms(waits, 0.95),
+            wait_ms_max=_percentile_ms(waits, 1.0),
+        )
+
+    async def _reserve_budget(self, tokens: int) -> None:
+        # Serialised so callers are admitted FIFO instead of racing for refills.
+        async with self._budget_lock:
+            while True:
+                delay = max(
+                    self._blocked_until - time.monotonic(),
+                    self._requests.wait_time(1),
+                    self._tokens.wait_time(tokens),
+                )
+                if delay <= 0:
+                    self._requests.take(1)
+                    self._tokens.take(tokens)
+                    return
+                await asyncio.sleep(delay)
+
+    async def _release_slot(self) -> None:
+        async with self._slots:
+            self._in_flight -= 1
+            self._slots.notify_all()
+
+
+def _retry_after_seconds(headers: httpx.Headers) -> float | None:
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue
+    return None
+
+
+def _percentile_ms(sorted_seconds: list[float], quantile: float) -> float:
+    if not sorted_seconds:
+        return 0.0
+    index = min(len(sorted_seconds) - 1, int(quantile * len(sorted_seconds)))
+    return round(sorted_seconds[index] * 1000, 1)
@@ -2,6 +2,7 @@ from shared.schemas.base import HealthResponse, ErrorResponse
 from shared.schemas.documents import (
     DocumentStatus,
     DocumentMetadata,
+    EmbeddingModel,
     ChunkMetadata,
     RetrievedChunk,
     Citation,
@@ -12,6 +13,7 @@ __all__ = [
     "ErrorResponse",
     "DocumentStatus",
     "DocumentMetadata",
+    "EmbeddingModel",
     "ChunkMetadata",
     "RetrievedChunk",
     "Citation",
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import StrEnum
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -12,6 +13,21 @@ class DocumentStatus(StrEnum):
     INDEXING = "indexing"
     INDEXED = "indexed"
     FAILED = "failed"
+    SUPERSEDED = "superseded"
+
+
+# document_chunks keeps two vector slots so a model migration can fill one
+# while the other is searched.
+EmbeddingColumn = Literal["embedding", "embedding_alt"]
+
+
+class EmbeddingModel(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    column: EmbeddingColumn = "embedding"
+    # Output size to request (text-embedding-3 only); None: the model's default.
+    dimensions: int | None = None
 
 
 class DocumentMetadata(BaseModel):